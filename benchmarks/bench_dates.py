@@ -0,0 +1,87 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+"""
+Times decoding Date and Datetime fields through FieldsDict, against parsing the same
+values with dateutil alone.
+
+Usage::
+
+    python benchmarks/bench_dates.py [--artifacts 2000] [--distinct 500] [--repeat 5]
+
+--distinct sets how many different timestamps appear among the artifacts: exports usually
+repeat the same dates many times, which the memo takes advantage of.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATE_FIELD = "Received"
+DATETIME_FIELD = "Measured"
+
+
+def make_fields_nodes(artifact_count, distinct):
+    from s4.clarity import xmlcodec
+
+    start = datetime.datetime(2024, 1, 1, 9, 0, 0)
+    nodes = []
+    for i in range(artifact_count):
+        moment = start + datetime.timedelta(minutes=17 * (i % distinct))
+        nodes.append(xmlcodec.parse((
+            '<art:artifact xmlns:art="http://genologics.com/ri/artifact" '
+            'xmlns:udf="http://genologics.com/ri/userdefined">'
+            '<udf:field type="Date" name="%s">%s</udf:field>'
+            '<udf:field type="Datetime" name="%s">%s.250-07:00</udf:field>'
+            '</art:artifact>' % (DATE_FIELD, moment.date().isoformat(), DATETIME_FIELD, moment.isoformat())
+        ).encode("UTF-8")))
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifacts", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    import dateutil.parser
+    from s4.clarity._internal.fields import FieldsDict
+    from s4.clarity.utils import date_util
+
+    nodes = make_fields_nodes(args.artifacts, args.distinct)
+
+    def decode_fields():
+        for node in nodes:
+            fields = FieldsDict(node)
+            fields[DATE_FIELD]
+            fields[DATETIME_FIELD]
+
+    def cold():
+        date_util._date_memo.clear()
+        date_util._datetime_memo.clear()
+        decode_fields()
+
+    strings = [(FieldsDict(node).get_raw(DATE_FIELD), FieldsDict(node).get_raw(DATETIME_FIELD)) for node in nodes]
+
+    def dateutil_only():
+        for date_string, datetime_string in strings:
+            dateutil.parser.parse(date_string, yearfirst=True).date()
+            dateutil.parser.parse(datetime_string, yearfirst=True)
+
+    cases = [
+        ("dateutil", dateutil_only),
+        ("fields, empty memo", cold),
+        ("fields, warm memo", decode_fields),
+    ]
+
+    print("Best of %d, %d artifacts with %d distinct timestamps" % (args.repeat, args.artifacts, args.distinct))
+    for name, function in cases:
+        print("  %-20s %.4fs" % (name, min(timeit.repeat(function, number=1, repeat=args.repeat))))
+
+
+if __name__ == "__main__":
+    main()
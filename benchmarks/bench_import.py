@@ -0,0 +1,81 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+"""
+Times starting an EPP: importing the library, creating a LIMS object and reaching its first
+factories, each in a fresh Python process run with ``python -X importtime``.
+
+Usage::
+
+    python benchmarks/bench_import.py [--repeat 5] [--top 10]
+
+For each phase, prints the best total import time over the runs, then the modules that took
+longest (including the modules they imported) in the best run. Modules Python imports at
+startup, such as site, are left out.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIMS_SETUP = "from s4.clarity import LIMS; lims = LIMS('https://clarity.example.com/api/v2', 'user', 'password'); "
+
+PHASES = [
+    ("import s4.clarity", "import s4.clarity"),
+    ("import LIMS", "from s4.clarity import LIMS"),
+    ("create LIMS", LIMS_SETUP),
+    ("first factory", LIMS_SETUP + "lims.artifacts"),
+    ("step factories", LIMS_SETUP + "lims.steps; lims.artifacts; lims.samples; lims.containers"),
+]
+
+
+def import_times(code, startup_modules=frozenset()):
+    """
+    :param startup_modules: modules every Python process imports before running code, left out of the total
+    :return: microseconds spent in imports made by code, and cumulatively for each module
+    :rtype: (int, dict[str, int])
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                             universal_newlines=True, check=True)
+
+    total = 0
+    cumulative = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, module = line[len("import time:"):].split("|")
+        name = module.strip()
+        cumulative[name] = max(cumulative.get(name, 0), int(cumulative_us))
+        if not module.startswith("  ") and name not in startup_modules:
+            # modules imported directly by the script, rather than by another module
+            total += int(cumulative_us)
+    return total, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    _, startup = import_times("pass")
+    startup_modules = frozenset(startup)
+
+    print("Best of %d fresh processes, not counting interpreter startup" % args.repeat)
+    for name, code in PHASES:
+        total, cumulative = min(import_times(code, startup_modules) for _ in range(args.repeat))
+        print("\n%-16s %7.1fms" % (name, total / 1000.0))
+        slowest = sorted(((module, microseconds) for module, microseconds in cumulative.items()
+                          if module not in startup_modules), key=lambda item: item[1], reverse=True)[:args.top]
+        for module, microseconds in slowest:
+            print("    %-48s %7.1fms" % (module, microseconds / 1000.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+"""
+Measures the memory held per cached artifact: the Python objects alone (artifacts that
+have not been retrieved), and with each artifact's XML and fields loaded.
+
+Usage::
+
+    python benchmarks/bench_memory.py [--artifacts 100000]
+
+To compare two versions of the library, run it from a checkout of each, e.g. with
+``git worktree add ../before <commit>`` and ``PYTHONPATH=../before``.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+# after PYTHONPATH, so another checkout can be measured
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT_URI = "https://qalocal/api/v2"
+
+
+def artifact_xml(i):
+    return (
+        '<art:artifact xmlns:art="http://genologics.com/ri/artifact" '
+        'xmlns:udf="http://genologics.com/ri/userdefined" '
+        'uri="%(root)s/artifacts/2-%(i)d?state=%(i)d" limsid="2-%(i)d">'
+        '<name>Sample %(i)d</name><type>Analyte</type><output-type>Analyte</output-type>'
+        '<location><container uri="%(root)s/containers/27-%(c)d" limsid="27-%(c)d"/>'
+        '<value>A:%(w)d</value></location>'
+        '<sample uri="%(root)s/samples/S%(i)d" limsid="S%(i)d"/>'
+        '<udf:field type="Numeric" name="Concentration">%(i)d.5</udf:field>'
+        '<udf:field type="String" name="Comment">Benchmark artifact %(i)d</udf:field>'
+        '</art:artifact>' % {"root": ROOT_URI, "i": i, "c": i // 96, "w": i % 96 + 1}
+    ).encode("UTF-8")
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(count)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return float(after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifacts", type=int, default=100000)
+    args = parser.parse_args()
+
+    from s4.clarity import LIMS, xmlcodec
+
+    documents = [artifact_xml(i) for i in range(args.artifacts)]
+    nodes = [xmlcodec.parse(document) for document in documents]
+
+    def unretrieved(count):
+        lims = LIMS(ROOT_URI, "user", "password")
+        for i in range(count):
+            lims.artifacts.get(ROOT_URI + "/artifacts/2-%d" % i)
+        return lims
+
+    def retrieved(count):
+        lims = LIMS(ROOT_URI, "user", "password")
+        # the XML is parsed up front so only what the library adds is measured
+        for artifact in lims.artifacts._cache_retrieved_nodes(nodes[:count]).values():
+            artifact.fields
+            artifact.limsid
+        return lims
+
+    print("%d artifacts, bytes per cached artifact:" % args.artifacts)
+    print("  objects only:      %8.0f" % measure(unretrieved, args.artifacts))
+    print("  with XML loaded:   %8.0f (excluding the parsed XML)" % measure(retrieved, args.artifacts))
+
+
+if __name__ == "__main__":
+    main()
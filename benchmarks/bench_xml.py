@@ -0,0 +1,98 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+"""
+Compares the XML backends on the documents the library handles most: parsing a large
+batch retrieve response, finding the artifacts and their fields, and serializing it again.
+
+Usage::
+
+    python benchmarks/bench_xml.py [--artifacts 2000] [--repeat 5]
+
+Each backend runs in its own interpreter, as the backend is chosen when s4.clarity is imported.
+Backends that aren't installed are skipped.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ARTIFACT_TAG = "{http://genologics.com/ri/artifact}artifact"
+FIELD_TAG = "{http://genologics.com/ri/userdefined}field"
+
+
+def make_details(artifact_count):
+    artifacts = []
+    for i in range(artifact_count):
+        artifacts.append(
+            '<art:artifact uri="https://qalocal/api/v2/artifacts/2-%(i)d?state=%(i)d" limsid="2-%(i)d">'
+            '<name>Sample %(i)d</name><type>Analyte</type><output-type>Analyte</output-type>'
+            '<qc-flag>PASSED</qc-flag>'
+            '<location><container uri="https://qalocal/api/v2/containers/27-%(c)d" limsid="27-%(c)d"/>'
+            '<value>A:%(w)d</value></location>'
+            '<working-flag>true</working-flag>'
+            '<sample uri="https://qalocal/api/v2/samples/S%(i)d" limsid="S%(i)d"/>'
+            '<udf:field type="Numeric" name="Concentration">%(i)d.5</udf:field>'
+            '<udf:field type="String" name="Comment">Benchmark artifact %(i)d</udf:field>'
+            '<udf:field type="Boolean" name="Pass">true</udf:field>'
+            '</art:artifact>' % {"i": i, "c": i // 96, "w": i % 96 + 1})
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<art:details xmlns:art="http://genologics.com/ri/artifact" '
+        'xmlns:udf="http://genologics.com/ri/userdefined">%s</art:details>' % "".join(artifacts)
+    ).encode("UTF-8")
+
+
+def run_backend(artifact_count, repeat):
+    from s4.clarity import xmlcodec
+
+    content = make_details(artifact_count)
+    root = xmlcodec.parse(content)
+
+    def find_fields():
+        for node in xmlcodec.findall(root, "./" + ARTIFACT_TAG):
+            xmlcodec.findall(node, "./" + FIELD_TAG)
+
+    cases = [
+        ("parse", lambda: xmlcodec.parse(content)),
+        ("findall", find_fields),
+        ("tostring", lambda: xmlcodec.tostring(root)),
+    ]
+
+    results = {}
+    for name, function in cases:
+        results[name] = min(timeit.repeat(function, number=1, repeat=repeat))
+
+    print("%-8s %s" % (xmlcodec.BACKEND, " ".join("%s=%.4fs" % (name, results[name]) for name, _ in cases)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifacts", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_backend(args.artifacts, args.repeat)
+        return
+
+    print("Best of %d, %d artifacts" % (args.repeat, args.artifacts))
+    for backend in ("stdlib", "lxml"):
+        env = dict(os.environ, S4_CLARITY_XML_BACKEND=backend, PYTHONPATH=ROOT)
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child",
+             "--artifacts", str(args.artifacts), "--repeat", str(args.repeat)],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        if result.returncode != 0:
+            print("%-8s skipped: %s" % (backend, result.stderr.strip().splitlines()[-1]))
+        else:
+            sys.stdout.write(result.stdout)
+
+
+if __name__ == "__main__":
+    main()
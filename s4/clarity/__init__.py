@@ -1,48 +1,56 @@
 # Copyright 2016 Semaphore Solutions, Inc.
 # ---------------------------------------------------------------------------
 
+import importlib
 import logging
+import sys
 
-# import whichever xml etree is available and re-export it for the rest of the library
-try:
-    from xml.etree import cElementTree as ETree
-except ImportError:
-    from xml.etree import ElementTree as ETree
+# import the configured xml etree (see xmlcodec) and re-export it for the rest of the library
+from .xmlcodec import ETree
 
 from ._internal.lazy_property import lazy_property
-import s4.clarity.utils.ssh
 
 from .exception import ClarityException
-from .lims import LIMS
 from ._internal import ClarityElement
-from ._internal.factory import ElementFactory
-from ._internal.stepfactory import StepFactory
-from ._internal.udffactory import UdfFactory
-try:
-    # Python <2.7.9 has insecure OpenSSL, but that doesn't mean we want to hear about it on every line.
-    # Sometimes this works, sometimes disable_warnings doesn't exist.
-    try:
-        import urllib3
-    except ImportError:
-        import requests.packages.urllib3 as urllib3
-
-    urllib3.disable_warnings(urllib3.exceptions.InsecurePlatformWarning)
-except:
-    pass
 
 log = logging.getLogger(__name__)
 
+# Members imported the first time they are used, so that importing the package, e.g. for
+# s4.clarity.artifact, doesn't also import requests and every factory.
+_LAZY_MEMBERS = {
+    "LIMS": "s4.clarity.lims",
+    "ElementFactory": "s4.clarity._internal.factory",
+    "StepFactory": "s4.clarity._internal.stepfactory",
+    "UdfFactory": "s4.clarity._internal.udffactory",
+}
+
+
+def _import_member(name):
+    member = getattr(importlib.import_module(_LAZY_MEMBERS[name]), name)
+    # allows Sphinx to generate links that point to this parent module
+    member.__module__ = "s4.clarity"
+    globals()[name] = member
+    return member
+
+
+def __getattr__(name):
+    if name in _LAZY_MEMBERS:
+        return _import_member(name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # no module __getattr__ before Python 3.7
+    for _name in _LAZY_MEMBERS:
+        _import_member(_name)
+
 module_members = [
     ClarityElement,
     ClarityException,
-    ElementFactory,
     lazy_property,
-    LIMS,
-    StepFactory,
-    UdfFactory
 ]
 
-__all__ = [m.__name__ for m in module_members]
+__all__ = sorted([m.__name__ for m in module_members] + list(_LAZY_MEMBERS))
 
 # The below __module__ assignments allow Sphinx to generate links that point to this parent module.
 for member in module_members:
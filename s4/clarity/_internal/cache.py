@@ -0,0 +1,293 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import threading
+import weakref
+from collections import OrderedDict
+
+from six import string_types
+
+UNBOUNDED = "unbounded"
+LRU = "lru"
+WEAK = "weak"
+
+DEFAULT_LRU_MAXSIZE = 10000
+
+
+class ElementCache(object):
+    """
+    The identity cache used by an ElementFactory, mapping uri to ClarityElement.
+    Subclasses decide how long elements are kept.
+
+    :ivar int hits: lookups that found an element
+    :ivar int misses: lookups that found nothing
+    :ivar int evictions: elements dropped to make room
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+
+    def _lookup(self, uri):
+        raise NotImplementedError()
+
+    def _store(self, uri, element):
+        raise NotImplementedError()
+
+    def _remove(self, uri):
+        raise NotImplementedError()
+
+    def _uris(self):
+        raise NotImplementedError()
+
+    def _repin(self, uri, element):
+        pass
+
+    def dirty_state_changed(self, uri, element):
+        """
+        Called when element, cached under uri, gains or loses unsaved changes, so that caches
+        which drop elements can hold on to it until its changes are saved.
+
+        :type uri: str
+        :type element: ClarityElement
+        """
+        with self._lock:
+            self._repin(uri, element)
+
+    def get(self, uri, default=None):
+        """
+        :type uri: str
+        :rtype: ClarityElement
+        """
+        with self._lock:
+            element = self._lookup(uri)
+            if element is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return element
+
+    def __getitem__(self, uri):
+        element = self.get(uri)
+        if element is None:
+            raise KeyError(uri)
+        return element
+
+    def __setitem__(self, uri, element):
+        with self._lock:
+            self._store(uri, element)
+
+    def __delitem__(self, uri):
+        with self._lock:
+            if self._lookup(uri) is None:
+                raise KeyError(uri)
+            self._remove(uri)
+
+    def setdefault(self, uri, element):
+        """
+        Store element under uri unless another element is already there, in one step,
+        so threads racing to create the same element all end up with the same one.
+
+        :return: the element cached for uri
+        :rtype: ClarityElement
+        """
+        with self._lock:
+            existing = self._lookup(uri)
+            if existing is not None:
+                return existing
+            self._store(uri, element)
+            return element
+
+    def pop(self, uri, default=None):
+        with self._lock:
+            element = self._lookup(uri)
+            if element is None:
+                return default
+            self._remove(uri)
+            return element
+
+    def __contains__(self, uri):
+        with self._lock:
+            return self._lookup(uri) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._uris())
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._uris()))
+
+    def values(self):
+        with self._lock:
+            return [e for e in (self._lookup(uri) for uri in list(self._uris())) if e is not None]
+
+    def clear(self):
+        with self._lock:
+            for uri in list(self._uris()):
+                self._remove(uri)
+
+    def stats(self):
+        """
+        :rtype: dict[str, int]
+        """
+        with self._lock:
+            return {
+                "size": len(self._uris()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class UnboundedElementCache(ElementCache):
+    """
+    Keeps every element until it is removed. The default.
+    """
+
+    def __init__(self):
+        super(UnboundedElementCache, self).__init__()
+        self._elements = {}
+
+    def _lookup(self, uri):
+        return self._elements.get(uri)
+
+    def _store(self, uri, element):
+        self._elements[uri] = element
+
+    def _remove(self, uri):
+        del self._elements[uri]
+
+    def _uris(self):
+        return self._elements.keys()
+
+
+class LruElementCache(ElementCache):
+    """
+    Keeps at most maxsize elements, dropping the least recently used first.
+    Elements with unsaved changes are never dropped, so they may push the size past maxsize.
+
+    :param int maxsize:
+    """
+
+    def __init__(self, maxsize=DEFAULT_LRU_MAXSIZE):
+        super(LruElementCache, self).__init__()
+        if maxsize < 1:
+            raise ValueError("LRU cache maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._elements = OrderedDict()
+        # elements with unsaved changes, set aside so eviction never has to step over them
+        self._pinned = {}
+
+    def _lookup(self, uri):
+        # pop and reinsert to mark it most recently used: Python 2's OrderedDict has no move_to_end
+        element = self._elements.pop(uri, None)
+        if element is not None:
+            self._elements[uri] = element
+            return element
+        return self._pinned.get(uri)
+
+    def _store(self, uri, element):
+        self._pinned.pop(uri, None)
+        if _is_pinned(element):
+            self._elements.pop(uri, None)
+            self._pinned[uri] = element
+        else:
+            self._elements.pop(uri, None)
+            self._elements[uri] = element
+        self._evict(uri)
+
+    def _remove(self, uri):
+        if self._elements.pop(uri, None) is None:
+            del self._pinned[uri]
+
+    def _uris(self):
+        return list(self._elements) + list(self._pinned)
+
+    def _repin(self, uri, element):
+        if _is_pinned(element):
+            if self._elements.get(uri) is element:
+                del self._elements[uri]
+                self._pinned[uri] = element
+        elif self._pinned.get(uri) is element:
+            # saved, so it can be dropped again; it was used most recently
+            del self._pinned[uri]
+            self._elements[uri] = element
+            self._evict(uri)
+
+    def _evict(self, newest_uri):
+        while self._elements and len(self._elements) + len(self._pinned) > self.maxsize:
+            uri = next(iter(self._elements))
+            if uri == newest_uri:
+                # the newest element is the only one left to drop
+                break
+            element = self._elements.pop(uri)
+            if _is_pinned(element):
+                # changed since it was stored; keep it until it is saved
+                self._pinned[uri] = element
+            else:
+                self.evictions += 1
+
+
+class WeakElementCache(ElementCache):
+    """
+    Keeps elements only while something else refers to them. Elements with unsaved changes
+    are held strongly until they are saved or removed.
+    """
+
+    def __init__(self):
+        super(WeakElementCache, self).__init__()
+        self._elements = weakref.WeakValueDictionary()
+        self._pinned = {}
+
+    def _lookup(self, uri):
+        return self._elements.get(uri)
+
+    def _store(self, uri, element):
+        self._elements[uri] = element
+        self._pinned.pop(uri, None)
+        self._repin(uri, element)
+
+    def _remove(self, uri):
+        self._elements.pop(uri, None)
+        self._pinned.pop(uri, None)
+
+    def _uris(self):
+        return list(self._elements.keys())
+
+    def _repin(self, uri, element):
+        if self._elements.get(uri) is not element:
+            return
+        if _is_pinned(element):
+            self._pinned[uri] = element
+        else:
+            self._pinned.pop(uri, None)
+
+
+def _is_pinned(element):
+    # elements with unsaved changes must not be dropped, or the changes would be lost
+    return bool(getattr(element, "is_dirty", False))
+
+
+def make_element_cache(policy=None, maxsize=DEFAULT_LRU_MAXSIZE):
+    """
+    Build an element cache from a policy: None or "unbounded", "lru", "weak",
+    an ElementCache instance, or a callable returning one.
+
+    :rtype: ElementCache
+    """
+    if policy is None or policy == UNBOUNDED:
+        return UnboundedElementCache()
+    if isinstance(policy, ElementCache):
+        return policy
+    if isinstance(policy, string_types):
+        if policy == LRU:
+            return LruElementCache(maxsize)
+        if policy == WEAK:
+            return WeakElementCache()
+        raise ValueError("Unknown element cache policy '%s'" % policy)
+    if callable(policy):
+        return policy()
+    raise ValueError("Unknown element cache policy %r" % (policy,))
@@ -0,0 +1,187 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+import requests
+
+from .fakesession import FakeSession
+
+log = logging.getLogger(__name__)
+
+# Cassettes are JSON lines, one request/response pair per line, gzipped when the file name ends in .gz.
+# Bodies are only stored as a hash on the request side; responses keep their full content.
+
+
+def _open_cassette(path, mode):
+    if path.endswith(".gz"):
+        # gzip.open has no text mode on Python 2
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="UTF-8")
+    return io.open(path, mode, encoding="UTF-8")
+
+
+def _body_bytes(body):
+    if body is None:
+        return b""
+    if hasattr(body, "getvalue"):
+        body = body.getvalue()
+    if isinstance(body, bytes):
+        return body
+    if isinstance(body, str):
+        return body.encode("UTF-8")
+    # file-like bodies are matched on their presence, not their content
+    return b"<stream>"
+
+
+def _body_hash(body):
+    return hashlib.sha1(_body_bytes(body)).hexdigest()
+
+
+class UnrecordedRequestException(Exception):
+    """
+    Raised by ReplaySession for a request that is not in its cassette.
+    """
+    pass
+
+
+class _RecordingMixin(object):
+    """
+    Saves every request/response pair sent through the session to a cassette file.
+    """
+
+    def __init__(self, cassette_path):
+        super(_RecordingMixin, self).__init__()
+        self.cassette_path = cassette_path
+        self._cassette_file = _open_cassette(cassette_path, "w")
+        self._cassette_lock = threading.Lock()
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        response = super(_RecordingMixin, self).request(method, url, params, data, **kwargs)
+
+        content = response.content
+        if isinstance(content, str):
+            content = content.encode("UTF-8")
+
+        interaction = {
+            "method": method.upper(),
+            "url": response.url or url,
+            "body_sha1": _body_hash(data),
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type"),
+            "elapsed": response.elapsed.total_seconds() if response.elapsed else 0.0,
+        }
+        try:
+            interaction["content"] = content.decode("UTF-8")
+        except UnicodeDecodeError:
+            interaction["content_b64"] = base64.b64encode(content).decode("ascii")
+
+        line = json.dumps(interaction, separators=(",", ":"))
+        with self._cassette_lock:
+            # json.dumps returns a byte string on Python 2
+            self._cassette_file.write(u"%s\n" % line)
+            self._cassette_file.flush()
+
+        return response
+
+    def close(self):
+        with self._cassette_lock:
+            if not self._cassette_file.closed:
+                self._cassette_file.close()
+        super(_RecordingMixin, self).close()
+
+
+class RecordingSession(_RecordingMixin, requests.Session):
+    """
+    A requests Session that sends every request to Clarity and saves each request/response
+    pair to a cassette, which ReplaySession can serve later without a server.
+    """
+    pass
+
+
+class RecordingFakeSession(_RecordingMixin, FakeSession):
+    """
+    A dry run FakeSession that also records to a cassette. Only the real (read) requests
+    and the fake write responses are recorded.
+    """
+    pass
+
+
+class ReplaySession(requests.Session):
+    """
+    A requests Session that answers requests from a cassette made by RecordingSession,
+    never contacting a server.
+
+    Requests are matched on method, url and body. Identical requests are answered in the order
+    they were recorded; once those are used up the last response is repeated.
+
+    :param str cassette_path:
+    :param latency: None for no delay, a number of seconds to wait before every response,
+                    or "recorded" to wait as long as the recorded request took.
+    """
+
+    RECORDED_LATENCY = "recorded"
+
+    def __init__(self, cassette_path, latency=None):
+        super(ReplaySession, self).__init__()
+        self.cassette_path = cassette_path
+        self.latency = latency
+
+        self._interactions = defaultdict(deque)
+        self._last_interaction = {}
+        self._replay_lock = threading.Lock()
+
+        with _open_cassette(cassette_path, "r") as cassette_file:
+            for line in cassette_file:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                key = self._key(interaction["method"], interaction["url"], interaction["body_sha1"])
+                self._interactions[key].append(interaction)
+
+    @staticmethod
+    def _key(method, url, body_sha1):
+        return method.upper(), url, body_sha1
+
+    def _next_interaction(self, method, url, data):
+        key = self._key(method, url, _body_hash(data))
+
+        with self._replay_lock:
+            recorded = self._interactions.get(key)
+            if recorded:
+                interaction = recorded.popleft()
+                self._last_interaction[key] = interaction
+                return interaction
+            if key in self._last_interaction:
+                return self._last_interaction[key]
+
+        raise UnrecordedRequestException("No recorded response for %s %s in %s" % (method.upper(), url,
+                                                                                   self.cassette_path))
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        prepared = requests.Request(method.upper(), url, params=params, data=data).prepare()
+        interaction = self._next_interaction(method, prepared.url, data)
+
+        if self.latency == self.RECORDED_LATENCY:
+            time.sleep(interaction["elapsed"])
+        elif self.latency:
+            time.sleep(self.latency)
+
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.url = prepared.url
+        response.request = prepared
+        if interaction.get("content_type"):
+            response.headers["Content-Type"] = interaction["content_type"]
+        if "content_b64" in interaction:
+            response._content = base64.b64decode(interaction["content_b64"])
+        else:
+            response._content = interaction["content"].encode("UTF-8")
+        return response
@@ -0,0 +1,240 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import datetime
+
+from s4.clarity import ETree, types, xmlcodec
+from s4.clarity.types import clarity_string_to_obj, obj_to_clarity_string
+from .lazy_property import lazy_property
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FIELD_TAG = "{http://genologics.com/ri/userdefined}field"
+
+# NumPy dtypes, and the placeholder used under the mask, for columns of a single field type
+_NUMPY_TYPES = {
+    types.NUMERIC: ("float64", 0.0),
+    types.BOOLEAN: ("bool", False),
+}
+
+
+class MaskedList(list):
+    """
+    The values of a column as a list, used when NumPy is not installed. Like a NumPy masked
+    array, `mask` holds True for each missing value; the value itself is None.
+
+    :ivar list[bool] mask:
+    """
+
+    def __init__(self, values, mask):
+        super(MaskedList, self).__init__(values)
+        self.mask = mask
+
+
+def make_column(values, mask, field_type=None):
+    """
+    :param list values: one value per element, None where missing
+    :param list[bool] mask: True where the value is missing
+    :param str field_type: the Clarity type of every value in the column, if they all share one
+    :return: a numpy.ma.MaskedArray if NumPy is installed, otherwise a MaskedList
+    """
+    if numpy is None:
+        return MaskedList(values, mask)
+
+    dtype, placeholder = _NUMPY_TYPES.get(field_type, ("object", None))
+    if placeholder is not None:
+        values = [placeholder if missing else value for value, missing in zip(values, mask)]
+    return numpy.ma.MaskedArray(values, mask=mask, dtype=dtype)
+
+
+def fields_node(element):
+    """
+    The node holding an element's fields, or None if it has none yet.
+
+    :type element: s4.clarity._internal.FieldsMixin
+    :rtype: ETree.Element
+    """
+    fields_xpath = getattr(element, "FIELDS_XPATH", None)
+    if fields_xpath is None:
+        raise Exception("%s elements don't have fields." % type(element).__name__)
+
+    if fields_xpath == ".":
+        return element.xml_root
+    return element.xml_find(fields_xpath)
+
+
+def field_nodes(node, names):
+    """
+    The field subnodes of node with the given names.
+
+    :type node: ETree.Element
+    :type names: set[str]
+    :rtype: dict[str, ETree.Element]
+    """
+    found = {}
+    if node is not None:
+        for subnode in xmlcodec.findall(node, "./" + FIELD_TAG):
+            name = subnode.get("name")
+            if name in names:
+                found[name] = subnode
+    return found
+
+
+def extract_columns(elements, udf_names, attrs=()):
+    """
+    Read UDFs and attributes from elements into columns, walking each element's fields once.
+    Empty UDFs count as missing.
+
+    :type elements: list[s4.clarity._internal.FieldsMixin]
+    :type udf_names: collections.Iterable[str]
+    :param attrs: names of element attributes to read, such as "limsid" or "name"
+    :rtype: dict[str, object]
+    """
+    udf_names = list(udf_names)
+    attrs = list(attrs)
+
+    clashes = set(udf_names) & set(attrs)
+    if clashes:
+        raise ValueError("Names requested as both UDFs and attributes: %s" % ", ".join(sorted(clashes)))
+
+    wanted = set(udf_names)
+    count = len(elements)
+    values = dict((name, [None] * count) for name in udf_names)
+    masks = dict((name, [True] * count) for name in udf_names)
+    field_types = dict((name, set()) for name in udf_names)
+
+    for index, element in enumerate(elements):
+        for name, subnode in field_nodes(fields_node(element), wanted).items():
+            if not subnode.text:
+                continue
+            field_type = subnode.get("type")
+            values[name][index] = clarity_string_to_obj(field_type, subnode.text)
+            masks[name][index] = False
+            field_types[name].add(field_type)
+
+    columns = {}
+    for name in udf_names:
+        column_type = field_types[name].pop() if len(field_types[name]) == 1 else None
+        columns[name] = make_column(values[name], masks[name], column_type)
+
+    for attr in attrs:
+        attr_values = [getattr(element, attr) for element in elements]
+        columns[attr] = make_column(attr_values, [value is None for value in attr_values])
+
+    return columns
+
+
+# converts values to the Python type obj_to_clarity_string formats for each Clarity type
+_COERCIONS = {
+    types.NUMERIC: float,
+    types.BOOLEAN: bool,
+}
+
+
+def infer_type(values):
+    """
+    The Clarity type for a column of Python values, from its first value that isn't None.
+
+    :type values: list
+    :rtype: str|None
+    """
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return types.BOOLEAN
+        if isinstance(value, (int, float)):
+            return types.NUMERIC
+        if isinstance(value, datetime.datetime):
+            return types.DATETIME
+        if isinstance(value, datetime.date):
+            return types.DATE
+        return types.STRING
+    return None
+
+
+def column_values(column, count):
+    """
+    Split a column into plain Python values and a mask of the entries to leave alone.
+
+    :param column: a sequence, NumPy array or masked array, or MaskedList
+    :rtype: (list, list[bool])
+    """
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        # tolist converts NumPy scalars to the Python types obj_to_clarity_string knows
+        values = numpy.ma.getdata(column).tolist()
+        mask = numpy.ma.getmaskarray(column).tolist()
+    else:
+        values = list(column)
+        mask = list(getattr(column, "mask", None) or [False] * len(values))
+
+    if len(values) != count:
+        raise ValueError("Column has %d values for %d elements" % (len(values), count))
+    return values, mask
+
+
+def format_column(values, mask, udf_type=None):
+    """
+    The field text for each value, or None where masked. With udf_type, values are first
+    converted to that type's Python type, so for example integers are written as Numeric floats.
+
+    :type values: list
+    :type mask: list[bool]
+    :type udf_type: str
+    :rtype: list[str]
+    """
+    coerce = _COERCIONS.get(udf_type)
+    texts = []
+    for value, masked in zip(values, mask):
+        if masked:
+            texts.append(None)
+        elif value is None or coerce is None:
+            texts.append(obj_to_clarity_string(value))
+        else:
+            texts.append(obj_to_clarity_string(coerce(value)))
+    return texts
+
+
+def write_fields(element, texts_by_name, udf_types=None):
+    """
+    Write field texts into an element's XML in one pass over its fields, creating fields as
+    needed. The element's cached fields are dropped and, if anything changed, it is marked dirty.
+
+    :type element: s4.clarity._internal.FieldsMixin
+    :param dict[str, str] texts_by_name: the text for each field; None leaves a field alone
+    :param dict[str, str] udf_types: Clarity type of each field, set on fields that are created
+    :return: True if any field changed
+    :rtype: bool
+    """
+    texts_by_name = dict((name, text) for name, text in texts_by_name.items() if text is not None)
+    if not texts_by_name:
+        return False
+
+    node = fields_node(element)
+    if node is None:
+        node = element.make_subelement_with_parents(element.FIELDS_XPATH)
+
+    existing = field_nodes(node, set(texts_by_name))
+    changed = False
+
+    for name, text in texts_by_name.items():
+        subnode = existing.get(name)
+        if subnode is None:
+            subnode = ETree.SubElement(node, FIELD_TAG)
+            subnode.set("name", name)
+            udf_type = (udf_types or {}).get(name)
+            if udf_type is not None:
+                subnode.set("type", udf_type)
+        elif (subnode.text or "") == text:
+            continue
+
+        subnode.text = text
+        changed = True
+
+    if changed:
+        lazy_property.reset(element, "fields")
+        element.mark_dirty()
+    return changed
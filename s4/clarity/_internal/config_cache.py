@@ -0,0 +1,181 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import logging
+import sqlite3
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Configuration endpoints whose GET responses are kept, relative to the LIMS root uri
+CONFIG_PATHS = (
+    "/configuration/protocols",
+    "/configuration/workflows",
+    "/configuration/udfs",
+    "/configuration/automations",
+    "/processtypes",
+    "/containertypes",
+)
+
+
+class ConfigCache(object):
+    """
+    An on-disk snapshot of Clarity configuration: protocols, workflows, UDFs, automations, process
+    types and container types. The raw XML of each GET to those endpoints, queries included, is
+    kept in an SQLite file. Later GETs, from this process or any other using the same file, are
+    answered from the file without contacting Clarity.
+
+    Entries older than ttl seconds are fetched again. The snapshot also records the Clarity
+    minor version (see `LIMS.current_minor_version`) it was made with, and is discarded if the
+    server's version has changed. The version is checked at most once every
+    version_check_interval seconds across all processes. So while it is fresh, a process that
+    only reads configuration sends Clarity no requests at all.
+
+    Any other request to a configuration endpoint, such as a PUT, drops the snapshot's entries
+    for that endpoint.
+
+    :param LIMS lims:
+    :param str path: the SQLite file, created if it doesn't exist. Several servers can share one file.
+    :param float ttl: seconds an entry is used for
+    :param float version_check_interval: seconds between checks of the Clarity version. None to never check.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, lims, path, ttl=86400.0, version_check_interval=600.0):
+        self.lims = lims
+        self.path = path
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self.hits = 0
+        self.misses = 0
+
+        self._prefixes = tuple(lims.root_uri + config_path for config_path in CONFIG_PATHS)
+        self._version_checked = False
+        self._lock = threading.RLock()
+
+        # autocommit, with a generous timeout for other processes holding the write lock
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS schema (version INTEGER)")
+            row = self._connection.execute("SELECT version FROM schema").fetchone()
+            if row is not None and row[0] != self.SCHEMA_VERSION:
+                log.info("Discarding configuration snapshot %s made by another version of the library", self.path)
+                self._connection.execute("DROP TABLE IF EXISTS entries")
+                self._connection.execute("DROP TABLE IF EXISTS servers")
+                self._connection.execute("DELETE FROM schema")
+                row = None
+            if row is None:
+                self._connection.execute("INSERT INTO schema (version) VALUES (?)", (self.SCHEMA_VERSION,))
+
+            self._connection.execute("CREATE TABLE IF NOT EXISTS entries "
+                                     "(uri TEXT PRIMARY KEY, content BLOB, saved_at REAL)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS servers "
+                                     "(root_uri TEXT PRIMARY KEY, minor_version TEXT, checked_at REAL)")
+
+    def covers(self, uri):
+        """
+        True if GETs of uri are kept in the snapshot.
+
+        :type uri: str
+        :rtype: bool
+        """
+        for prefix in self._prefixes:
+            if uri.startswith(prefix) and uri[len(prefix):len(prefix) + 1] in ("", "/", "?"):
+                return True
+        return False
+
+    def get(self, uri):
+        """
+        The saved response to a GET of uri, or None if there isn't a fresh one.
+
+        :type uri: str
+        :rtype: bytes|None
+        """
+        self._check_version()
+
+        with self._lock:
+            row = self._connection.execute("SELECT content, saved_at FROM entries WHERE uri = ?", (uri,)).fetchone()
+
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+        return bytes(row[0])
+
+    def put(self, uri, content):
+        """
+        Save the response to a GET of uri.
+
+        :type uri: str
+        :type content: bytes
+        """
+        self._check_version()
+
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO entries (uri, content, saved_at) VALUES (?, ?, ?)",
+                                     (uri, sqlite3.Binary(content), time.time()))
+
+    def invalidate(self, uri):
+        """
+        Drop the entries for the configuration endpoint uri belongs to: the element itself, and
+        every element and query of the same type, which the change may also affect.
+
+        :type uri: str
+        """
+        for prefix in self._prefixes:
+            if uri.startswith(prefix):
+                self._delete_prefix(prefix)
+
+    def clear(self):
+        """
+        Drop every entry for this LIMS's server.
+        """
+        self._delete_prefix(self.lims.root_uri + "/")
+
+    def _delete_prefix(self, prefix):
+        with self._lock:
+            self._connection.execute("DELETE FROM entries WHERE substr(uri, 1, ?) = ?", (len(prefix), prefix))
+
+    def _check_version(self):
+        if self._version_checked or self.version_check_interval is None:
+            return
+
+        with self._lock:
+            row = self._connection.execute("SELECT minor_version, checked_at FROM servers WHERE root_uri = ?",
+                                           (self.lims.root_uri,)).fetchone()
+
+        if row is not None and time.time() - row[1] < self.version_check_interval:
+            self._version_checked = True
+            return
+
+        minor_version = self.lims.current_minor_version
+
+        if row is not None and row[0] != minor_version:
+            log.info("Clarity version changed from %s to %s, discarding configuration snapshot", row[0], minor_version)
+            self.clear()
+        elif row is None:
+            # made before any version was recorded, so it can't be trusted
+            self.clear()
+
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO servers (root_uri, minor_version, checked_at) "
+                                     "VALUES (?, ?, ?)", (self.lims.root_uri, minor_version, time.time()))
+        self._version_checked = True
+
+    def stats(self):
+        """
+        :rtype: dict[str, int]
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT count(*) FROM entries").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
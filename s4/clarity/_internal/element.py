@@ -4,16 +4,62 @@
 import six
 from future.utils import python_2_unicode_compatible
 import logging
-from s4.clarity import ETree
+from s4.clarity import ETree, xmlcodec
 from .lazy_property import lazy_property
 
 log = logging.getLogger(__name__)
 
 
 class WrappedXml(object):
+    # Slotted to keep large numbers of cached elements compact. Subclasses that don't
+    # declare __slots__ of their own get a __dict__ as usual.
+    __slots__ = ("lims", "_xml_root", "_xml_dirty", "_dirty_owner", "__weakref__")
+
     def __init__(self, lims, xml_root=None):
         self.lims = lims
         self._xml_root = xml_root
+        self._xml_dirty = False
+        # the element whose XML this is part of, which is marked dirty in our place
+        self._dirty_owner = None
+
+    @property
+    def is_dirty(self):
+        """
+        True if this object has been changed through its properties, fields or subnode helpers since
+        it was last loaded from or saved to Clarity. Changes made directly to xml_root are not tracked;
+        call mark_dirty() after making them.
+
+        :type: bool
+        """
+        if self._dirty_owner is not None:
+            return self._dirty_owner.is_dirty
+        return self._xml_dirty
+
+    def mark_dirty(self):
+        """
+        Record that this object has changes that have not been sent to Clarity.
+        """
+        if self._dirty_owner is not None:
+            self._dirty_owner.mark_dirty()
+        else:
+            if not self._xml_dirty:
+                self._xml_dirty = True
+                self._dirty_state_changed()
+
+            unit_of_work = getattr(self.lims, "_unit_of_work", None)
+            if unit_of_work is not None:
+                unit_of_work.add(self)
+
+    def mark_clean(self):
+        """
+        Record that this object matches Clarity.
+        """
+        if self._xml_dirty:
+            self._xml_dirty = False
+            self._dirty_state_changed()
+
+    def _dirty_state_changed(self):
+        pass
 
     @property
     def xml_root(self):
@@ -31,7 +77,7 @@ class WrappedXml(object):
         :type xpath: str
         :rtype: list[ETree.Element]
         """
-        return self.xml_root.findall(xpath)
+        return xmlcodec.findall(self.xml_root, xpath)
 
     def xml_find(self, xpath):
         """
@@ -75,6 +121,7 @@ class WrappedXml(object):
         node = self.get_or_create_subnode(path)
 
         node.text = value
+        self.mark_dirty()
 
     def get_or_create_subnode(self, path):
         node = self.xml_find(path)
@@ -95,6 +142,7 @@ class WrappedXml(object):
 
         if node is not None:
             self.xml_root.remove(node)
+            self.mark_dirty()
 
     def make_subelement_with_parents(self, xpath):
         node = self.xml_root
@@ -123,6 +171,8 @@ class ClarityElement(WrappedXml):
     :ivar LIMS lims:
     """
 
+    __slots__ = ("uri", "_name", "_limsid", "_lazy_limsid")
+
     UNIVERSAL_TAG = None
 
     def __init__(self, lims, uri=None, xml_root=None, name=None, limsid=None):
@@ -169,6 +219,7 @@ class ClarityElement(WrappedXml):
         old_name = self.xml_root.get("name")
         if old_name is not None:
             self.xml_root.set("name", value)
+            self.mark_dirty()
         else:
             self.set_subnode_text("name", value)
         self._name = value
@@ -190,8 +241,10 @@ class ClarityElement(WrappedXml):
     def xml_root(self, root_node):
         """
         NOTE: setting xml_root directly will end-run around dirty object tracking.
+        The new XML is taken to match Clarity, so the element is marked clean.
         """
         self._xml_root = root_node
+        self.mark_clean()
 
         if root_node is not None:
             # sets uri if available and needed
@@ -200,6 +253,13 @@ class ClarityElement(WrappedXml):
             # name always overwrites.
             self._name = root_node.get("name")
 
+    def _dirty_state_changed(self):
+        # lets the factory's cache hold on to this element while it has unsaved changes
+        factories = getattr(self.lims, "factories", None)
+        factory = factories.get(type(self)) if factories and self.uri else None
+        if factory is not None:
+            factory._dirty_state_changed(self)
+
     @lazy_property
     def limsid(self):
         """:type: str"""
@@ -247,6 +307,19 @@ class ClarityElement(WrappedXml):
         """
         self.put_and_parse()
 
+    def commit_if_dirty(self):
+        """
+        Commit, only if the element has changes that have not been sent to Clarity.
+
+        :return: True if the element was committed.
+        :rtype: bool
+        """
+        if not self.is_dirty:
+            return False
+
+        self.commit()
+        return True
+
     def is_fully_retrieved(self):
         """
         :rtype: bool
@@ -262,8 +335,10 @@ class ClarityElement(WrappedXml):
     def invalidate(self):
         """
         Clear the local cache, forcing a reload next time the element is used.
+        Any unsaved changes are discarded.
         """
         self._xml_root = None
+        self.mark_clean()
 
     def __repr__(self):
         return six.ensure_str(self.xml)
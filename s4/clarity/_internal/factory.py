@@ -1,12 +1,15 @@
 # Copyright 2016 Semaphore Solutions, Inc.
 # ---------------------------------------------------------------------------
-from typing import List, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Iterable, Iterator, Tuple
 
 from six.moves.urllib.parse import urlencode
 from s4.clarity import ClarityException
-from s4.clarity import ETree
+from s4.clarity import ETree, xmlcodec
 import re
 from .element import ClarityElement
+from .cache import make_element_cache
+from . import columns
 
 
 class NoMatchingElement(ClarityException):
@@ -17,6 +20,36 @@ class MultipleMatchingElements(ClarityException):
     pass
 
 
+class BatchChunkException(ClarityException):
+    """
+    Raised when one or more chunks of a chunked batch request fail.
+    Chunks that succeeded have already been applied.
+
+    :ivar dict[int, Exception] failures: the exception raised by each failed chunk, keyed by chunk index
+    :ivar int chunk_count: the number of chunks the request was split into
+    :ivar list results: the result of each chunk in order, None for the chunks that failed.
+                        For batch_create this is the list of elements each chunk created.
+    """
+    def __init__(self, operation, failures, chunk_count, results=None):
+        msg = "%d of %d %s chunks failed:" % (len(failures), chunk_count, operation)
+        for index in sorted(failures):
+            msg += "\n  chunk %d: %s" % (index, failures[index])
+        super(BatchChunkException, self).__init__(msg)
+        self.failures = failures
+        self.chunk_count = chunk_count
+        self.results = results if results is not None else [None] * chunk_count
+
+    @property
+    def failed_chunks(self):
+        """:rtype: list[int]"""
+        return sorted(self.failures)
+
+    @property
+    def succeeded_chunks(self):
+        """:rtype: list[int]"""
+        return [index for index in range(self.chunk_count) if index not in self.failures]
+
+
 class BatchFlags(int):
     NONE = 0
     BATCH_CREATE = 1
@@ -39,11 +72,21 @@ class ElementFactory(object):
 
     _params_re = re.compile(r'\?.*$')
 
+    # Defaults for batch requests; None means every element goes in a single request.
+    batch_chunk_size = None
+    batch_max_workers = 1
+
+    # Background threads that batch retrieve each query page while the next page loads; 0 retrieves after the last page.
+    query_prefetch_workers = 1
+
+    # Threads getting elements one by one, when batch_get is used on a factory without BATCH_GET.
+    fallback_get_workers = 8
+
     @staticmethod
     def _strip_params(string):
         return ElementFactory._params_re.sub('', string)
 
-    def __init__(self, lims, element_class, batch_flags=None, request_path=None, name_attribute="name"):
+    def __init__(self, lims, element_class, batch_flags=None, request_path=None, name_attribute="name", cache=None):
         """
         :type lims: LIMS
         :type element_class: classobj
@@ -53,6 +96,7 @@ class ElementFactory(object):
                              when not specified, uses '/<plural of element name>'.
         :type name_attribute: str
         :param name_attribute: if not "name", provide this to adjust behaviour of 'get_by_name'.
+        :param cache: the element cache policy, see `set_cache_policy`. Default unbounded.
         """
 
         self.lims = lims
@@ -65,10 +109,43 @@ class ElementFactory(object):
             request_path = "/" + self._plural_name
         self.uri = lims.root_uri + request_path
 
-        self._cache = dict()
+        self._cache = make_element_cache(cache)
 
         lims.factories[element_class] = self
 
+    def _dirty_state_changed(self, element):
+        self._cache.dirty_state_changed(element.uri, element)
+
+    def set_cache_policy(self, policy, maxsize=None):
+        """
+        Replace the element cache. Elements already cached are carried over, as far as the new cache keeps them.
+
+        :param policy: "unbounded" (or None) keeps every element, "lru" keeps the maxsize most recently used
+                       elements, "weak" keeps elements only while they are referenced elsewhere. Elements with
+                       unsaved changes are always kept. An ElementCache instance, or a callable returning one,
+                       is also accepted.
+        :param int maxsize: size limit for the "lru" policy.
+        """
+        if maxsize is None:
+            new_cache = make_element_cache(policy)
+        else:
+            new_cache = make_element_cache(policy, maxsize)
+
+        for uri in self._cache:
+            element = self._cache.pop(uri)
+            if element is not None:
+                new_cache[uri] = element
+
+        self._cache = new_cache
+
+    def cache_stats(self):
+        """
+        Size, hit, miss and eviction counts of the element cache.
+
+        :rtype: dict[str, int]
+        """
+        return self._cache.stats()
+
     def new(self, **kwargs):
         # type: (**str) -> ClarityElement
         """
@@ -115,7 +192,7 @@ class ElementFactory(object):
         """
 
         self.lims.request('delete', element.uri)
-        del self._cache[element.uri]
+        self._cache.pop(element.uri)
 
     def can_batch_get(self):
         # type: () -> bool
@@ -212,11 +289,9 @@ class ElementFactory(object):
 
         uri = self._strip_params(uri)
 
-        if uri in self._cache:
-            obj = self._cache[uri]
-        else:
-            obj = self.element_class(self.lims, uri=uri, name=name, limsid=limsid)
-            self._cache[uri] = obj
+        obj = self._cache.get(uri)
+        if obj is None:
+            obj = self._cache.setdefault(uri, self.element_class(self.lims, uri=uri, name=name, limsid=limsid))
 
         if force_full_get and not obj.is_fully_retrieved():
             obj.refresh()
@@ -231,16 +306,17 @@ class ElementFactory(object):
 
         element.post_and_parse(self.uri)
 
-    def batch_fetch(self, elements):
-        # type: (Iterable[ClarityElement]) -> List[ClarityElement]
+    def batch_fetch(self, elements, max_workers=None):
+        # type: (Iterable[ClarityElement], int) -> List[ClarityElement]
         """
         Updates the content of all ClarityElements with the current state from Clarity.
         Syntactic sugar for batch_get([e.uri for e in elements])
 
+        :param max_workers: see `batch_get`.
         :return: A list of the elements returned by the query.
         """
 
-        return self.batch_get([e.uri for e in elements])
+        return self.batch_get([e.uri for e in elements], max_workers=max_workers)
 
     def batch_get_from_limsids(self, limsids):
         # type: (Iterable[str]) -> List[ClarityElement]
@@ -253,61 +329,206 @@ class ElementFactory(object):
 
         return self.batch_get([self.uri + "/" + limsid for limsid in limsids])
 
-    def batch_get(self, uris, prefetch=True):
-        # type: (Iterable[str], bool) -> List[ClarityElement]
+    def batch_get(self, uris, prefetch=True, chunk_size=None, max_workers=None):
+        # type: (Iterable[str], bool, int, int) -> List[ClarityElement]
         """
         Queries Clarity for a list of uris described by their REST API endpoint.
         If this query can be made as a single request it will be done that way.
 
         :param uris: A List of uris
         :param prefetch: Force load full content for each element.
+        :param chunk_size: Maximum number of uris per batch request. Defaults to `batch_chunk_size`.
+        :param max_workers: Number of chunks to request at the same time. Defaults to `batch_max_workers`.
+                            For factories that can't batch get, the number of elements to get at the
+                            same time instead. Defaults to `fallback_get_workers`.
         :return: A list of the elements returned by the query.
+        :raises BatchChunkException: if any chunk of a multi-chunk request fails
         """
 
         if not uris:
             return []  # just return an empty list if there were no uris
 
         if self.can_batch_get():
-            links_root = ETree.Element("{http://genologics.com/ri}links")
+            uris_to_query = self._uris_to_retrieve(uris, prefetch)
+            retrieved = {}
+
+            if uris_to_query:
+                chunks = self._chunk(uris_to_query, chunk_size)
+                results, failures = self._request_chunks(self._retrieve_and_cache_chunk, chunks, max_workers)
+
+                # merge in chunk order, whatever order the requests completed in
+                for chunk_retrieved in results:
+                    if chunk_retrieved is not None:
+                        retrieved.update(chunk_retrieved)
+
+                if failures:
+                    raise BatchChunkException("batch retrieve", failures, len(chunks))
+
+            return self._elements_for_uris(uris, retrieved)
+
+        else:
+            return self._get_each(uris, prefetch, max_workers)
+
+    def _get_each(self, uris, prefetch=True, max_workers=None):
+        # type: (Iterable[str], bool, int) -> List[ClarityElement]
+        """
+        batch_get for factories without BATCH_GET: get each element, with up to max_workers
+        (or fallback_get_workers) requests at a time.
+        """
+        elements = [self.get(uri) for uri in uris]
+
+        if not prefetch:
+            return elements
+
+        to_refresh = []
+        refreshing = set()
+        for element in elements:
+            if id(element) not in refreshing and not element.is_fully_retrieved():
+                to_refresh.append(element)
+                refreshing.add(id(element))
+
+        max_workers = min(max_workers or self.fallback_get_workers or 1, len(to_refresh))
+
+        if max_workers <= 1:
+            for element in to_refresh:
+                element.refresh()
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # list() re-raises the first failure, as a serial loop would
+                list(executor.map(lambda e: e.refresh(), to_refresh))
+
+        return elements
+
+    def _uris_to_retrieve(self, uris, prefetch=True):
+        # type: (Iterable[str], bool) -> List[str]
+        """
+        The de-duplicated uris, in order, that are not yet fully retrieved into the cache.
+        """
+        uris_to_query = []
+
+        querying_now = set()
+
+        for uri in uris:
+            uri = self._strip_params(uri)
+
+            if uri in querying_now:
+                # already covered
+                continue
+
+            obj = self._cache.get(uri)
+            if prefetch and (obj is None or not obj.is_fully_retrieved()):
+                uris_to_query.append(uri)
+                querying_now.add(uri)
+
+        return uris_to_query
+
+    def _batch_retrieve_links(self, uris):
+        # type: (List[str]) -> ETree.Element
+        links_root = ETree.Element("{http://genologics.com/ri}links")
+
+        for uri in uris:
+            link = ETree.SubElement(links_root, "link")
+            link.set("uri", uri)
+            link.set("rel", self._plural_name)
+
+        return links_root
+
+    def _batch_retrieve_chunk(self, uris):
+        # type: (List[str]) -> Iterable[ETree.Element]
+        """
+        Stream the element nodes for one batch retrieve request, each detached from the response.
+        """
+        return self.lims.request_iter('post', self.uri + "/batch/retrieve", self._batch_retrieve_links(uris),
+                                      self.element_class.UNIVERSAL_TAG)
 
-            n_queries = 0
+    def _retrieve_and_cache_chunk(self, uris):
+        # type: (List[str]) -> dict
+        # the whole chunk is parsed before any of it is cached, so a response cut off part way
+        # leaves the cache as it was; its nodes are detached, so it is never held as one tree
+        return self._cache_retrieved_nodes(list(self._batch_retrieve_chunk(uris)))
 
-            querying_now = set()
+    def _cache_retrieved_nodes(self, result_nodes):
+        # type: (Iterable[ETree.Element]) -> dict
+        """
+        Store full element nodes from a batch retrieve, updating any elements already in the cache.
+
+        :return: the elements updated or created, by uri
+        """
+        elements = {}
 
-            for uri in uris:
-                uri = self._strip_params(uri)
+        for node in result_nodes:
+            uri = node.get("uri")
+            uri = self._strip_params(uri)
+
+            obj = self._cache.get(uri)
+            if obj is None:
+                new_obj = self.element_class(self.lims, uri=uri, xml_root=node)
+                obj = self._cache.setdefault(uri, new_obj)
+                if obj is not new_obj:
+                    obj.xml_root = node
+            else:
+                obj.xml_root = node
+            elements[uri] = obj
+
+        return elements
 
-                if uri in querying_now:
-                    # already covered
-                    continue
+    def _elements_for_uris(self, uris, retrieved):
+        # type: (Iterable[str], dict) -> List[ClarityElement]
+        """
+        The elements for uris, in order. Uses the elements just retrieved first, as a bounded
+        cache may already have dropped some of them.
+        """
+        elements = []
+        for uri in uris:
+            uri = self._strip_params(uri)
+            obj = retrieved.get(uri)
+            if obj is None:
+                obj = self.get(uri)
+            elements.append(obj)
+        return elements
 
-                obj = self._cache.get(uri)
-                if prefetch and (obj is None or not obj.is_fully_retrieved()):
-                    link = ETree.SubElement(links_root, "link")
-                    link.set("uri", uri)
-                    link.set("rel", self._plural_name)
-                    querying_now.add(uri)
-                    n_queries += 1
+    def _chunk(self, items, chunk_size=None):
+        # type: (List, int) -> List[List]
+        """
+        Split items into lists of at most chunk_size (or batch_chunk_size) items.
+        """
+        chunk_size = chunk_size or self.batch_chunk_size
+        if not chunk_size:
+            return [items]
+        return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
 
-            if n_queries > 0:
-                result_root = self.lims.request('post', self.uri + "/batch/retrieve", links_root)
-                result_nodes = result_root.findall('./' + self.element_class.UNIVERSAL_TAG)
+    def _request_chunks(self, chunk_function, chunks, max_workers=None):
+        """
+        Call chunk_function once per chunk, using up to max_workers (or batch_max_workers) threads.
+        A lone chunk is requested directly, so its exception propagates unchanged.
 
-                for node in result_nodes:
-                    uri = node.get("uri")
-                    uri = self._strip_params(uri)
+        :return: the result for each chunk in order, None where it failed, and a dict of chunk index to exception.
+        :rtype: (list, dict[int, Exception])
+        """
+        if len(chunks) == 1:
+            return [chunk_function(chunks[0])], {}
 
-                    old_obj = self._cache.get(uri)
-                    if old_obj is not None:
-                        old_obj.xml_root = node
-                    else:
-                        new_obj = self.element_class(self.lims, uri=uri, xml_root=node)
-                        self._cache[uri] = new_obj
+        max_workers = min(max_workers or self.batch_max_workers or 1, len(chunks))
 
-            return [self._cache[uri] for uri in uris]
+        results = [None] * len(chunks)
+        failures = {}
 
+        if max_workers <= 1:
+            for index, chunk in enumerate(chunks):
+                try:
+                    results[index] = chunk_function(chunk)
+                except Exception as e:
+                    failures[index] = e
         else:
-            return [self.get(uri, force_full_get=prefetch) for uri in uris]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(chunk_function, chunk) for chunk in chunks]
+                for index, future in enumerate(futures):
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        failures[index] = e
+
+        return results, failures
 
     def _query_uri_and_tag(self):
         # type: () -> Tuple[str, str]
@@ -353,34 +574,137 @@ class ElementFactory(object):
                 'multi-value-name': ['A', 'B', 'C']
             })
 
+        When prefetching, each page of results is retrieved on a background thread
+        (see `query_prefetch_workers`) while the next page is requested.
+
         :param params: Query parameters to pass to clarity.
         :param prefetch: Force load full content for each element.
         :return: A list of the elements returned by the query.
         """
-        if not self.can_query():
-            raise Exception("Can't query for %s" % self.element_class.__name__)
+        query_uri, tag = self._first_query_uri_and_tag(params)
 
-        uri, tag = self._query_uri_and_tag()
+        elements = []
 
-        query_uri = uri + "?" + urlencode(params, doseq=True)
+        # Retrieve each page's elements in the background while the next page is requested.
+        executor = None
+        page_fetches = []
+
+        try:
+            while query_uri:
+                links_root = self.lims.request('get', query_uri)
+
+                link_nodes = xmlcodec.findall(links_root, './' + tag)
+                page_elements = self.from_link_nodes(link_nodes)
+                elements += page_elements
+                query_uri = self._next_page_uri(links_root)
+
+                if prefetch and self.query_prefetch_workers and page_elements:
+                    if executor is None and query_uri:
+                        # only worth a thread once there is another page to request meanwhile
+                        executor = ThreadPoolExecutor(max_workers=self.query_prefetch_workers)
+                    if executor is not None:
+                        page_fetches.append(executor.submit(self.batch_fetch, page_elements))
+
+            for page_fetch in page_fetches:
+                page_fetch.result()
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        if prefetch and executor is None:
+            self.batch_fetch(elements)
 
-        elements = []
+        return elements
+
+    def query_iter(self, prefetch=True, page_batch=1, cache=True, **params):
+        # type: (bool, int, bool, **str) -> Iterator[ClarityElement]
+        """
+        Queries Clarity like `query`, but yields the elements as the result pages arrive instead of
+        building the whole list first. Only page_batch pages of elements are held at a time.
+
+        :param params: Query parameters to pass to clarity.
+        :param prefetch: Force load full content for each element, one batch request per page_batch pages.
+        :param page_batch: Number of result pages to gather before retrieving and yielding them.
+        :param cache: If false, the elements are not added to this factory's cache, so memory use stays
+                      flat however many elements the query returns. Each element is then a new object,
+                      even if the same uri is already cached.
+        :return: An iterator over the elements returned by the query.
+        """
+        query_uri, tag = self._first_query_uri_and_tag(params)
+
+        pending_elements = []
+        pending_pages = 0
 
         while query_uri:
             links_root = self.lims.request('get', query_uri)
 
-            link_nodes = links_root.findall('./' + tag)
-            elements += self.from_link_nodes(link_nodes)
-            next_page_node = links_root.findall('./next-page')
-            if next_page_node:
-                query_uri = next_page_node[0].get('uri')
+            link_nodes = xmlcodec.findall(links_root, './' + tag)
+            if cache:
+                pending_elements += self.from_link_nodes(link_nodes)
             else:
-                query_uri = None
+                pending_elements += [self._new_from_link_node(node) for node in link_nodes]
+            query_uri = self._next_page_uri(links_root)
+            pending_pages += 1
+
+            if pending_pages >= page_batch or not query_uri:
+                if prefetch:
+                    self._retrieve_elements(pending_elements, cache)
+
+                for element in pending_elements:
+                    yield element
+
+                pending_elements = []
+                pending_pages = 0
+
+    def _new_from_link_node(self, xml_node):
+        # type: (ETree.Element) -> ClarityElement
+        """
+        A new element described by the link node, bypassing the cache.
+        """
+        return self.element_class(self.lims, uri=self._strip_params(xml_node.get("uri")),
+                                  name=xml_node.get("name"), limsid=xml_node.get("limsid"))
 
-        if prefetch:
+    def _retrieve_elements(self, elements, cache=True):
+        # type: (List[ClarityElement], bool) -> None
+        """
+        Fully retrieve elements. When cache is false, the elements are filled in directly and
+        neither they nor the retrieved nodes are added to the cache.
+        """
+        if cache:
             self.batch_fetch(elements)
+            return
 
-        return elements
+        if not self.can_batch_get():
+            for element in elements:
+                if not element.is_fully_retrieved():
+                    element.refresh()
+            return
+
+        elements_by_uri = {}
+        for element in elements:
+            if not element.is_fully_retrieved():
+                elements_by_uri.setdefault(element.uri, []).append(element)
+
+        for chunk in self._chunk(list(elements_by_uri)):
+            for node in list(self._batch_retrieve_chunk(chunk)):
+                for element in elements_by_uri.get(self._strip_params(node.get("uri")), []):
+                    element.xml_root = node
+
+    def _first_query_uri_and_tag(self, params):
+        # type: (dict) -> Tuple[str, str]
+        if not self.can_query():
+            raise Exception("Can't query for %s" % self.element_class.__name__)
+
+        uri, tag = self._query_uri_and_tag()
+        return uri + "?" + urlencode(params, doseq=True), tag
+
+    @staticmethod
+    def _next_page_uri(links_root):
+        # type: (ETree.Element) -> str
+        next_page_node = xmlcodec.findall(links_root, './next-page')
+        if next_page_node:
+            return next_page_node[0].get('uri')
+        return None
 
     def query_uris(self, **params):
         # type: (**str) -> List[str]
@@ -392,74 +716,104 @@ class ElementFactory(object):
         """
         return [e.uri for e in self.query(False, **params)]
 
-    def batch_update(self, elements):
-        # type: (Iterable[ClarityElement]) -> None
+    def batch_update(self, elements, only_dirty=False):
+        # type: (Iterable[ClarityElement], bool) -> None
         """
         Persists the ClarityElements back to Clarity. Will preform
         this action as a single query if possible.
 
         :param elements: All ClarityElements to save the state of.
+        :param only_dirty: If True, elements with no unsaved changes are left out of the update.
         :raises ClarityException: if Clarity returns an exception as XML
         """
 
+        # a list, as the elements are gone through more than once
+        elements = list(elements)
+        if only_dirty:
+            elements = [el for el in elements if el.is_dirty]
+
         if not elements:
             return
 
         if self.can_batch_update():
-            details_root = ETree.Element(self.batch_tag)
-
-            for el in elements:
-                details_root.append(el.xml_root)
-
-            self.lims.request('post', self.uri + "/batch/update", details_root)
+            self.lims.request('post', self.uri + "/batch/update", self._batch_details(elements))
 
         else:
             for el in elements:
                 self.lims.request('post', el.uri, el.xml_root)
 
-    def batch_create(self, elements):
-        # type: (Iterable[ClarityElement]) -> List[ClarityElement]
+        for el in elements:
+            el.mark_clean()
+
+    def batch_create(self, elements, chunk_size=None, max_workers=None):
+        # type: (Iterable[ClarityElement], int, int) -> List[ClarityElement]
         """
         Creates new records in Clarity for each element and returns these new records as ClarityElements.
         If this operation can be performed in a single network operation it will be.
 
+        With a chunk_size, the elements are sent in chunks of at most that many elements, up to
+        max_workers chunks at a time. Factories that can't batch create post each element of a chunk
+        in turn.
+
         :param elements: A list of new ClarityElements that have not been persisted to Clarity yet.
-        :return: New ClarityElement records from Clarity, created with the data supplied to the method.
+        :param chunk_size: Maximum number of elements per request. Defaults to `batch_chunk_size`.
+        :param max_workers: Number of chunks to send at the same time. Defaults to `batch_max_workers`.
+        :return: New ClarityElement records from Clarity, created with the data supplied to the method,
+                 in the same order as elements.
         :raises ClarityException: if Clarity returns an exception as XML
+        :raises BatchChunkException: if any chunk of a multi-chunk request fails. Its `results` hold
+                                     the elements created by the chunks that succeeded.
         """
 
+        elements = list(elements)
+
         if not elements:
             return []
 
         if self.can_batch_create():
-            details_root = ETree.Element(self.batch_tag)
+            chunk_function = self._batch_create_chunk
+        else:
+            chunk_function = self._create_each
 
-            for el in elements:
-                details_root.append(el.xml_root)
+        chunks = self._chunk(elements, chunk_size)
+        results, failures = self._request_chunks(chunk_function, chunks, max_workers)
 
-            links = self.lims.request('post', self.uri + "/batch/create", details_root)
+        if failures:
+            raise BatchChunkException("batch create", failures, len(chunks), results)
 
-            return self.from_link_nodes(links)
+        return [new_obj for created in results for new_obj in created]
 
-        else:
-            objects = []
+    def _batch_create_chunk(self, elements):
+        # type: (List[ClarityElement]) -> List[ClarityElement]
+        links = self.lims.request('post', self.uri + "/batch/create", self._batch_details(elements))
+        return self.from_link_nodes(links)
 
-            for el in elements:
-                new_obj = self.element_class(
-                    self.lims,
-                    xml_root=self.lims.request('post', el.uri, el.xml_root)
-                )
-                self._cache[new_obj.uri] = new_obj
-                objects.append(new_obj)
+    def _create_each(self, elements):
+        # type: (List[ClarityElement]) -> List[ClarityElement]
+        return [self._new_from_created_root(self.lims.request('post', self.uri, el.xml_root)) for el in elements]
 
-            return objects
+    def _new_from_created_root(self, xml_root):
+        # type: (ETree.Element) -> ClarityElement
+        new_obj = self.element_class(self.lims, xml_root=xml_root)
+        self._cache[new_obj.uri] = new_obj
+        return new_obj
 
-    def batch_refresh(self, elements):
-        # type: (Iterable[ClarityElement]) -> None
+    def _batch_details(self, elements):
+        # type: (Iterable[ClarityElement]) -> ETree.Element
+        details_root = ETree.Element(self.batch_tag)
+
+        for el in elements:
+            details_root.append(el.xml_root)
+
+        return details_root
+
+    def batch_refresh(self, elements, max_workers=None):
+        # type: (Iterable[ClarityElement], int) -> None
         """
         Loads the current state of the elements from Clarity. Any changes made
         to these artifacts that has not been pushed to Clarity will be lost.
         :param elements: All ClarityElements to update from Clarity.
+        :param max_workers: see `batch_get`.
         """
 
         # Clear the existing configs on samples this will force a refresh when queried
@@ -467,7 +821,7 @@ class ElementFactory(object):
         self.batch_invalidate(elements)
 
         # Now force load a new copy of the artifact state
-        self.batch_fetch(elements)
+        self.batch_fetch(elements, max_workers=max_workers)
 
     def batch_invalidate(self, elements):
         # type: (Iterable[ClarityElement]) -> None
@@ -479,6 +833,78 @@ class ElementFactory(object):
         for element in elements:
             element.invalidate()
 
+    def to_columns(self, elements, udf_names, attrs=(), prefetch=True):
+        # type: (Iterable[ClarityElement], Iterable[str], Iterable[str], bool) -> dict
+        """
+        Read UDFs and attributes from many elements at once, as one column per name.
+
+        Each element's XML is walked once, rather than building a FieldsDict per element.
+        Columns are NumPy masked arrays if NumPy is installed: Numeric UDFs as floats, Boolean
+        UDFs as bools and anything else as objects. Otherwise they are lists with a `mask`
+        attribute. Either way `column.mask[i]` is True where element i has no value.
+
+        :param elements: elements with fields, such as artifacts or samples
+        :param udf_names: names of the UDFs to read
+        :param attrs: names of element attributes to read as well, such as "limsid" or "name"
+        :param prefetch: retrieve elements that haven't been, in batches, before reading them
+        :return: the columns, by UDF or attribute name
+        :rtype: dict[str, object]
+        """
+        elements = list(elements)
+        if prefetch and elements:
+            self.batch_fetch(elements)
+
+        return columns.extract_columns(elements, udf_names, attrs)
+
+    def set_columns(self, elements, values_by_udf, udf_types=None, commit=False, chunk_size=None, prefetch=True):
+        # type: (Iterable[ClarityElement], dict, dict, bool, int, bool) -> List[ClarityElement]
+        """
+        Set UDFs on many elements at once, from one column of values per UDF.
+
+        Values are formatted as FieldsDict would format them, and each element's fields are
+        updated in a single pass over its XML. Masked entries, in a NumPy masked array or a
+        column from `to_columns`, leave that element's UDF unchanged; None clears it. Elements
+        whose values actually change are marked dirty.
+
+        :param elements: elements with fields, such as artifacts or samples
+        :param values_by_udf: a sequence, NumPy array or masked column per UDF name, with one value per element
+        :param udf_types: the Clarity type of each UDF, e.g. `types.NUMERIC`. Values are converted to it,
+                          so integers are written as Numeric floats. Fields that don't exist yet are created
+                          with this type, or one inferred from the values.
+        :param commit: if True, send the changed elements to Clarity with batch_update
+        :param chunk_size: elements per batch update when committing. Defaults to `batch_chunk_size`.
+        :param prefetch: retrieve elements that haven't been, in batches, before writing to them
+        :return: the elements that changed
+        :rtype: list[ClarityElement]
+        """
+        elements = list(elements)
+        if prefetch and elements:
+            self.batch_fetch(elements)
+
+        udf_types = dict(udf_types or {})
+        texts_by_udf = {}
+        for name, column in values_by_udf.items():
+            values, mask = columns.column_values(column, len(elements))
+            if name not in udf_types:
+                inferred_type = columns.infer_type(values)
+                if inferred_type is not None:
+                    udf_types[name] = inferred_type
+                texts_by_udf[name] = columns.format_column(values, mask)
+            else:
+                texts_by_udf[name] = columns.format_column(values, mask, udf_types[name])
+
+        changed = []
+        for index, element in enumerate(elements):
+            texts = dict((name, texts[index]) for name, texts in texts_by_udf.items())
+            if columns.write_fields(element, texts, udf_types):
+                changed.append(element)
+
+        if commit:
+            for chunk in self._chunk(changed, chunk_size):
+                self.batch_update(chunk)
+
+        return changed
+
     @property
     def batch_tag(self):
         return re.sub("}.*$", "}details", self.element_class.UNIVERSAL_TAG)
@@ -4,7 +4,7 @@
 import collections
 from six import string_types
 from . import ClarityElement
-from s4.clarity import ETree, types
+from s4.clarity import ETree, types, xmlcodec
 from .lazy_property import lazy_property
 from s4.clarity.types import obj_to_clarity_string, clarity_string_to_obj
 try:
@@ -16,6 +16,7 @@ FIELD_TAG = "{http://genologics.com/ri/userdefined}field"
 
 
 class FieldsMixin(ClarityElement):
+    __slots__ = ("_lazy_fields",)
 
     # most elements put fields in '.', some are in './fields'.
     # must start with "./", or be a single period.
@@ -33,7 +34,7 @@ class FieldsMixin(ClarityElement):
             if fields_node is None:
                 fields_node = self.make_subelement_with_parents(self.FIELDS_XPATH)
 
-        return FieldsDict(fields_node)
+        return FieldsDict(fields_node, self)
 
     def get(self, name, default=None):
         """
@@ -154,13 +155,13 @@ class FieldsMixin(ClarityElement):
 
         if root_node is not None:
             # wipe our fields cache
-            self.__dict__.pop('fields', None)
+            lazy_property.reset(self, 'fields')
 
             # comma decimal mark workaround
             # This works around the Clarity issue with non-english locales, where numeric values from Clarity
             # are output by Clarity with commas as the decimal mark, but Clarity cannot accept them as input.
-            for subnode in root_node.findall(self.FIELDS_XPATH + '/' + FIELD_TAG):
-                if subnode.get('type') == types.NUMERIC:
+            for subnode in xmlcodec.findall(root_node, self.FIELDS_XPATH + '/' + FIELD_TAG):
+                if subnode.get('type') == types.NUMERIC and subnode.text:
                     subnode.text = subnode.text.replace(',', '.')
 
 
@@ -170,18 +171,23 @@ class FieldsDict(MutableMapping):
     :type _root_node: ETree.Element
     """
 
-    def __init__(self, fields_node):
+    __slots__ = ("_real_dict", "_value_cache", "_root_node", "_owner")
+
+    def __init__(self, fields_node, owner=None):
         """
         :type fields_node: ETree.Element
+        :param owner: the element holding the fields, which is marked dirty when a field is set.
+        :type owner: s4.clarity._internal.element.WrappedXml
         """
 
         d = {}
-        for subnode in fields_node.findall('./' + FIELD_TAG):
+        for subnode in xmlcodec.findall(fields_node, './' + FIELD_TAG):
             d[subnode.get("name")] = subnode
 
         self._real_dict = d
         self._value_cache = {}
         self._root_node = fields_node
+        self._owner = owner
 
     def __len__(self):
         return len(self._real_dict)
@@ -198,6 +204,9 @@ class FieldsDict(MutableMapping):
 
         self._value_cache[field_node] = value
 
+        if self._owner is not None:
+            self._owner.mark_dirty()
+
     def _get_or_create_node(self, key):
         """
         Get a field XML node, or create and append it to the XML fields node if it doesn't exist.
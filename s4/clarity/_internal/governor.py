@@ -0,0 +1,167 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import threading
+import time
+
+from s4.clarity._internal.metrics import timer
+
+READS = "reads"
+WRITES = "writes"
+
+# Governors are per process: every LIMS object talking to the same host shares them.
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+class RateLimit(object):
+    """
+    Limits on the requests sent to one Clarity host, for reads or for writes.
+
+    :param float requests_per_second: steady request rate. None for no rate limit.
+    :param int burst: requests that may be sent at once after a quiet spell. Defaults to one second's worth.
+    :param int max_in_flight: requests that may be waiting for a response at the same time. None for no limit.
+    """
+
+    def __init__(self, requests_per_second=None, burst=None, max_in_flight=None):
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.requests_per_second = requests_per_second
+        self.burst = burst or (max(1, int(requests_per_second)) if requests_per_second else None)
+        self.max_in_flight = max_in_flight
+
+
+class _TokenBucket(object):
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = timer()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """
+        Take a token, reserving one ahead of time if none are left.
+
+        :return: seconds to wait before using the token
+        :rtype: float
+        """
+        with self._lock:
+            now = timer()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class RequestGovernor(object):
+    """
+    Applies a RateLimit to requests: use `with governor:` around each request.
+
+    :ivar RateLimit limit:
+    :ivar int waits: requests that had to wait for the rate limit or for a free in-flight slot
+    :ivar float wait_seconds: total time requests spent waiting
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit or RateLimit()
+        self._bucket = _TokenBucket(self.limit.requests_per_second, self.limit.burst) \
+            if self.limit.requests_per_second else None
+        self._slots = threading.BoundedSemaphore(self.limit.max_in_flight) if self.limit.max_in_flight else None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def __enter__(self):
+        start = timer()
+
+        if self._bucket is not None:
+            delay = self._bucket.take()
+            if delay > 0:
+                time.sleep(delay)
+
+        if self._slots is not None:
+            self._slots.acquire()
+
+        waited = timer() - start
+        with self._lock:
+            self.in_flight += 1
+            # anything longer than a lock acquisition counts as a wait
+            if waited > 0.001:
+                self.waits += 1
+                self.wait_seconds += waited
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        with self._lock:
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def stats(self):
+        """
+        :rtype: dict[str, object]
+        """
+        with self._lock:
+            return {"in_flight": self.in_flight, "waits": self.waits, "wait_seconds": self.wait_seconds}
+
+
+# for requests whose caller already holds a governor's slot
+UNGOVERNED = RequestGovernor()
+
+
+def is_read(method, uri):
+    """
+    Reads are GETs, HEADs, OPTIONS and batch retrieves; everything else is a write.
+
+    :type method: str
+    :type uri: str
+    :rtype: bool
+    """
+    method = method.upper()
+    return method in ("GET", "HEAD", "OPTIONS") or (method == "POST" and uri.split("?")[0].endswith("/batch/retrieve"))
+
+
+def governor_for(hostname, kind):
+    """
+    The process-wide governor for reads or writes to a host. Unlimited unless set_rate_limit was called.
+
+    :type hostname: str
+    :param kind: READS or WRITES
+    :rtype: RequestGovernor
+    """
+    with _governors_lock:
+        governor = _governors.get((hostname, kind))
+        if governor is None:
+            governor = _governors[(hostname, kind)] = RequestGovernor()
+        return governor
+
+
+def set_rate_limit(hostname, kind, limit):
+    """
+    Replace the limits on reads or writes to a host, for every LIMS object in the process.
+    Requests already under way finish under the old limits.
+
+    :type hostname: str
+    :param kind: READS or WRITES
+    :type limit: RateLimit
+    """
+    if kind not in (READS, WRITES):
+        raise ValueError("Rate limits apply to '%s' or '%s', not '%s'" % (READS, WRITES, kind))
+
+    with _governors_lock:
+        _governors[(hostname, kind)] = RequestGovernor(limit)
+
+
+def reset():
+    """
+    Remove every host's limits, so that all requests are unlimited again. Mostly for tests,
+    which would otherwise leave process-wide limits behind for each other.
+    """
+    with _governors_lock:
+        _governors.clear()
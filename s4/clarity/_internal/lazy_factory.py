@@ -0,0 +1,74 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import importlib
+
+from .factory import ElementFactory
+
+
+class LazyFactory(object):
+    """
+    A LIMS attribute holding an ElementFactory that is only built, and its element class only
+    imported, the first time the attribute is read. The factory is then kept on the LIMS object.
+
+    :param str module_name: module defining the element class, e.g. "s4.clarity.artifact"
+    :param str class_name: name of the element class, e.g. "Artifact"
+    :param type factory_class: ElementFactory or a subclass of it
+    :param factory_kwargs: passed on to factory_class, e.g. batch_flags or request_path
+    """
+
+    def __init__(self, module_name, class_name, factory_class=ElementFactory, **factory_kwargs):
+        self.module_name = module_name
+        self.class_name = class_name
+        self.factory_class = factory_class
+        self.factory_kwargs = factory_kwargs
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def _attribute_name(self, owner):
+        if self.name is None:
+            # Python 2 has no __set_name__
+            for cls in owner.__mro__:
+                for name, attribute in vars(cls).items():
+                    if attribute is self:
+                        self.name = name
+                        return name
+        return self.name
+
+    def element_class(self):
+        """
+        :rtype: type[s4.clarity._internal.element.ClarityElement]
+        """
+        return getattr(importlib.import_module(self.module_name), self.class_name)
+
+    def __get__(self, lims, owner=None):
+        if lims is None:
+            return self
+
+        name = self._attribute_name(owner or type(lims))
+        with lims._factory_lock:
+            factory = lims.__dict__.get(name)
+            if factory is None:
+                factory = self.factory_class(lims, self.element_class(), **self.factory_kwargs)
+                policy = lims._cache_policies.get(name)
+                if policy is not None:
+                    factory.set_cache_policy(*policy)
+                lims.__dict__[name] = factory
+        return factory
+
+    @classmethod
+    def all(cls, owner):
+        """
+        Every LazyFactory on a class, by attribute name.
+
+        :type owner: type
+        :rtype: dict[str, LazyFactory]
+        """
+        found = {}
+        for klass in reversed(owner.__mro__):
+            for name, attribute in vars(klass).items():
+                if isinstance(attribute, cls):
+                    found[name] = attribute
+        return found
@@ -6,6 +6,9 @@ class lazy_property(object):
     """
     meant to be used for lazy evaluation of an object attribute.
     property should represent non-mutable data, as it replaces itself.
+
+    On classes with __slots__ and no __dict__, the value is kept in a slot named
+    '_lazy_<name>' instead, which the class must declare.
     """
 
     def __init__(self, fget):
@@ -13,10 +16,48 @@ class lazy_property(object):
         self.__doc__ = fget.__doc__
         self.__name__ = fget.__name__
         self.__module__ = fget.__module__
+        self.slot_name = slot_name(fget.__name__)
 
     def __get__(self, obj, cls):
         if obj is None:
             return self
+
+        try:
+            return getattr(obj, self.slot_name)
+        except AttributeError:
+            pass
+
         value = self.fget(obj)
-        setattr(obj, self.__name__, value)
+        try:
+            obj.__dict__[self.__name__] = value
+        except AttributeError:
+            try:
+                setattr(obj, self.slot_name, value)
+            except AttributeError:
+                raise AttributeError("%s has no __dict__ and no '%s' slot for lazy property '%s'" %
+                                     (type(obj).__name__, self.slot_name, self.__name__))
         return value
+
+    @staticmethod
+    def reset(obj, name):
+        """
+        Forget the value of a lazy property, so it is evaluated again on next use.
+
+        :type name: str
+        """
+        if hasattr(obj, "__dict__"):
+            obj.__dict__.pop(name, None)
+        try:
+            delattr(obj, slot_name(name))
+        except AttributeError:
+            pass
+
+
+def slot_name(name):
+    """
+    The slot a lazy_property called name uses on classes without a __dict__.
+
+    :type name: str
+    :rtype: str
+    """
+    return "_lazy_" + name
@@ -0,0 +1,164 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import copy
+import re
+import threading
+import time
+
+from six.moves.urllib.parse import urlparse
+
+# Upper bounds, in seconds, of the request latency histogram buckets. The last bucket is unbounded.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_ID_SEGMENT_RE = re.compile(r'\d')
+
+# Clock used to time requests: Python 2 has no perf_counter.
+timer = getattr(time, "perf_counter", time.time)
+
+
+class EndpointMetrics(object):
+    """
+    Counters for all requests made with one method to one normalized endpoint.
+
+    :ivar int calls:
+    :ivar int errors: number of calls that raised, for any reason
+    :ivar int retries: number of times a failed call was sent again
+    :ivar dict[str, int] errors_by_type: error counts keyed by exception class name
+    :ivar float total_seconds:
+    :ivar float max_seconds:
+    :ivar list[int] latency_histogram: call counts for each of LATENCY_BUCKETS
+    :ivar int request_bytes:
+    :ivar int response_bytes:
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.errors_by_type = {}
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.latency_histogram = [0] * len(LATENCY_BUCKETS)
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    @property
+    def mean_seconds(self):
+        """:type: float"""
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+    def record(self, elapsed_seconds, request_bytes, response_bytes, error=None):
+        self.calls += 1
+        self.total_seconds += elapsed_seconds
+        self.max_seconds = max(self.max_seconds, elapsed_seconds)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+
+        for index, upper_bound in enumerate(LATENCY_BUCKETS):
+            if elapsed_seconds <= upper_bound:
+                self.latency_histogram[index] += 1
+                break
+
+        if error is not None:
+            error_name = type(error).__name__
+            self.errors += 1
+            self.errors_by_type[error_name] = self.errors_by_type.get(error_name, 0) + 1
+
+
+class RequestMetrics(object):
+    """
+    Per-endpoint request instrumentation for a LIMS object, keyed by HTTP method and
+    normalized endpoint. Endpoints are made relative to the LIMS root uri, query strings are
+    dropped, and path segments containing digits (limsids, ids) are replaced with ``{id}``, e.g.
+    ``POST /artifacts/batch/retrieve`` or ``GET /steps/{id}/details``.
+
+    Thread safe, so one registry can be shared by every thread using the LIMS object.
+    """
+
+    def __init__(self, root_uri):
+        """
+        :type root_uri: str
+        """
+        self._root_path = urlparse(root_uri).path.rstrip("/")
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def normalize_endpoint(self, uri):
+        """
+        :type uri: str
+        :rtype: str
+        """
+        path = urlparse(uri).path
+        if self._root_path and path.startswith(self._root_path):
+            path = path[len(self._root_path):]
+
+        segments = [("{id}" if _ID_SEGMENT_RE.search(segment) else segment) for segment in path.split("/")]
+        return "/".join(segments) or "/"
+
+    def record(self, method, uri, elapsed_seconds, request_bytes=0, response_bytes=0, error=None):
+        """
+        :type method: str
+        :type uri: str
+        :type elapsed_seconds: float
+        :type request_bytes: int
+        :type response_bytes: int
+        :param error: the exception raised by the request, if any
+        """
+        with self._lock:
+            self._endpoint(method, uri).record(elapsed_seconds, request_bytes, response_bytes, error)
+
+    def record_retry(self, method, uri):
+        """
+        Count a failed request that is about to be sent again. The failed attempt itself is
+        recorded as a call with an error.
+
+        :type method: str
+        :type uri: str
+        """
+        with self._lock:
+            self._endpoint(method, uri).retries += 1
+
+    def _endpoint(self, method, uri):
+        key = (method.upper(), self.normalize_endpoint(uri))
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = self._endpoints[key] = EndpointMetrics()
+        return endpoint
+
+    def snapshot(self):
+        """
+        A copy of the counters gathered so far.
+
+        :rtype: dict[(str, str), EndpointMetrics]
+        :return: counters keyed by (method, endpoint)
+        """
+        with self._lock:
+            return copy.deepcopy(self._endpoints)
+
+    def reset(self):
+        """
+        Clear all counters.
+        """
+        with self._lock:
+            self._endpoints = {}
+
+    def export_text(self):
+        """
+        Format the counters as a plain text table, slowest endpoints (by total time) first.
+
+        :rtype: str
+        """
+        snapshot = self.snapshot()
+
+        header = "%-7s %-48s %7s %7s %7s %10s %10s %10s %12s %12s" % (
+            "METHOD", "ENDPOINT", "CALLS", "ERRORS", "RETRIES", "TOTAL_S", "MEAN_S", "MAX_S", "SENT_B", "RECEIVED_B")
+        lines = [header]
+
+        for (method, endpoint), metrics in sorted(snapshot.items(), key=lambda item: -item[1].total_seconds):
+            lines.append("%-7s %-48s %7d %7d %7d %10.3f %10.3f %10.3f %12d %12d" % (
+                method, endpoint, metrics.calls, metrics.errors, metrics.retries, metrics.total_seconds,
+                metrics.mean_seconds,
+                metrics.max_seconds, metrics.request_bytes, metrics.response_bytes))
+
+        return "\n".join(lines)
@@ -108,6 +108,8 @@ class attribute_property(_clarity_property):
             string_value = types.obj_to_clarity_string(value)
             instance.xml_root.set(self.property_name, string_value)
 
+        instance.mark_dirty()
+
 
 class subnode_property(_clarity_property):
     """
@@ -233,6 +235,8 @@ class subnode_link(_clarity_property):
             for k, v in attribs.items():
                 node.set(k, v)
 
+        instance.mark_dirty()
+
 
 class subnode_links(_clarity_property):
     """
@@ -324,7 +328,9 @@ class subnode_element(_clarity_property):
         """
 
         # ToDo: This sould be cached so that we return the same object each time otherwise root.sub_element != root.sub_element
-        return self.element_class(instance.lims, instance.get_or_create_subnode(self.property_name))
+        element = self.element_class(instance.lims, instance.get_or_create_subnode(self.property_name))
+        element._dirty_owner = instance
+        return element
 
     def __set__(self, instance, value):
         """
@@ -339,6 +345,7 @@ class subnode_element(_clarity_property):
             instance.xml_root.remove(node)
 
         instance.xml_root.append(value.xml_root)
+        instance.mark_dirty()
 
 
 class subnode_element_list(_clarity_property):
@@ -420,6 +427,7 @@ class subnode_element_list(_clarity_property):
             [instance.xml_root.remove(node) for node in nodes]
 
         [instance.xml_root.append(item.xml_root) for item in value]
+        instance.mark_dirty()
 
 
 class _ClarityWrappedXmlList(MutableSequence):
@@ -456,7 +464,10 @@ class _ClarityWrappedXmlList(MutableSequence):
             return []
 
         sub_nodes = root_element.findall(self._list_property_name)
-        return [self._element_class(self._parent_element.lims, node) for node in sub_nodes]
+        elements = [self._element_class(self._parent_element.lims, node) for node in sub_nodes]
+        for element in elements:
+            element._dirty_owner = self._parent_element
+        return elements
 
     def _ensure_settable(self):
         if self._read_only:
@@ -478,6 +489,7 @@ class _ClarityWrappedXmlList(MutableSequence):
 
         # Remove the element from the in memory list
         del self._inner_list[index]
+        self._parent_element.mark_dirty()
 
     def insert(self, index, value):
         # Verify we can modify this structure
@@ -489,6 +501,7 @@ class _ClarityWrappedXmlList(MutableSequence):
 
         # Insert into the in memory list
         self._inner_list.insert(index, value)
+        self._parent_element.mark_dirty()
 
     def __setitem__(self, index, value):
         # Verify we can modify this structure
@@ -500,6 +513,7 @@ class _ClarityWrappedXmlList(MutableSequence):
 
         # Modify the in memory list
         self._inner_list.__setitem__(index, value)
+        self._parent_element.mark_dirty()
 
     def __getitem__(self, index):
         return self._inner_list.__getitem__(index)
@@ -525,13 +539,19 @@ class _ClarityWrappedXmlList(MutableSequence):
 class _ClarityLiteralDict(MutableMapping):
     """
     :type top_node: ETree.Element
+    :type owner: s4.clarity._internal.element.WrappedXml
     """
 
-    def __init__(self, top_node, subnode_name, name_attribute, value_attribute):
+    def __init__(self, top_node, subnode_name, name_attribute, value_attribute, owner=None):
         self.top_node = top_node
         self.subnode_name = subnode_name
         self.name_attribute = name_attribute
         self.value_attribute = value_attribute
+        self.owner = owner
+
+    def _mark_dirty(self):
+        if self.owner is not None:
+            self.owner.mark_dirty()
 
     def __iter__(self):
         # Return an iterator of all keys, like a dict
@@ -546,12 +566,14 @@ class _ClarityLiteralDict(MutableMapping):
         if node is None:
             raise KeyError
         self.top_node.remove(node)
+        self._mark_dirty()
 
     def __setitem__(self, key, value):
         node = self._node_for(key)
         if node is None:
             node = ETree.SubElement(self.top_node, self.subnode_name, {self.name_attribute: key})
         node.set(self.value_attribute, value)
+        self._mark_dirty()
 
     def __getitem__(self, key):
         node = self._node_for(key)
@@ -607,7 +629,7 @@ class subnode_property_literal_dict(subnode_property):
         if node is None:
             node = ETree.SubElement(instance.xml_root, self.property_name)
 
-        return _ClarityLiteralDict(node, self.subprop_name, self.name_attribute, self.value_attribute)
+        return _ClarityLiteralDict(node, self.subprop_name, self.name_attribute, self.value_attribute, instance)
 
     def __get__(self, instance, owner):
         """
@@ -726,6 +748,7 @@ class subnode_property_dict(subnode_property):
         self._ensure_settable(instance)
 
         self._dict_into_node(instance, value, instance.xml_root, self.property_name)
+        instance.mark_dirty()
 
 
 class subnode_property_list_of_dicts(subnode_property_dict):
@@ -773,6 +796,7 @@ class subnode_property_list_of_dicts(subnode_property_dict):
             parent.remove(matching_node)
 
         self._dict_into_node(instance, the_list, parent, node_name)
+        instance.mark_dirty()
 
 
 def _prop_defining_module():
@@ -0,0 +1,161 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+
+from s4.clarity._internal.metrics import timer
+from s4.clarity.exception import ClarityUnavailableException
+
+log = logging.getLogger(__name__)
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests LIMS.raw_request sends again, and how long it waits first.
+
+    Only requests that are safe to repeat are retried: GET, HEAD, OPTIONS, PUT and DELETE, and
+    POSTs to a batch retrieve endpoint. They are retried when the connection fails or times out,
+    or when Clarity answers with one of retry_statuses. Waits grow exponentially with full jitter,
+    unless the response has a Retry-After header, which is honoured.
+
+    :param int max_retries: retries after the first attempt. 0 turns retrying off.
+    :param float backoff_factor: upper bound, in seconds, of the wait before the first retry. Doubles for each retry.
+    :param float max_backoff: longest wait in seconds, including waits asked for by Retry-After.
+    :param retry_statuses: HTTP status codes worth retrying.
+    """
+
+    IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+    DEFAULT_RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30.0, retry_statuses=DEFAULT_RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def is_retryable_request(self, method, uri):
+        """
+        :type method: str
+        :type uri: str
+        :rtype: bool
+        """
+        method = method.upper()
+        return method in self.IDEMPOTENT_METHODS or (method == "POST" and uri.split("?")[0].endswith("/batch/retrieve"))
+
+    def is_unavailable(self, error, response=None):
+        """
+        True if a failure means Clarity could not be reached or could not serve the request,
+        rather than that the request itself was rejected.
+
+        :type error: Exception
+        :type response: requests.Response
+        :rtype: bool
+        """
+        if response is not None:
+            return response.status_code in self.retry_statuses
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def backoff(self, retry_number, response=None):
+        """
+        Seconds to wait before a retry.
+
+        :param int retry_number: 1 for the first retry
+        :type response: requests.Response
+        :rtype: float
+        """
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+
+        ceiling = min(self.max_backoff, self.backoff_factor * (2 ** (retry_number - 1)))
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def _retry_after(response):
+        if response is None:
+            return None
+
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        parsed = email.utils.parsedate_tz(value)
+        if parsed is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+class CircuitBreaker(object):
+    """
+    Fails requests fast once Clarity looks unavailable, instead of letting every caller wait
+    out its own timeouts and retries.
+
+    After failure_threshold consecutive failures the circuit opens. Every request then raises
+    ClarityUnavailableException at once. After reset_timeout seconds, one trial request is let
+    through. If it succeeds the circuit closes, and if it fails the circuit opens again.
+
+    :param int failure_threshold: consecutive failures that open the circuit. None turns the breaker off.
+    :param float reset_timeout: seconds to wait before letting a trial request through.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before_request(self, uri):
+        """
+        :raises ClarityUnavailableException: if the circuit is open
+        """
+        if self.failure_threshold is None:
+            return
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            if self.state == self.OPEN and timer() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                log.info("Circuit half-open, trying %s", uri)
+                return
+
+            raise ClarityUnavailableException(
+                "Not sending request to %s: Clarity has been unavailable for the last %d requests." % (uri, self.failures))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info("Circuit closed, Clarity is available again.")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        if self.failure_threshold is None:
+            return
+
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    log.warning("Circuit open after %d failures, failing requests for %.1f s.",
+                                self.failures, self.reset_timeout)
+                self.state = self.OPEN
+                self._opened_at = timer()
@@ -26,6 +26,16 @@ class StepFactory(ElementFactory):
 
         return obj
 
+    def _new_from_link_node(self, xml_node):
+        """
+        Override so that process links become steps, as in from_link_node.
+        """
+        limsid = xml_node.get("limsid")
+        if limsid:
+            return self.element_class(self.lims, uri=self.uri + "/" + limsid, name=xml_node.get("name"),
+                                      limsid=limsid)
+        return super(StepFactory, self)._new_from_link_node(xml_node)
+
     def _query_uri_and_tag(self):
         return self.lims.root_uri + "/processes", "process"
 
@@ -1,11 +1,32 @@
 # Copyright 2017 Semaphore Solutions, Inc.
 # ---------------------------------------------------------------------------
 
+import json
+import logging
+import os
+import time
+
+from s4.clarity import ETree, xmlcodec
 from .factory import ElementFactory, NoMatchingElement
 
+log = logging.getLogger(__name__)
+
 
 class UdfFactory(ElementFactory):
-    _udfs_by_attach_to_key = {}
+    """
+    Factory for UDF configurations, with an index of them by what they attach to.
+
+    The index is filled one attach-to key at a time as UDFs are looked up, or all at once by `preload`.
+    """
+
+    # version of the file preload saves, bumped whenever its layout changes
+    PRELOAD_FILE_VERSION = 1
+
+    def __init__(self, *args, **kwargs):
+        super(UdfFactory, self).__init__(*args, **kwargs)
+        self._udfs_by_attach_to_key = {}
+        # True once every UDF is indexed, so a key missing from the index has no UDFs
+        self._preloaded = False
 
     def _query_uri_and_tag(self):
         return self.lims.root_uri + "/configuration/udfs", "udfconfig"
@@ -31,6 +52,9 @@ class UdfFactory(ElementFactory):
     def _get_udfs_by_attach_to_key(self, attach_to_key):
         udfs_for_attach_to_key = self._udfs_by_attach_to_key.get(attach_to_key)
 
+        if udfs_for_attach_to_key is None and self._preloaded:
+            return {}
+
         if not udfs_for_attach_to_key:
             udfs = self.query(prefetch=False,
                               **{"attach-to-name": attach_to_key[0],
@@ -39,3 +63,101 @@ class UdfFactory(ElementFactory):
             self._udfs_by_attach_to_key[attach_to_key] = udfs_for_attach_to_key
 
         return udfs_for_attach_to_key
+
+    def preload(self, prefetch=True, path=None, ttl=3600):
+        """
+        Index every UDF configuration with one paginated query, instead of one query per attach-to key.
+
+        With a path, the index is also saved to that file, and read back from it by later calls
+        (in this process or another) while it is younger than ttl seconds and was made for the same server.
+
+        :param prefetch: retrieve each UDF's full configuration too, such as its precision and presets
+        :param str path: file to keep the index in between processes
+        :param float ttl: seconds a saved index stays valid
+        :return: the number of UDFs indexed
+        :rtype: int
+        """
+        if path is not None:
+            loaded = self._load_preloaded(path, prefetch, ttl)
+            if loaded is not None:
+                return loaded
+
+        entries = []
+        query_uri, tag = self._first_query_uri_and_tag({})
+        while query_uri:
+            links_root = self.lims.request('get', query_uri)
+            for link_node in xmlcodec.findall(links_root, './' + tag):
+                entries.append((self.from_link_node(link_node),
+                                link_node.get("attach-to-name"), link_node.get("attach-to-category")))
+            query_uri = self._next_page_uri(links_root)
+
+        if prefetch:
+            self.batch_fetch([udf for udf, _, _ in entries])
+
+        index = {}
+        for udf, attach_to_name, attach_to_category in entries:
+            if attach_to_name is None:
+                # older servers leave these off the links
+                attach_to_name, attach_to_category = udf.attach_to_name, udf.attach_to_category
+            index.setdefault((attach_to_name, attach_to_category or ""), {})[udf.name] = udf
+
+        self._udfs_by_attach_to_key = index
+        self._preloaded = True
+
+        if path is not None:
+            self._save_preloaded(path, prefetch)
+
+        return len(entries)
+
+    def _save_preloaded(self, path, prefetch):
+        udfs = []
+        for (attach_to_name, attach_to_category), udfs_by_name in self._udfs_by_attach_to_key.items():
+            for udf in udfs_by_name.values():
+                udfs.append({
+                    "uri": udf.uri,
+                    "name": udf.name,
+                    "attach_to_name": attach_to_name,
+                    "attach_to_category": attach_to_category,
+                    "xml": ETree.tostring(udf.xml_root).decode("UTF-8") if prefetch else None,
+                })
+
+        contents = {
+            "version": self.PRELOAD_FILE_VERSION,
+            "root_uri": self.lims.root_uri,
+            "saved_at": time.time(),
+            "prefetched": prefetch,
+            "udfs": udfs,
+        }
+
+        # write then rename, so other processes never read half a file
+        temp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(temp_path, "w") as temp_file:
+            json.dump(contents, temp_file)
+        getattr(os, "replace", os.rename)(temp_path, path)
+
+    def _load_preloaded(self, path, prefetch, ttl):
+        try:
+            with open(path) as saved_file:
+                contents = json.load(saved_file)
+        except (IOError, OSError, ValueError) as e:
+            log.debug("Not using saved UDF index %s: %s", path, e)
+            return None
+
+        if contents.get("version") != self.PRELOAD_FILE_VERSION \
+                or contents.get("root_uri") != self.lims.root_uri \
+                or time.time() - contents.get("saved_at", 0) > ttl \
+                or (prefetch and not contents.get("prefetched")):
+            log.debug("Saved UDF index %s is out of date", path)
+            return None
+
+        index = {}
+        for entry in contents["udfs"]:
+            if entry["xml"] is not None:
+                udf = self._cache_retrieved_nodes([xmlcodec.parse(entry["xml"].encode("UTF-8"))])[entry["uri"]]
+            else:
+                udf = self.get(entry["uri"], name=entry["name"])
+            index.setdefault((entry["attach_to_name"], entry["attach_to_category"]), {})[entry["name"]] = udf
+
+        self._udfs_by_attach_to_key = index
+        self._preloaded = True
+        return len(contents["udfs"])
@@ -0,0 +1,144 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import logging
+from collections import OrderedDict
+
+from .element import ClarityElement
+
+log = logging.getLogger(__name__)
+
+# Factories flushed first, in this order, so that what other elements refer to is written before them.
+# Everything else follows in the order it was first changed.
+DEPENDENCY_ORDER = ("containers", "samples", "artifacts")
+
+
+class UnitOfWork(object):
+    """
+    Collects every element changed while it is active and writes them all when it ends,
+    with as few requests as possible. Use through :meth:`s4.clarity.LIMS.unit_of_work`.
+
+    Writes happen in dependency order:
+
+    - new and changed containers, then samples, then artifacts, then the elements of any other
+      factory, each factory with a single batch create and a single batch update where Clarity allows
+    - elements with no batch endpoint, such as step details, placements and actions, committed one at a time
+    - all Router commits, merged into one routing request
+
+    Nothing is written if the with block raises. Only the thread that entered the unit of work
+    has its changes collected.
+
+    :type lims: LIMS
+    """
+
+    def __init__(self, lims):
+        self.lims = lims
+        self._elements = OrderedDict()
+        self._routers = []
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(self.lims, "_unit_of_work", None)
+        self.lims._unit_of_work = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.lims._unit_of_work = self._previous
+        if exc_type is None:
+            self.flush()
+        else:
+            log.warning("Not writing %d changed elements because of %s", len(self._elements), exc_type.__name__)
+
+    def add(self, element):
+        """
+        Record an element to be written when the unit of work ends. Elements are added automatically
+        when they are changed, so this is only needed for changes made directly to their XML.
+
+        :type element: ClarityElement
+        """
+        if isinstance(element, ClarityElement):
+            self._elements.setdefault(id(element), element)
+
+    def add_router(self, router):
+        """
+        Record a Router whose assignments are to be posted when the unit of work ends.
+        Called by Router.commit while a unit of work is active.
+
+        :type router: s4.clarity.routing.Router
+        """
+        if not any(r is router for r in self._routers):
+            self._routers.append(router)
+
+    @property
+    def pending(self):
+        """
+        The elements that will be written, in the order they were first changed.
+
+        :type: list[ClarityElement]
+        """
+        return [el for el in self._elements.values() if el.uri is None or el.is_dirty]
+
+    def flush(self):
+        """
+        Write everything recorded so far, then start over.
+        """
+        by_factory = OrderedDict()
+        unbatched = []
+
+        for el in self.pending:
+            factory = self.lims._find_factory(type(el))
+            if factory is None:
+                unbatched.append(el)
+            else:
+                by_factory.setdefault(factory, []).append(el)
+
+        for factory in self._factories_in_dependency_order(by_factory):
+            self._flush_factory(factory, by_factory[factory])
+
+        for el in unbatched:
+            el.commit()
+
+        if self._routers:
+            self._flush_routers()
+
+        self._elements.clear()
+        del self._routers[:]
+
+    def _factories_in_dependency_order(self, factories):
+        # only factories already built can have pending elements
+        first = [vars(self.lims).get(name) for name in DEPENDENCY_ORDER]
+        ordered = [f for f in first if f in factories]
+        return ordered + [f for f in factories if f not in ordered]
+
+    def _flush_factory(self, factory, elements):
+        new_elements = [el for el in elements if el.uri is None]
+        changed_elements = [el for el in elements if el.uri is not None]
+
+        if new_elements and not factory.can_batch_create():
+            for el in new_elements:
+                factory.add(el)
+        elif new_elements:
+            created = factory.batch_create(new_elements)
+            for original, new_obj in zip(new_elements, created):
+                # keep the caller's object as the cached element, loading its new state on next use
+                original.uri = new_obj.uri
+                original.invalidate()
+                factory._cache[new_obj.uri] = original
+
+        if changed_elements:
+            if factory.can_batch_update():
+                factory.batch_update(changed_elements, only_dirty=True)
+            else:
+                for el in changed_elements:
+                    el.commit()
+
+    def _flush_routers(self):
+        from s4.clarity.routing import Router
+
+        combined = Router(self.lims)
+        for router in self._routers:
+            for action, routes in router.routing_dict.items():
+                for uri, artifacts in routes.items():
+                    combined.routing_dict[action][uri].update(artifacts)
+
+        combined.commit()
@@ -34,6 +34,8 @@ class Artifact(FieldsMixin, ClarityElement):
     """
     Reference: https://www.genologics.com/files/permanent/API/latest/data_art.html#artifact
     """
+    __slots__ = ("_lazy_parents", "_lazy_demux")
+
     UNIVERSAL_TAG = "{http://genologics.com/ri/artifact}artifact"
 
     type = subnode_property("type")
@@ -0,0 +1,268 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+"""
+An asyncio front end for :class:`s4.clarity.LIMS`. Requires Python 3.7 or later.
+
+Requests are sent by the regular blocking LIMS on a small, fixed pool of threads, so
+hundreds of coroutines can wait on Clarity at once while at most ``max_concurrency``
+requests are actually in flight. Elements come from, and are cached in, the wrapped
+LIMS's own factories, so they are the usual :class:`s4.clarity.ClarityElement` objects.
+
+Example::
+
+    async with AsyncLIMS(root_uri, username, password, max_concurrency=16) as lims:
+        steps = await asyncio.gather(*(lims.steps.get(uri, force_full_get=True) for uri in step_uris))
+
+Only the factory methods are coroutines. Reading a property of an element that has not
+been retrieved yet still makes a blocking request, so fetch elements through the
+async factories first.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from . import xmlcodec
+from .lims import LIMS
+from ._internal.factory import BatchChunkException, ElementFactory
+
+log = logging.getLogger(__name__)
+
+
+class AsyncLIMS(object):
+    """
+    :param str root_uri: Location of the clarity server e.g. (https://<clarity server>/api/v2/)
+    :param str username: Clarity User Name
+    :param str password: Clarity Password
+    :param int max_concurrency: Maximum number of requests in flight at once. Default 8.
+    :param lims_kwargs: Any other :class:`s4.clarity.LIMS` keyword argument.
+
+    :ivar LIMS lims: The blocking LIMS that sends requests and owns the element caches.
+
+    Every factory on the wrapped LIMS (``steps``, ``artifacts``, ``samples``, ...) is available
+    on this object as an :class:`AsyncElementFactory`.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 8
+
+    def __init__(self, root_uri, username, password, max_concurrency=DEFAULT_MAX_CONCURRENCY, **lims_kwargs):
+        lims_kwargs.setdefault("pool_maxsize", max(max_concurrency, LIMS.DEFAULT_POOL_MAXSIZE))
+        self.lims = LIMS(root_uri, username, password, **lims_kwargs)
+        self.max_concurrency = max_concurrency
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphores = {}
+        self._factories = {}
+
+    def __getattr__(self, name):
+        # only reached for names that are not already attributes, i.e. the factories
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        factory = self._factories.get(name)
+        if factory is None:
+            sync_factory = getattr(self.lims, name)
+            if not isinstance(sync_factory, ElementFactory):
+                raise AttributeError("%s has no factory '%s'" % (type(self).__name__, name))
+            factory = AsyncElementFactory(self, sync_factory)
+            self._factories[name] = factory
+        return factory
+
+    @property
+    def root_uri(self):
+        """:type: str"""
+        return self.lims.root_uri
+
+    def _semaphore(self):
+        # an asyncio.Semaphore belongs to the event loop it is first used on
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def request(self, method, uri, xml_root=None):
+        """
+        Coroutine version of :meth:`s4.clarity.LIMS.request`.
+
+        :type method: str
+        :type uri: str
+        :type xml_root: ETree.Element
+        :rtype: ETree.Element
+        :raises ClarityException: if Clarity returns an exception as XML
+        """
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.lims.request, method, uri, xml_root)
+
+    def close(self):
+        """
+        Stop the request threads. Requests still running are allowed to finish.
+        """
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncElementFactory(object):
+    """
+    Coroutine versions of the network methods of an :class:`s4.clarity.ElementFactory`.
+    Elements are cached in the wrapped factory, so the async and blocking APIs can be mixed.
+
+    :type async_lims: AsyncLIMS
+    :type factory: s4.clarity.ElementFactory
+    """
+
+    def __init__(self, async_lims, factory):
+        self.async_lims = async_lims
+        self.factory = factory
+
+    async def get(self, uri, force_full_get=False, name=None, limsid=None):
+        """
+        :rtype: ClarityElement
+        """
+        obj = self.factory.get(uri, name=name, limsid=limsid)
+
+        if force_full_get and not obj.is_fully_retrieved():
+            obj.xml_root = await self.async_lims.request('get', obj.uri)
+
+        return obj
+
+    async def batch_get(self, uris, prefetch=True, chunk_size=None):
+        """
+        Retrieve the elements for a list of uris. Chunks of a batch retrieve, or the individual
+        gets for factories that can't batch, are all requested at the same time.
+
+        :rtype: list[ClarityElement]
+        :raises BatchChunkException: if any chunk of a multi-chunk request fails
+        """
+        uris = list(uris)
+
+        if not uris:
+            return []
+
+        factory = self.factory
+
+        if not factory.can_batch_get():
+            return list(await asyncio.gather(*(self.get(uri, force_full_get=prefetch) for uri in uris)))
+
+        uris_to_query = factory._uris_to_retrieve(uris, prefetch)
+        retrieved = {}
+
+        if uris_to_query:
+            chunks = factory._chunk(uris_to_query, chunk_size)
+            results = await asyncio.gather(*(self._batch_retrieve_chunk(chunk) for chunk in chunks),
+                                           return_exceptions=True)
+
+            failures = {}
+            for index, result in enumerate(results):
+                if isinstance(result, Exception):
+                    failures[index] = result
+                else:
+                    retrieved.update(factory._cache_retrieved_nodes(result))
+
+            if len(chunks) == 1 and failures:
+                raise failures[0]
+            if failures:
+                raise BatchChunkException("batch retrieve", failures, len(chunks))
+
+        return factory._elements_for_uris(uris, retrieved)
+
+    async def _batch_retrieve_chunk(self, uris):
+        factory = self.factory
+        result_root = await self.async_lims.request('post', factory.uri + "/batch/retrieve",
+                                                    factory._batch_retrieve_links(uris))
+        return xmlcodec.findall(result_root, './' + factory.element_class.UNIVERSAL_TAG)
+
+    async def batch_fetch(self, elements):
+        """
+        :rtype: list[ClarityElement]
+        """
+        return await self.batch_get([e.uri for e in elements])
+
+    async def query(self, prefetch=True, **params):
+        """
+        Coroutine version of :meth:`s4.clarity.ElementFactory.query`.
+
+        :rtype: list[ClarityElement]
+        """
+        query_uri, tag = self.factory._first_query_uri_and_tag(params)
+
+        elements = []
+
+        while query_uri:
+            links_root = await self.async_lims.request('get', query_uri)
+
+            elements += self.factory.from_link_nodes(xmlcodec.findall(links_root, './' + tag))
+            query_uri = self.factory._next_page_uri(links_root)
+
+        if prefetch:
+            await self.batch_fetch(elements)
+
+        return elements
+
+    async def batch_update(self, elements, only_dirty=False):
+        """
+        Coroutine version of :meth:`s4.clarity.ElementFactory.batch_update`.
+        """
+        # a list, as the elements are gone through more than once
+        elements = list(elements)
+        if only_dirty:
+            elements = [el for el in elements if el.is_dirty]
+
+        if not elements:
+            return
+
+        factory = self.factory
+
+        if factory.can_batch_update():
+            await self.async_lims.request('post', factory.uri + "/batch/update", factory._batch_details(elements))
+        else:
+            await asyncio.gather(*(self.async_lims.request('post', el.uri, el.xml_root) for el in elements))
+
+        for el in elements:
+            el.mark_clean()
+
+    async def batch_create(self, elements, chunk_size=None):
+        """
+        Coroutine version of :meth:`s4.clarity.ElementFactory.batch_create`. All chunks, or the
+        individual posts for factories that can't batch, are sent at the same time.
+
+        :rtype: list[ClarityElement]
+        :raises BatchChunkException: if any chunk of a multi-chunk request fails
+        """
+        elements = list(elements)
+
+        if not elements:
+            return []
+
+        factory = self.factory
+
+        if not factory.can_batch_create():
+            new_roots = await asyncio.gather(*(self.async_lims.request('post', factory.uri, el.xml_root)
+                                               for el in elements))
+            return [factory._new_from_created_root(xml_root) for xml_root in new_roots]
+
+        chunks = factory._chunk(elements, chunk_size)
+        results = await asyncio.gather(*(self._batch_create_chunk(chunk) for chunk in chunks),
+                                       return_exceptions=True)
+
+        failures = dict((index, result) for index, result in enumerate(results) if isinstance(result, Exception))
+
+        if len(chunks) == 1 and failures:
+            raise failures[0]
+        if failures:
+            results = [None if index in failures else result for index, result in enumerate(results)]
+            raise BatchChunkException("batch create", failures, len(chunks), results)
+
+        return [new_obj for created in results for new_obj in created]
+
+    async def _batch_create_chunk(self, elements):
+        factory = self.factory
+        links = await self.async_lims.request('post', factory.uri + "/batch/create", factory._batch_details(elements))
+        return factory.from_link_nodes(links)
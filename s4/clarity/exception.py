@@ -83,3 +83,10 @@ class ClarityAuthenticationException(ClarityException):
 
 class FileNotFoundException(ClarityException):
     pass
+
+
+class ClarityUnavailableException(ClarityException):
+    """
+    Raised without contacting Clarity, while recent failures show it is unavailable.
+    """
+    pass
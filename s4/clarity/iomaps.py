@@ -3,6 +3,7 @@
 from collections import defaultdict
 
 from ._internal import ClarityElement
+from ._internal.factory import ElementFactory
 
 
 class IOMapsMixin(ClarityElement):
@@ -12,6 +13,9 @@ class IOMapsMixin(ClarityElement):
     https://www.genologics.com/files/permanent/API/latest/rest.version.processes.html#GET
     to prepare a list of inputs and outputs for each step/process.
 
+    The lists are built from the XML the first time one of them is used, and kept in an
+    :class:`IOMapIndex` that is reused when a refresh leaves the input-output maps unchanged.
+
     :ivar list[IOMap] iomaps:
     :ivar list[Artifact] inputs:
     :ivar list[Artifact] outputs:
@@ -23,38 +27,189 @@ class IOMapsMixin(ClarityElement):
     IOMAPS_XPATH = None
     IOMAPS_OUTPUT_TYPE_ATTRIBUTE = None
 
-    def __init__(self, *args, **kwargs):
-        super(IOMapsMixin, self).__init__(*args, **kwargs)
+    _iomap_index = None
+    _iomap_index_stale = True
+
+    @property
+    def iomap_index(self):
+        """
+        :type: IOMapIndex
+        """
+        if self._iomap_index_stale or self._iomap_index is None:
+            io_map_nodes = self.xml_findall(self.IOMAPS_XPATH)
+            links = IOMapIndex.links_from_nodes(io_map_nodes, self.IOMAPS_OUTPUT_TYPE_ATTRIBUTE)
+
+            if self._iomap_index is None or self._iomap_index.links != links:
+                self._iomap_index = IOMapIndex(self.lims.artifacts, io_map_nodes, links,
+                                               self._get_iomaps_shared_result_file_type)
+            self._iomap_index_stale = False
+
+        return self._iomap_index
+
+    @property
+    def iomaps(self):
+        """:type: list[IOMap]"""
+        return self.iomap_index.iomaps
+
+    @property
+    def inputs(self):
+        """:type: list[Artifact]"""
+        return self.iomap_index.inputs
+
+    @property
+    def outputs(self):
+        """:type: list[Artifact]"""
+        return self.iomap_index.outputs
+
+    @property
+    def shared_outputs(self):
+        """:type: list[Artifact]"""
+        return self.iomap_index.shared_outputs
+
+    @property
+    def input_keyed_lookup(self):
+        """:type: dict[Artifact, list[Artifact]]"""
+        return self.iomap_index.input_keyed_lookup
+
+    @property
+    def output_keyed_lookup(self):
+        """:type: dict[Artifact, list[Artifact]]"""
+        return self.iomap_index.output_keyed_lookup
+
+    def is_input(self, artifact):
+        """
+        Faster equivalent of ``artifact in self.inputs``.
+
+        :type artifact: Artifact
+        :rtype: bool
+        """
+        return self.iomap_index.has_input(artifact)
+
+    def is_output(self, artifact):
+        """
+        Faster equivalent of ``artifact in self.outputs``.
+
+        :type artifact: Artifact
+        :rtype: bool
+        """
+        return self.iomap_index.has_output(artifact)
+
+    def _get_iomaps_shared_result_file_type(self):
+        """
+        Get the name of the shared result file type that is used in iomap output link nodes
+        :rtype: str
+        :return: the name
+        """
+        raise Exception("Classes using the IOMapsMixin must override the _get_iomaps_shared_result_file_type method.")
 
-        self.xml_root  # force population of xml_root, which will initialize lists
+    def iomaps_input_keyed(self):
+        """
+        :return: a mapping of input -> outputs.
+        :rtype: dict[Artifact, list[Artifact]]
+        """
+        return self.input_keyed_lookup
 
-    def _init_lists(self):
+    def iomaps_output_keyed(self):
+        """
+        :return: a mapping of output -> inputs.
+        :rtype: dict[Artifact, list[Artifact]]
+        """
+        return self.output_keyed_lookup
+
+    @property
+    def xml_root(self):
+        return super(IOMapsMixin, self).xml_root
+
+    @xml_root.setter
+    def xml_root(self, root_node):
+        super(IOMapsMixin,type(self)).xml_root.__set__(self, root_node)
+
+        # rebuilt on next use, if the input-output maps have changed
+        self._iomap_index_stale = True
+
+
+class IOMapIndex(object):
+    """
+    The input-output maps of a step or process, with the inputs and outputs indexed by limsid and uri.
+
+    :ivar tuple links: (input uri, input limsid, output uri, output limsid, output type, output generation type)
+                       for each input-output map, with the state removed from the uris. Outputs are None
+                       for an input without one.
+    :ivar list[IOMap] iomaps:
+    :ivar list[Artifact] inputs:
+    :ivar list[Artifact] outputs:
+    :ivar list[Artifact] shared_outputs:
+    :ivar dict[Artifact, list[Artifact]] input_keyed_lookup:
+    :ivar dict[Artifact, list[Artifact]] output_keyed_lookup:
+    :ivar dict[str, Artifact] inputs_by_limsid:
+    :ivar dict[str, Artifact] outputs_by_limsid:
+    """
+
+    def __init__(self, artifacts, io_map_nodes, links, get_shared_result_file_type):
+        """
+        :type artifacts: s4.clarity.ElementFactory
+        :type io_map_nodes: list[ETree.Element]
+        :param tuple links: the links of io_map_nodes, from `links_from_nodes`
+        :param get_shared_result_file_type: returns the output type of shared result files;
+                                            only called if an output is generated per all inputs
+        """
+        self.links = links
         self.input_keyed_lookup = {}
         self.output_keyed_lookup = defaultdict(list)
-        self.iomaps = []
-        shared_output_set = set()
-        io_map_nodes = self.xml_findall(self.IOMAPS_XPATH)
-        shared_result_file_type = self._get_iomaps_shared_result_file_type()
-        for io_map_node in io_map_nodes:
+        self.inputs_by_limsid = {}
+        self.outputs_by_limsid = {}
+        self.shared_outputs = []
+        self._input_uris = set()
+        self._output_uris = set()
+
+        shared_output_uris = set()
+        shared_result_file_type = None
+        shared_result_file_type_known = False
 
-            input_artifact, output_artifact, artifact_type, generation_type = self._get_node_artifacts(io_map_node)
+        # Each artifact is resolved once, so that the lookups below always see the same object
+        # for it, even if the factory cache has since dropped it.
+        artifacts_by_uri = {}
+
+        def artifact_for(uri, link_node):
+            artifact = artifacts_by_uri.get(uri)
+            if artifact is None:
+                artifact = artifacts_by_uri[uri] = artifacts.from_link_node(link_node)
+            return artifact
+
+        for io_map_node, link in zip(io_map_nodes, links):
+            input_uri, input_limsid, output_uri, output_limsid, artifact_type, generation_type = link
+            input_artifact = artifact_for(input_uri, io_map_node.find('input'))
 
             # If we have not seen this input yet, store it to the input lookup dict.
             # This step builds up our input artifact list and, if there are no per-artifact outputs
             # this is the only place that inputs are recorded.
-            if input_artifact not in self.input_keyed_lookup:
+            if input_uri not in self._input_uris:
+                self._input_uris.add(input_uri)
                 self.input_keyed_lookup[input_artifact] = []
+                self.inputs_by_limsid[input_limsid] = input_artifact
+
+            if output_uri is None:
+                continue
 
-            if output_artifact is not None:
-                # Remove all shared result files
-                if generation_type == "PerAllInputs" and artifact_type == shared_result_file_type:
-                    shared_output_set.add(output_artifact)
-                else:
-                    # Save the output to its input lookup
-                    self.input_keyed_lookup[input_artifact].append(output_artifact)
+            output_artifact = artifact_for(output_uri, io_map_node.find('output'))
 
-                    # Save the input to the output's lookup
-                    self.output_keyed_lookup[output_artifact].append(input_artifact)
+            if generation_type == "PerAllInputs" and not shared_result_file_type_known:
+                shared_result_file_type = get_shared_result_file_type()
+                shared_result_file_type_known = True
+
+            # Remove all shared result files
+            if generation_type == "PerAllInputs" and artifact_type == shared_result_file_type:
+                if output_uri not in shared_output_uris:
+                    shared_output_uris.add(output_uri)
+                    self.shared_outputs.append(output_artifact)
+            else:
+                # Save the output to its input lookup
+                self.input_keyed_lookup[input_artifact].append(output_artifact)
+
+                # Save the input to the output's lookup
+                self.output_keyed_lookup[output_artifact].append(input_artifact)
+                self._output_uris.add(output_uri)
+                self.outputs_by_limsid[output_limsid] = output_artifact
 
         # If any of the input lists have more than one item we are in a pooling step.
         # There are no steps that will have multiple inputs AND multiple outputs.
@@ -71,64 +226,50 @@ class IOMapsMixin(ClarityElement):
         # Prepare our artifact lists
         self.inputs = list(self.input_keyed_lookup)
         self.outputs = list(self.output_keyed_lookup)
-        self.shared_outputs = list(shared_output_set)
 
-    def _get_iomaps_shared_result_file_type(self):
+    @staticmethod
+    def links_from_nodes(io_map_nodes, output_type_attribute):
         """
-        Get the name of the shared result file type that is used in iomap output link nodes
-        :rtype: str
-        :return: the name
-        """
-        raise Exception("Classes using the IOMapsMixin must override the _get_iomaps_shared_result_file_type method.")
+        Read the links of input-output map nodes, in the form kept in `links`.
 
-    def _get_node_artifacts(self, io_map_node):
+        :type io_map_nodes: list[ETree.Element]
+        :param str output_type_attribute: the output node attribute holding the artifact type
+        :rtype: tuple
         """
-        Returns the input and output artifacts for a io map node as well as the artifact type and generation_type
-        of the output
-        :return :type (Artifact, Artifact, String, String)
-        """
-
-        # There will always be an input artifact
-        input_node = io_map_node.find('input')
-        input_artifact = self.lims.artifacts.from_link_node(input_node)
-
-        output_node = io_map_node.find('output')
-        if output_node is None:
-            return input_artifact, None, None, None
-
-        output_artifact = self.lims.artifacts.from_link_node(output_node)
-
-        artifact_type = output_node.get(self.IOMAPS_OUTPUT_TYPE_ATTRIBUTE)
-
-        generation_type = output_node.get("output-generation-type")
+        links = []
+        for io_map_node in io_map_nodes:
+            # There will always be an input artifact
+            input_uri, input_limsid = _link_uri_and_limsid(io_map_node.find('input'))
 
-        return input_artifact, output_artifact, artifact_type, generation_type
+            output_node = io_map_node.find('output')
+            if output_node is None:
+                links.append((input_uri, input_limsid, None, None, None, None))
+            else:
+                output_uri, output_limsid = _link_uri_and_limsid(output_node)
+                links.append((input_uri, input_limsid, output_uri, output_limsid,
+                              output_node.get(output_type_attribute), output_node.get("output-generation-type")))
+        return tuple(links)
 
-    def iomaps_input_keyed(self):
+    def has_input(self, artifact):
         """
-        :return: a mapping of input -> outputs.
-        :rtype: dict[Artifact, list[Artifact]]
+        :type artifact: Artifact
+        :rtype: bool
         """
-        return self.input_keyed_lookup
+        return artifact.uri in self._input_uris
 
-    def iomaps_output_keyed(self):
-        """
-        :return: a mapping of output -> inputs.
-        :rtype: dict[Artifact, list[Artifact]]
+    def has_output(self, artifact):
         """
-        return self.output_keyed_lookup
+        True if artifact is in `outputs`. Shared outputs are not included.
 
-    @property
-    def xml_root(self):
-        return super(IOMapsMixin, self).xml_root
+        :type artifact: Artifact
+        :rtype: bool
+        """
+        return artifact.uri in self._output_uris
 
-    @xml_root.setter
-    def xml_root(self, root_node):
-        super(IOMapsMixin,type(self)).xml_root.__set__(self, root_node)
 
-        if root_node is not None:
-            # initialize lists from new xml
-            self._init_lists()
+def _link_uri_and_limsid(link_node):
+    uri = ElementFactory._strip_params(link_node.get("uri"))
+    return uri, link_node.get("limsid") or uri.split('/')[-1]
 
 
 class IOMap(object):
@@ -136,6 +277,8 @@ class IOMap(object):
     :ivar inputs: list[Artifact]
     :ivar outputs: list[Artifact]
     """
+    __slots__ = ("inputs", "outputs")
+
     def __init__(self, inputs, outputs):
         self.inputs = inputs
         self.outputs = outputs
@@ -2,31 +2,46 @@
 # ---------------------------------------------------------------------------
 import logging
 import re
+import threading
 import time
+from contextlib import contextmanager
 
 try:
     import urllib.parse as urlparse  # Python 3
 except ImportError:
     import urlparse  # Python 2
 
-from xml.etree import cElementTree as ETree
+from s4.clarity import xmlcodec
+from six import BytesIO, string_types
 
 import requests
 import urllib3
-
-# Ensure Python 2 and 3 compatibility
-from six import BytesIO, b
+from requests.adapters import HTTPAdapter
 
 from s4.clarity._internal.factory import BatchFlags
+from s4.clarity._internal.lazy_factory import LazyFactory
 from s4.clarity._internal.stepfactory import StepFactory, ElementFactory
 from s4.clarity._internal.udffactory import UdfFactory
 from s4.clarity._internal.lazy_property import lazy_property
 from s4.clarity._internal.fakesession import FakeSession
+from s4.clarity._internal.cassette import RecordingSession, RecordingFakeSession, ReplaySession
+from s4.clarity._internal.metrics import RequestMetrics, timer
+from s4.clarity._internal.unit_of_work import UnitOfWork
+from s4.clarity._internal.singleflight import SingleFlight
+from s4.clarity._internal.retry import RetryPolicy, CircuitBreaker
+from s4.clarity._internal import governor
 from .exception import ClarityException
 
 
 log = logging.getLogger(__name__)
 
+try:
+    # Python <2.7.9 has insecure OpenSSL, but that doesn't mean we want to hear about it on every line.
+    # Sometimes disable_warnings doesn't exist.
+    urllib3.disable_warnings(urllib3.exceptions.InsecurePlatformWarning)
+except:
+    pass
+
 
 class LIMS(object):
     """
@@ -36,6 +51,38 @@ class LIMS(object):
     :param bool dry_run: If true, no destructive requests will be made to the Clarity API. Default false.
     :param bool insecure: Disables SSL validation. Default false.
     :param int timeout: Number of seconds to wait for connections and for reads from the Clarity API. Default None, which is no timeout.
+    :param int pool_connections: Number of per-host connection pools to keep. Default 10.
+    :param int pool_maxsize: Maximum number of connections kept open in each pool. Raise this to at least the number
+                             of threads sharing this LIMS object. Default 10.
+    :param bool keep_alive: If false, every request asks Clarity to close its connection. Default true.
+    :param str record_to: Path of a cassette file to save every request and response to. Combine with dry_run to
+                          record a run without writing to Clarity. Use a .gz extension to compress it.
+    :param str replay_from: Path of a cassette file to answer all requests from, instead of contacting Clarity.
+    :param cache_policy: How long each factory keeps elements: "unbounded" (the default), "lru" or "weak".
+                         May be a dict of factory name (e.g. "artifacts") to policy; unlisted factories are unbounded.
+                         See :meth:`s4.clarity.ElementFactory.set_cache_policy`.
+    :param int cache_maxsize: Number of elements an "lru" cache keeps per factory. Default 10000.
+    :param replay_latency: When replaying, seconds to wait before each response, or "recorded" to wait as long as
+                           the recorded request took. Default None, which is no delay.
+    :param RetryPolicy retry_policy: Which failed requests to send again, and how long to wait first.
+                                     Default RetryPolicy(), which retries idempotent requests up to 3 times.
+                                     Use RetryPolicy(max_retries=0) to turn retrying off.
+    :param CircuitBreaker circuit_breaker: Fails requests fast while Clarity is unavailable. Default
+                                           CircuitBreaker(), which opens after 5 consecutive failures.
+                                           Use CircuitBreaker(failure_threshold=None) to turn it off.
+    :param RateLimit read_limit: Rate and in-flight limits for GETs and batch retrieves sent to this LIMS host.
+                                 Limits are kept per hostname and shared by every LIMS object in the process;
+                                 passing one replaces the host's current read limit. Default None, which leaves
+                                 the host's limit as it is (unlimited unless set).
+    :param RateLimit write_limit: As read_limit, for every other request.
+    :param config_cache: Path of an SQLite file to keep a snapshot of Clarity configuration in, so that
+                         protocols, workflows, UDFs, automations, process types and container types are
+                         read from disk instead of Clarity. A ConfigCache, for control over its lifetime,
+                         is also accepted. Default None, for no snapshot.
+    :param bool coalesce_requests: If true, threads making the same GET or batch retrieve at the same time share
+                                   a single request to Clarity. Each still gets its own parsed XML. Default true.
+                                   Streamed requests, which include the batch retrieves made by ElementFactory,
+                                   are never coalesced.
 
     :ivar ElementFactory steps: Factory for :class:`s4.clarity.step.Step`
     :ivar ElementFactory samples: Factory for :class:`s4.clarity.sample.Sample`
@@ -52,12 +99,21 @@ class LIMS(object):
     :ivar ElementFactory researchers: Factory for :class:`s4.clarity.researcher.Researcher`
     :ivar ElementFactory roles: Factory for :class:`s4.clarity.role.Role`
     :ivar ElementFactory permissions: Factory for :class:`s4.clarity.permission.Permission`
+    :ivar ConfigCache config_cache: The configuration snapshot, or None.
+    :ivar RequestMetrics metrics: Call counts, latency, payload sizes and errors for each endpoint requested.
     """
 
     _HOST_RE = re.compile(r'https?://([^/:]+)')
     DEFAULT_TIMEOUT=None
-
-    def __init__(self, root_uri, username, password, dry_run=False, insecure=False, log_requests=False, timeout=DEFAULT_TIMEOUT):
+    DEFAULT_POOL_CONNECTIONS = 10
+    DEFAULT_POOL_MAXSIZE = 10
+    DEFAULT_CACHE_MAXSIZE = 10000
+
+    def __init__(self, root_uri, username, password, dry_run=False, insecure=False, log_requests=False, timeout=DEFAULT_TIMEOUT,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE, keep_alive=True,
+                 record_to=None, replay_from=None, replay_latency=None, cache_policy=None,
+                 cache_maxsize=DEFAULT_CACHE_MAXSIZE, coalesce_requests=True, retry_policy=None,
+                 circuit_breaker=None, read_limit=None, write_limit=None, config_cache=None):
         if root_uri.endswith("/"):
             self.root_uri = root_uri[:-1]  # strip off /
         else:
@@ -82,86 +138,139 @@ class LIMS(object):
         self.password = password
         self.dry_run = dry_run
         self.timeout = timeout
-
-        from .step import Step
-        from .artifact import Artifact
-        from .container import Container
-        from .container import ContainerType
-        from .sample import Sample
-        from .file import File
-        from .project import Project
-        from .control_type import ControlType
-        from .queue import Queue
-        from .reagent_kit import ReagentKit
-        from .reagent_lot import ReagentLot
-        from .reagent_type import ReagentType
-        from .instrument import Instrument
-        from .researcher import Researcher
-        from .role import Role
-        from .permission import Permission
-        from .process import Process
-        from .configuration.stage import Stage
-        from .lab import Lab
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.record_to = record_to
+        self.replay_from = replay_from
+        self.replay_latency = replay_latency
+        self.metrics = RequestMetrics(self.root_uri)
+        # the active unit of work is per thread, so threads sharing this LIMS don't capture each other's writes
+        self._thread_state = threading.local()
+        self.coalesce_requests = coalesce_requests
+        self._single_flight = SingleFlight()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        if isinstance(config_cache, string_types):
+            from s4.clarity._internal.config_cache import ConfigCache
+            config_cache = ConfigCache(self, config_cache)
+        self.config_cache = config_cache
+
+        if read_limit is not None:
+            governor.set_rate_limit(self.hostname, governor.READS, read_limit)
+        if write_limit is not None:
+            governor.set_rate_limit(self.hostname, governor.WRITES, write_limit)
 
         self.factories = {}
+        self._factory_lock = threading.RLock()
+        self._cache_policies = {}
+
+        if cache_policy is not None:
+            self._set_cache_policies(cache_policy, cache_maxsize)
 
-        # there's no need to make these lazy, we are probably using at least a couple of them
-        self.steps = StepFactory(self, Step, batch_flags=BatchFlags.QUERY)
+    # Factories are built, and their element modules imported, the first time they are used.
+    steps = LazyFactory("s4.clarity.step", "Step", StepFactory, batch_flags=BatchFlags.QUERY)
 
-        self.processes = ElementFactory(self, Process, batch_flags=BatchFlags.QUERY, request_path='/processes')
+    processes = LazyFactory("s4.clarity.process", "Process", batch_flags=BatchFlags.QUERY, request_path='/processes')
 
-        self.samples = ElementFactory(self, Sample, batch_flags=BatchFlags.BATCH_ALL)
+    samples = LazyFactory("s4.clarity.sample", "Sample", batch_flags=BatchFlags.BATCH_ALL)
 
-        self.artifacts = ElementFactory(self, Artifact, batch_flags=BatchFlags.BATCH_ALL & ~BatchFlags.BATCH_CREATE)
+    artifacts = LazyFactory("s4.clarity.artifact", "Artifact",
+                            batch_flags=BatchFlags.BATCH_ALL & ~BatchFlags.BATCH_CREATE)
 
-        self.files = ElementFactory(self, File, batch_flags=BatchFlags.BATCH_ALL & ~BatchFlags.BATCH_CREATE)
+    files = LazyFactory("s4.clarity.file", "File", batch_flags=BatchFlags.BATCH_ALL & ~BatchFlags.BATCH_CREATE)
 
-        self.containers = ElementFactory(self, Container, batch_flags=BatchFlags.BATCH_ALL)
+    containers = LazyFactory("s4.clarity.container", "Container", batch_flags=BatchFlags.BATCH_ALL)
 
-        self.container_types = ElementFactory(self, ContainerType, batch_flags=BatchFlags.QUERY)
+    container_types = LazyFactory("s4.clarity.container", "ContainerType", batch_flags=BatchFlags.QUERY)
 
-        self.projects = ElementFactory(self, Project, batch_flags=BatchFlags.QUERY)
+    projects = LazyFactory("s4.clarity.project", "Project", batch_flags=BatchFlags.QUERY)
 
-        self.control_types = ElementFactory(self, ControlType)
+    control_types = LazyFactory("s4.clarity.control_type", "ControlType")
 
-        self.queues = ElementFactory(self, Queue)
+    queues = LazyFactory("s4.clarity.queue", "Queue")
 
-        self.instruments = ElementFactory(self, Instrument, batch_flags=BatchFlags.QUERY)
+    instruments = LazyFactory("s4.clarity.instrument", "Instrument", batch_flags=BatchFlags.QUERY)
 
-        self.reagent_lots = ElementFactory(self, ReagentLot, batch_flags=BatchFlags.QUERY)
+    reagent_lots = LazyFactory("s4.clarity.reagent_lot", "ReagentLot", batch_flags=BatchFlags.QUERY)
 
-        self.reagent_kits = ElementFactory(self, ReagentKit, batch_flags=BatchFlags.QUERY)
+    reagent_kits = LazyFactory("s4.clarity.reagent_kit", "ReagentKit", batch_flags=BatchFlags.QUERY)
 
-        self.reagent_types = ElementFactory(self, ReagentType, batch_flags=BatchFlags.QUERY)
+    reagent_types = LazyFactory("s4.clarity.reagent_type", "ReagentType", batch_flags=BatchFlags.QUERY)
 
-        self.researchers = ElementFactory(self, Researcher, batch_flags=BatchFlags.QUERY)
+    researchers = LazyFactory("s4.clarity.researcher", "Researcher", batch_flags=BatchFlags.QUERY)
 
-        self.labs = ElementFactory(self, Lab, batch_flags=BatchFlags.QUERY)
+    labs = LazyFactory("s4.clarity.lab", "Lab", batch_flags=BatchFlags.QUERY)
 
-        self.roles = ElementFactory(self, Role, batch_flags=BatchFlags.QUERY)
+    roles = LazyFactory("s4.clarity.role", "Role", batch_flags=BatchFlags.QUERY)
 
-        self.permissions = ElementFactory(self, Permission, batch_flags=BatchFlags.QUERY)
+    permissions = LazyFactory("s4.clarity.permission", "Permission", batch_flags=BatchFlags.QUERY)
 
-        # configuration
-        from .configuration import Workflow, Protocol, ProcessType, Udf, ProcessTemplate, Automation, InstrumentType
+    # configuration
+    workflows = LazyFactory("s4.clarity.configuration", "Workflow", batch_flags=BatchFlags.QUERY,
+                            request_path='/configuration/workflows')
+    protocols = LazyFactory("s4.clarity.configuration", "Protocol", batch_flags=BatchFlags.QUERY,
+                            request_path='/configuration/protocols')
+    udfs = LazyFactory("s4.clarity.configuration", "Udf", UdfFactory, batch_flags=BatchFlags.QUERY,
+                       request_path='/configuration/udfs')
+    process_types = LazyFactory("s4.clarity.configuration", "ProcessType", batch_flags=BatchFlags.QUERY,
+                                name_attribute="displayname")
+    process_templates = LazyFactory("s4.clarity.configuration", "ProcessTemplate", batch_flags=BatchFlags.QUERY,
+                                    name_attribute="name")
+    automations = LazyFactory("s4.clarity.configuration", "Automation", batch_flags=BatchFlags.QUERY,
+                              name_attribute="name", request_path="/configuration/automations")
 
-        self.workflows = ElementFactory(self, Workflow, batch_flags=BatchFlags.QUERY,
-                                        request_path='/configuration/workflows')
-        self.protocols = ElementFactory(self, Protocol, batch_flags=BatchFlags.QUERY,
-                                        request_path='/configuration/protocols')
-        self.udfs = UdfFactory(self, Udf, batch_flags=BatchFlags.QUERY,
-                               request_path='/configuration/udfs')
-        self.process_types = ElementFactory(self, ProcessType, batch_flags=BatchFlags.QUERY,
-                                            name_attribute="displayname")
-        self.process_templates = ElementFactory(self, ProcessTemplate, batch_flags=BatchFlags.QUERY,
-                                                name_attribute="name")
-        self.automations = ElementFactory(self, Automation, batch_flags=BatchFlags.QUERY,
-                                          name_attribute="name", request_path="/configuration/automations")
+    instrument_types = LazyFactory("s4.clarity.configuration", "InstrumentType", batch_flags=BatchFlags.QUERY,
+                                   name_attribute="name", request_path="/configuration/instrumenttypes")
 
-        self.instrument_types = ElementFactory(self, InstrumentType, batch_flags=BatchFlags.QUERY,
-                                          name_attribute="name", request_path="/configuration/instrumenttypes")
+    stages = LazyFactory("s4.clarity.configuration.stage", "Stage")
 
-        self.stages = ElementFactory(self, Stage)
+    def _set_cache_policies(self, cache_policy, cache_maxsize):
+        lazy_factories = LazyFactory.all(type(self))
+
+        if isinstance(cache_policy, dict):
+            policies = cache_policy
+        else:
+            policies = dict((name, cache_policy) for name in lazy_factories)
+
+        for factory_name, policy in policies.items():
+            if factory_name not in lazy_factories:
+                raise Exception("No Clarity ElementFactory named '%s'" % factory_name)
+            # applied when the factory is built, or now if it already has been
+            self._cache_policies[factory_name] = (policy, cache_maxsize)
+            factory = self.__dict__.get(factory_name)
+            if factory is not None:
+                factory.set_cache_policy(policy, cache_maxsize)
+
+    @property
+    def _unit_of_work(self):
+        return getattr(self._thread_state, "unit_of_work", None)
+
+    @_unit_of_work.setter
+    def _unit_of_work(self, unit_of_work):
+        self._thread_state.unit_of_work = unit_of_work
+
+    def unit_of_work(self):
+        """
+        A context manager that holds back the writes for every element changed inside it, then sends
+        them together when it exits: one batch create and one batch update per factory where Clarity
+        allows, in dependency order (containers before samples, samples before artifacts and placements,
+        all routing last). Router commits made inside it are merged into a single routing request.
+
+        Calling commit() on an element inside the unit of work still writes it immediately.
+        Nothing is written if the block raises. Only changes made on the thread that entered the
+        unit of work are collected; other threads using this LIMS write as usual.
+
+        Usage::
+
+            with lims.unit_of_work():
+                for artifact in step.details.outputs:
+                    artifact["Concentration"] = 1.5
+                router.commit()
+
+        :rtype: s4.clarity._internal.unit_of_work.UnitOfWork
+        """
+        return UnitOfWork(self)
 
     def factory_for(self, element_type):
         """
@@ -170,16 +279,44 @@ class LIMS(object):
         """
         factory = self.factories.get(element_type)
 
+        if factory is None:
+            factory = self._find_factory(element_type)
+
         if factory is None:
             raise Exception("No Clarity ElementFactory for type %s" % element_type.__name__)
 
         return factory
 
+    def _find_factory(self, element_type):
+        """
+        The factory for element_type, building it if it hasn't been used yet.
+
+        :type element_type: type[ClarityElement]
+        :rtype: ElementFactory|None
+        """
+        factory = self.factories.get(element_type)
+        if factory is not None:
+            return factory
+
+        for name, lazy_factory in LazyFactory.all(type(self)).items():
+            if lazy_factory.class_name == element_type.__name__ and lazy_factory.element_class() is element_type:
+                return getattr(self, name)
+        return None
+
     @lazy_property
     def _session(self):
-        if self.dry_run:
+        if self.replay_from:
+            log.info("LIMS replay. All responses will come from %s.", self.replay_from)
+            s = ReplaySession(self.replay_from, latency=self.replay_latency)
+        elif self.dry_run:
             log.info("LIMS dry run. No destructive requests will be sent to real LIMS.")
-            s = FakeSession()
+            if self.record_to:
+                s = RecordingFakeSession(self.record_to)
+            else:
+                s = FakeSession()
+        elif self.record_to:
+            log.info("LIMS recording. All requests and responses will be saved to %s.", self.record_to)
+            s = RecordingSession(self.record_to)
         else:
             s = requests.Session()
         if self._insecure:
@@ -187,9 +324,58 @@ class LIMS(object):
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
             s.verify = False
 
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        if not self.keep_alive:
+            s.headers["Connection"] = "close"
+
         s.auth = (self.username, self.password)
         return s
 
+    def close(self):
+        """
+        Close the HTTP session, releasing pooled connections and finishing any cassette being recorded.
+        """
+        if "_session" in self.__dict__:
+            self._session.close()
+            del self.__dict__["_session"]
+
+    def rate_limit_stats(self):
+        """
+        In-flight and waiting counts for the process-wide read and write limits on this LIMS host.
+
+        :rtype: dict[str, dict[str, object]]
+        :return: {"reads": {"in_flight": ..., "waits": ..., "wait_seconds": ...}, "writes": {...}}
+        """
+        return dict((kind, governor.governor_for(self.hostname, kind).stats())
+                    for kind in (governor.READS, governor.WRITES))
+
+    def connection_pool_stats(self):
+        """
+        Connection counts for each pool opened by this LIMS object, keyed by "scheme://host:port".
+        A request that did not have to open a new connection (and repeat the TLS handshake) is counted as reused.
+
+        :rtype: dict[str, dict[str, int]]
+        """
+        if "_session" not in self.__dict__:
+            return {}
+
+        stats = {}
+        for adapter in set(self._session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                pool_name = "%s://%s:%s" % (pool.scheme, pool.host, pool.port)
+                stats[pool_name] = {
+                    "connections_created": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "connections_reused": max(pool.num_requests - pool.num_connections, 0),
+                }
+        return stats
+
     def step_from_uri(self, uri):
         """
         :type uri: str
@@ -281,6 +467,17 @@ class LIMS(object):
         version = root.findall(xpath)[0]
         return version.get("minor")
 
+    @staticmethod
+    def _is_idempotent(method, uri):
+        method = method.lower()
+        return method == "get" or (method == "post" and uri.endswith("/batch/retrieve"))
+
+    def _send_xml(self, method, uri, data, streamed=False):
+        kwargs = {"stream": True} if streamed else {}
+        if data is not None:
+            kwargs.update(data=data, headers={'Content-Type': 'application/xml'})
+        return self._raw_request(method, uri, streamed, **kwargs)
+
     def raw_request(self, method, uri, **kwargs):
         """
         :type method: str
@@ -288,7 +485,11 @@ class LIMS(object):
         :raises ClarityException: if Clarity returns an exception as XML
         :rtype: requests.Response
         """
+        return self._raw_request(method, uri, False, **kwargs)
 
+    def _raw_request(self, method, uri, streamed, **kwargs):
+        # A streamed request's caller holds the rate limit slot and records the metrics
+        # once the body has been read; see _streamed_response.
         log.debug("Sending %s %s", method, uri)
 
         if ":ssh/" in uri:
@@ -298,14 +499,72 @@ class LIMS(object):
             real_host = host_match.group(1)
             uri = uri.replace(real_host + ":ssh", "localhost:9080")
             if not self._opened_ssh_tunnel:
-                s4.clarity.utils.ssh.tunnel(real_host, 9080, "glsai")
+                from s4.clarity.utils import ssh
+                ssh.tunnel(real_host, 9080, "glsai")
                 self._opened_ssh_tunnel = True
 
-        response = self._session.request(method, uri, timeout=self.timeout, allow_redirects=False, **kwargs)
+        retries = 0
+        kind = governor.READS if governor.is_read(method, uri) else governor.WRITES
+
+        while True:
+            self.circuit_breaker.before_request(uri)
+
+            request_start_seconds = timer()
+            response = None
+            try:
+                with (governor.UNGOVERNED if streamed else governor.governor_for(self.hostname, kind)):
+                    response = self._session.request(method, uri, timeout=self.timeout, allow_redirects=False,
+                                                     **kwargs)
+
+                # a streamed body is left unread unless it is an error to report
+                if not (streamed and response.status_code < 300):
+                    ClarityException.raise_if_present(response, data=kwargs.get("data"), username=self.username)
+            except Exception as e:
+                self._record_metrics(method, uri, request_start_seconds, kwargs.get("data"), response, e)
+
+                if not self.retry_policy.is_unavailable(e, response):
+                    # Clarity answered, it just didn't like the request
+                    self.circuit_breaker.record_success()
+                    raise
+
+                self.circuit_breaker.record_failure()
+
+                if retries >= self.retry_policy.max_retries or not self.retry_policy.is_retryable_request(method, uri):
+                    raise
+
+                retries += 1
+                delay = self.retry_policy.backoff(retries, response)
+                log.warning("%s %s failed (%s), retry %d of %d in %.2f s", method, uri, e, retries,
+                            self.retry_policy.max_retries, delay)
+                self.metrics.record_retry(method, uri)
+                time.sleep(delay)
+                continue
+
+            self.circuit_breaker.record_success()
+            if not streamed:
+                self._record_metrics(method, uri, request_start_seconds, kwargs.get("data"), response)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Received: %s", response.text)
+            return response
+
+    def _record_metrics(self, method, uri, request_start_seconds, data, response, error=None, response_bytes=None):
+        elapsed_seconds = timer() - request_start_seconds
+
+        if response is not None and response.request is not None and isinstance(response.request.body, (bytes, str)):
+            request_bytes = len(response.request.body)
+        elif isinstance(data, (bytes, str)):
+            request_bytes = len(data)
+        else:
+            request_bytes = 0
 
-        ClarityException.raise_if_present(response, data=kwargs.get("data"), username=self.username)
-        log.debug("Received: %s", response.text)
-        return response
+        if response_bytes is not None:
+            pass
+        elif response is None:
+            response_bytes = 0
+        else:
+            response_bytes = len(response.content or b"")
+
+        self.metrics.record(method, uri, elapsed_seconds, request_bytes, response_bytes, error)
 
     def request(self, method, uri, xml_root=None):
         """
@@ -315,24 +574,114 @@ class LIMS(object):
         :rtype: ETree.Element
         :raises ClarityException: if Clarity returns an exception as XML
         """
-        request_start_seconds = time.perf_counter() if self.log_requests else 0
+        request_start_seconds = timer() if self.log_requests else 0
         if xml_root is None:
-            response = self.raw_request(method, uri)
+            data = None
         else:
-            # Falls back to StringIO and regular string for Python 2
-            outbuffer = BytesIO(b('<?xml version="1.0" encoding="UTF-8"?>\n'))
-            ETree.ElementTree(xml_root).write(outbuffer)
-            outbuffer.seek(0)
-            log.debug("Data for request: %s", outbuffer.read())
-            outbuffer.seek(0)
-            response = self.raw_request(method, uri, data=outbuffer.getvalue(),
-                                        headers={'Content-Type': 'application/xml'})
-            outbuffer.close()
-
-        xml_response_root = ETree.XML(response.content) if response.content else None
+            data = xmlcodec.tostring(xml_root)
+            log.debug("Data for request: %s", data)
+
+        cached = self.config_cache is not None and self.config_cache.covers(uri)
+        content = self.config_cache.get(uri) if cached and method.lower() == "get" else None
+
+        if content is None:
+            if self.coalesce_requests and self._is_idempotent(method, uri):
+                # identical requests already in flight on another thread share its response
+                response = self._single_flight.do((method.lower(), uri, data), self._send_xml, method, uri, data)
+            else:
+                response = self._send_xml(method, uri, data)
+            content = response.content
+
+            if cached:
+                if method.lower() == "get":
+                    if content:
+                        self.config_cache.put(uri, content)
+                else:
+                    self.config_cache.invalidate(uri)
+
+        # parsed separately for every caller, so no two elements share an XML tree
+        xml_response_root = xmlcodec.parse(content) if content else None
 
         if self.log_requests:
-            request_elapsed_seconds = time.perf_counter() - request_start_seconds
+            request_elapsed_seconds = timer() - request_start_seconds
             log.info("clarity request method: '%s' uri: %s took: %.3f s", method, uri, request_elapsed_seconds)
 
         return xml_response_root
+
+    def request_iter(self, method, uri, xml_root=None, tag=None):
+        """
+        Send a request and stream the response, yielding each child of its root element with the
+        given tag as soon as it has been parsed. Children are detached from the response document,
+        so a large batch response never has to be held in memory as one tree.
+
+        The request is sent when iteration starts. Streamed requests are retried and rate limited
+        like any other, holding their in-flight slot until the whole body has been read, but are
+        never coalesced (see coalesce_requests).
+
+        :type method: str
+        :type uri: str
+        :type xml_root: ETree.Element
+        :type tag: str
+        :rtype: collections.Iterable[ETree.Element]
+        :raises ClarityException: if Clarity returns an exception as XML
+        """
+        request_start_seconds = timer() if self.log_requests else 0
+        data = xmlcodec.tostring(xml_root) if xml_root is not None else None
+
+        with self._streamed_response(method, uri, data) as body:
+            if body is not None:
+                for node in xmlcodec.iterchildren(body, tag):
+                    yield node
+
+        if self.log_requests:
+            request_elapsed_seconds = timer() - request_start_seconds
+            log.info("clarity request method: '%s' uri: %s took: %.3f s", method, uri, request_elapsed_seconds)
+
+    @contextmanager
+    def _streamed_response(self, method, uri, data):
+        """
+        Send a streamed request, and give the block a file-like body to read it from, or None if
+        it is empty. The rate limit slot is held, and the request timed, until the block exits.
+        """
+        kind = governor.READS if governor.is_read(method, uri) else governor.WRITES
+
+        with governor.governor_for(self.hostname, kind):
+            request_start_seconds = timer()
+            response = self._send_xml(method, uri, data, streamed=True)
+            if self._is_unread(response):
+                response.raw.decode_content = True
+                body = _CountingReader(response.raw)
+            else:
+                # sessions that build responses themselves set the content up front
+                body = _CountingReader(BytesIO(response.content or b""))
+
+            error = None
+            try:
+                yield body if response.headers.get("Content-Length") != "0" else None
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                response.close()
+                self._record_metrics(method, uri, request_start_seconds, data, response, error,
+                                     response_bytes=body.bytes_read)
+
+    @staticmethod
+    def _is_unread(response):
+        # sessions that build responses themselves set the content up front, and have no raw stream
+        return response.raw is not None and response._content is False and not response._content_consumed
+
+
+class _CountingReader(object):
+    """
+    Wraps a file-like response body, counting the bytes read from it.
+    """
+
+    def __init__(self, source):
+        self._source = source
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = self._source.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
@@ -16,9 +16,16 @@ class Queue(ClarityElement):
         return self.query()
 
     def query(self, prefetch=True, **params):
-        queued_elements = []
+        return list(self.query_iter(prefetch, **params))
 
-        for k in params:
+    def query_iter(self, prefetch=True, page_batch=1, cache=True, **params):
+        """
+        Yields the queued artifacts page by page, rather than building the full list first.
+        See :meth:`s4.clarity.ElementFactory.query_iter` for the meaning of the arguments.
+
+        :rtype: collections.Iterator[QueueArtifact]
+        """
+        for k in list(params):
             if "_" in k:
                 new_k = k.replace("_", "-")
                 params[new_k] = params[k]
@@ -26,24 +33,44 @@ class Queue(ClarityElement):
 
         query_uri = self.uri + "?" + urlencode(params, doseq=True)
 
+        pending_artifacts = []
+        pending_pages = 0
+
         while query_uri is not None:
             next_page_node = self.lims.request("get", query_uri)
-            queued_elements += next_page_node.findall("./artifacts/artifact")
+
+            for node in next_page_node.findall("./artifacts/artifact"):
+                queued_artifact = QueueArtifact(self.lims, node)
+                if not cache:
+                    queued_artifact._artifact = self.lims.artifacts._new_from_link_node(node)
+                pending_artifacts.append(queued_artifact)
+
             next_page_link = next_page_node.find("./next-page")
             if next_page_link is not None:
                 query_uri = next_page_link.get("uri")
             else:
                 query_uri = None
+            pending_pages += 1
 
-        queued_artifacts = [QueueArtifact(self.lims, p) for p in queued_elements]
+            if pending_pages >= page_batch or query_uri is None:
+                if prefetch:
+                    self.lims.artifacts._retrieve_elements(
+                        [queued_artifact.artifact for queued_artifact in pending_artifacts], cache)
 
-        if prefetch:
-            self.lims.artifacts.batch_fetch([queued_artifact.artifact for queued_artifact in queued_artifacts])
+                for queued_artifact in pending_artifacts:
+                    yield queued_artifact
 
-        return queued_artifacts
+                pending_artifacts = []
+                pending_pages = 0
 
 
 class QueueArtifact(WrappedXml):
+    __slots__ = ("_artifact",)
+
+    def __init__(self, lims, xml_root=None):
+        super(QueueArtifact, self).__init__(lims, xml_root)
+        # set when the artifact is kept out of the artifact cache
+        self._artifact = None
 
     @property
     def limsid(self):
@@ -55,6 +82,8 @@ class QueueArtifact(WrappedXml):
 
     @property
     def artifact(self):
+        if self._artifact is not None:
+            return self._artifact
         return self.lims.artifacts.get(uri=self.uri, limsid=self.limsid)
 
     queue_time = subnode_property("queue-time", types.DATETIME)
@@ -75,7 +75,14 @@ class Router(object):
     def commit(self):
         """
         Generates the routing XML for workflow/stage assignment/unassignment and posts it.
+        Inside a LIMS unit of work, the post is made when the unit of work ends, together with
+        any other routing.
         """
+        unit_of_work = getattr(self.lims, "_unit_of_work", None)
+        if unit_of_work is not None:
+            unit_of_work.add_router(self)
+            return
+
         routing_node = self._create_routing_node()
         self.lims.request("post", self.lims.root_uri + "/route/artifacts", routing_node)
 
@@ -80,3 +80,4 @@ class Sample(FieldsMixin, ClarityElement):
 
         # attach container node, which must have the uri
         ETree.SubElement(location_node, 'container', {'uri': container.uri})
+        self.mark_dirty()
@@ -242,6 +242,8 @@ class EPPTimeoutException(EppException):
 
 
 class ArtifactAction(WrappedXml):
+    __slots__ = ("step",)
+
     UNIVERSAL_TAG = "{http://genologics.com/ri/step}actions"
 
     artifact_uri = attribute_property("artifact-uri")
@@ -352,7 +354,9 @@ class StepActions(ClarityElement):
         actions = {}
         for xml_entry in self.xml_findall("./next-actions/next-action"):
             artifact = self.lims.artifacts.get(xml_entry.get("artifact-uri"))
-            actions[artifact] = ArtifactAction(self.lims, self.step, xml_entry)
+            action = ArtifactAction(self.lims, self.step, xml_entry)
+            action._dirty_owner = self
+            actions[artifact] = action
         return actions
 
     def __str__(self):
@@ -518,6 +522,7 @@ class StepPlacements(ClarityElement):
         """
         self.xml_root.remove(self.xml_root.find("./selected-containers"))
         ETree.SubElement(self.xml_root, "selected-containers")
+        self.mark_dirty()
 
     def add_selected_container(self, new_container):
         # type: (Container) -> None
@@ -527,6 +532,7 @@ class StepPlacements(ClarityElement):
 
         selected_containers = self.xml_find("./selected-containers")
         ETree.SubElement(selected_containers, "container", {"uri": new_container.uri})
+        self.mark_dirty()
 
     def clear_placements(self):
         # type: () -> None
@@ -537,6 +543,7 @@ class StepPlacements(ClarityElement):
         """
         self.xml_root.remove(self.xml_root.find("./output-placements"))
         ETree.SubElement(self.xml_root, "output-placements")
+        self.mark_dirty()
 
     def create_placement(self, artifact, container, well_string):
         # type: (Artifact, Container, string) -> None
@@ -555,6 +562,7 @@ class StepPlacements(ClarityElement):
         location_subnode = ETree.SubElement(placement_node, "location")
         ETree.SubElement(location_subnode, "container", {"uri": container.uri})
         ETree.SubElement(location_subnode, "value").text = well_string
+        self.mark_dirty()
 
     def create_placement_with_no_location(self, artifact):
         # type: (Artifact) -> None
@@ -565,6 +573,7 @@ class StepPlacements(ClarityElement):
         """
         placement_root = self.xml_root.find("./output-placements")
         ETree.SubElement(placement_root, "output-placement", {"uri": artifact.uri})
+        self.mark_dirty()
 
     def commit(self):
         # type: () -> None
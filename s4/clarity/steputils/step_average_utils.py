@@ -41,7 +41,7 @@ def compute_average(epp, sourceudf, averageudf, excludeudf, cvudf, outputdilutio
                          iomap.input,
                          iomap.input[averageudf],
                          iomap.input[cvudf])
-    epp.lims.artifacts.batch_update(epp.step.details.inputs)
+    epp.lims.artifacts.batch_update(epp.step.details.inputs, only_dirty=True)
     log.info("Completed average calculation.")
 
 
@@ -70,7 +70,7 @@ def discard_outliers(epp, sourceudf, excludeudf, cvthreshold, madthreshold):
                                  output[sourceudf])
                 else:
                     output[excludeudf] = False
-    epp.lims.artifacts.batch_update(epp.step.details.outputs)
+    epp.lims.artifacts.batch_update(epp.step.details.outputs, only_dirty=True)
     log.info("Completed outlier calculation.")
 
 
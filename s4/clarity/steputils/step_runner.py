@@ -579,7 +579,7 @@ class StepRunner:
         artifact_type = artifact.type
 
         # Input UDFs may be displayed on a step with a ResultFile output, but they can not edited.
-        if artifact in self.step.details.inputs:
+        if self.step.details.is_input(artifact):
             error_partials.append("users are not able to edit UDFs on step inputs")
 
         if not udf_config.is_editable:
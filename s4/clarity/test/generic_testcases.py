@@ -3,7 +3,27 @@
 
 from unittest import TestCase
 
-from s4.clarity import ETree
+import requests
+
+from s4.clarity import ETree, xmlcodec
+
+
+def answer_requests_with(lims, fake_request):
+    """
+    Answer every request lims sends, streamed or not, with fake_request(method, uri, xml_root),
+    which returns the root element of the response, or None for an empty one. Only sending is
+    replaced, so the rest of LIMS request handling still runs.
+    """
+    def send_xml(method, uri, data, streamed=False):
+        response_root = fake_request(method, uri, xmlcodec.parse(data) if data else None)
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = ETree.tostring(response_root) if response_root is not None else b""
+        response.headers["Content-Length"] = str(len(response._content))
+        return response
+
+    lims._send_xml = send_xml
 
 
 class FakeLims:
@@ -0,0 +1,109 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+
+import threading
+
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler
+from six.moves.socketserver import ThreadingMixIn
+from six.moves.BaseHTTPServer import HTTPServer
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = self.path.split("?")[0]
+
+        stand_in = self.server.stand_in
+        stand_in.record(self.command, self.path, body)
+
+        handler = stand_in.routes.get((self.command, path))
+        headers = {}
+        if handler is None:
+            status, content = 404, b""
+        else:
+            result = handler(self.path, body)
+            status, content = result[:2]
+            if len(result) > 2:
+                headers = result[2]
+
+        if not isinstance(content, bytes):
+            content = content.encode("UTF-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = _respond
+    do_POST = _respond
+    do_PUT = _respond
+    do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalClarityServer(object):
+    """
+    A stand-in for a Clarity server, listening on localhost. Register a response for
+    a method and path with `route`; anything unregistered returns a 404.
+
+    Use it as a context manager:
+
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/samples/S1", SAMPLE_XML)
+            lims = LIMS(server.root_uri, "user", "password")
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = _ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        self._server.stand_in = self
+        self._thread = None
+
+    @property
+    def root_uri(self):
+        return "http://127.0.0.1:%d/api/v2" % self._server.server_address[1]
+
+    def route(self, method, path, response, status=200):
+        """
+        :param response: response body, or a callable (path, request_body) -> (status, body)
+                         or (status, body, headers)
+        """
+        if callable(response):
+            self.routes[(method, path)] = response
+        else:
+            self.routes[(method, path)] = lambda request_path, request_body: (status, response)
+
+    def record(self, method, path, body):
+        with self._lock:
+            self.requests.append((method, path, body))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,141 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import gc
+import time
+from unittest import TestCase
+
+from s4.clarity import LIMS
+from s4.clarity._internal.cache import LruElementCache, WeakElementCache, UnboundedElementCache
+from s4.clarity.test.s4.clarity._internal.test_factory import FakeBatchServer, ROOT_URI
+from s4.clarity.test.generic_testcases import answer_requests_with
+
+
+class CachedThing(object):
+
+    def __init__(self, is_dirty=False):
+        self.is_dirty = is_dirty
+
+
+class TestElementCache(TestCase):
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = LruElementCache(2)
+        a, b, c = CachedThing(), CachedThing(), CachedThing()
+        cache["a"] = a
+        cache["b"] = b
+        cache.get("a")
+        cache["c"] = c
+
+        self.assertIs(cache.get("a"), a)
+        self.assertIsNone(cache.get("b"))
+        self.assertIs(cache.get("c"), c)
+        self.assertEqual(cache.stats(), {"size": 2, "hits": 3, "misses": 1, "evictions": 1})
+
+    def test_lru_keeps_dirty_elements(self):
+        cache = LruElementCache(1)
+        dirty = CachedThing(is_dirty=True)
+        cache["dirty"] = dirty
+        cache["clean"] = CachedThing()
+        cache["newest"] = CachedThing()
+
+        self.assertIs(cache.get("dirty"), dirty)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_lru_inserts_into_full_cache_are_constant_time(self):
+        cache = LruElementCache(10000)
+        for i in range(100):
+            cache["dirty-%d" % i] = CachedThing(is_dirty=True)
+        for i in range(10000):
+            cache["first-%d" % i] = CachedThing()
+
+        start = time.time()
+        for i in range(10000):
+            cache["second-%d" % i] = CachedThing()
+
+        # scanning the whole cache on every insert took seconds
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(len(cache), 10000)
+        self.assertEqual(cache.evictions, 10100)
+
+    def test_setdefault_keeps_first_element(self):
+        cache = UnboundedElementCache()
+        first = CachedThing()
+
+        self.assertIs(cache.setdefault("a", first), first)
+        self.assertIs(cache.setdefault("a", CachedThing()), first)
+
+    def test_weak_cache_drops_unreferenced_elements(self):
+        cache = WeakElementCache()
+        kept = CachedThing()
+        cache["kept"] = kept
+        cache["dropped"] = CachedThing()
+        cache["dirty"] = CachedThing(is_dirty=True)
+        gc.collect()
+
+        self.assertIs(cache.get("kept"), kept)
+        self.assertIsNone(cache.get("dropped"))
+        self.assertIsNotNone(cache.get("dirty"))
+
+
+class TestFactoryCachePolicy(TestCase):
+
+    def test_lims_cache_policy_per_factory(self):
+        lims = LIMS(ROOT_URI, "user", "password", cache_policy={"artifacts": "lru"}, cache_maxsize=5)
+
+        self.assertIsInstance(lims.artifacts._cache, LruElementCache)
+        self.assertEqual(lims.artifacts._cache.maxsize, 5)
+        self.assertIsInstance(lims.samples._cache, UnboundedElementCache)
+
+    def test_lims_cache_policy_for_all(self):
+        lims = LIMS(ROOT_URI, "user", "password", cache_policy="weak")
+        self.assertIsInstance(lims.samples._cache, WeakElementCache)
+        self.assertIsInstance(lims.steps._cache, WeakElementCache)
+
+    def test_batch_get_larger_than_cache(self):
+        lims = LIMS(ROOT_URI, "user", "password", cache_policy="lru", cache_maxsize=3)
+        server = FakeBatchServer()
+        answer_requests_with(lims, server.request)
+
+        uris = [ROOT_URI + "/artifacts/2-%d" % i for i in range(10)]
+        artifacts = lims.artifacts.batch_get(uris)
+
+        self.assertEqual([a.uri for a in artifacts], uris)
+        self.assertTrue(all(a.is_fully_retrieved() for a in artifacts))
+        self.assertEqual(lims.artifacts.cache_stats()["size"], 3)
+        self.assertEqual(lims.artifacts.cache_stats()["evictions"], 7)
+
+    def test_lru_drops_elements_once_saved(self):
+        lims = LIMS(ROOT_URI, "user", "password", cache_policy="lru", cache_maxsize=1)
+        dirty = lims.artifacts.get(ROOT_URI + "/artifacts/2-1")
+        dirty.mark_dirty()
+        lims.artifacts.get(ROOT_URI + "/artifacts/2-2")
+
+        self.assertIn(dirty.uri, lims.artifacts._cache)
+
+        dirty.mark_clean()
+        lims.artifacts.get(ROOT_URI + "/artifacts/2-3")
+
+        self.assertNotIn(dirty.uri, lims.artifacts._cache)
+
+    def test_weak_cache_releases_elements_once_saved(self):
+        lims = LIMS(ROOT_URI, "user", "password", cache_policy="weak")
+        uri = ROOT_URI + "/artifacts/2-1"
+        artifact = lims.artifacts.get(uri)
+        artifact.mark_dirty()
+        lims.artifacts.get(uri)
+
+        artifact.mark_clean()
+        del artifact
+        gc.collect()
+
+        self.assertNotIn(uri, lims.artifacts._cache)
+        self.assertEqual(lims.artifacts._cache._pinned, {})
+
+    def test_weak_cache_keeps_elements_made_dirty_after_lookup(self):
+        lims = LIMS(ROOT_URI, "user", "password", cache_policy="weak")
+        uri = ROOT_URI + "/artifacts/2-1"
+        lims.artifacts.get(uri).mark_dirty()
+        gc.collect()
+
+        self.assertIn(uri, lims.artifacts._cache)
@@ -0,0 +1,93 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from s4.clarity import LIMS, ETree
+from s4.clarity._internal.cassette import UnrecordedRequestException
+from s4.clarity.test.local_server import LocalClarityServer
+
+
+def batch_artifacts_xml(path, body):
+    uris = [link.get("uri") for link in ETree.fromstring(body)]
+    artifacts = "".join(ARTIFACT_XML % {"uri": uri, "limsid": uri.split("/")[-1]} for uri in uris)
+    return 200, BATCH_XML % artifacts
+
+
+class TestCassette(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _record(self, cassette_path):
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/samples/S1", SAMPLE_XML)
+            server.route("POST", "/api/v2/artifacts/batch/retrieve", batch_artifacts_xml)
+
+            lims = LIMS(server.root_uri, "user", "password", record_to=cassette_path)
+            sample_name = lims.samples.get(lims.root_uri + "/samples/S1", force_full_get=True).name
+            artifacts = lims.artifacts.batch_get_from_limsids(["2-1", "2-2"])
+            lims.close()
+
+        return lims.root_uri, sample_name, [a.name for a in artifacts]
+
+    def _replay(self, root_uri, cassette_path, **kwargs):
+        lims = LIMS(root_uri, "user", "password", replay_from=cassette_path, **kwargs)
+        sample_name = lims.samples.get(lims.root_uri + "/samples/S1", force_full_get=True).name
+        artifacts = lims.artifacts.batch_get_from_limsids(["2-1", "2-2"])
+        return lims, sample_name, [a.name for a in artifacts]
+
+    def test_record_and_replay(self):
+        cassette_path = os.path.join(self.directory, "run.jsonl")
+        root_uri, sample_name, artifact_names = self._record(cassette_path)
+
+        # the server is gone, everything comes from the cassette
+        lims, replayed_sample_name, replayed_artifact_names = self._replay(root_uri, cassette_path)
+
+        self.assertEqual(replayed_sample_name, sample_name)
+        self.assertEqual(replayed_artifact_names, artifact_names)
+        self.assertEqual(artifact_names, ["Artifact 2-1", "Artifact 2-2"])
+
+        with self.assertRaises(UnrecordedRequestException):
+            lims.artifacts.batch_get_from_limsids(["2-3"])
+
+    def test_compressed_cassette_with_latency(self):
+        cassette_path = os.path.join(self.directory, "run.jsonl.gz")
+        root_uri, sample_name, artifact_names = self._record(cassette_path)
+
+        start = time.time()
+        lims, replayed_sample_name, replayed_artifact_names = self._replay(root_uri, cassette_path,
+                                                                            replay_latency=0.05)
+
+        self.assertGreaterEqual(time.time() - start, 0.1)
+        self.assertEqual(replayed_artifact_names, artifact_names)
+
+    def test_dry_run_recording(self):
+        cassette_path = os.path.join(self.directory, "dry_run.jsonl")
+
+        lims = LIMS("https://qalocal/api/v2", "user", "password", dry_run=True, record_to=cassette_path)
+        lims.raw_request("PUT", lims.root_uri + "/samples/S1", data=b"<smp:sample/>")
+        lims.close()
+
+        lims = LIMS("https://qalocal/api/v2", "user", "password", replay_from=cassette_path)
+        response = lims.raw_request("PUT", lims.root_uri + "/samples/S1", data=b"<smp:sample/>")
+        self.assertEqual(response.content, b"<smp:sample/>")
+
+
+SAMPLE_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<smp:sample xmlns:smp="http://genologics.com/ri/sample" limsid="S1" uri="http://qalocal/api/v2/samples/S1">
+    <name>Sample One</name>
+</smp:sample>
+"""
+
+BATCH_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<art:details xmlns:art="http://genologics.com/ri/artifact">%s</art:details>
+"""
+
+ARTIFACT_XML = """<art:artifact limsid="%(limsid)s" uri="%(uri)s"><name>Artifact %(limsid)s</name></art:artifact>"""
@@ -0,0 +1,110 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from s4.clarity import LIMS
+from s4.clarity._internal.config_cache import ConfigCache
+from s4.clarity.test.local_server import LocalClarityServer
+
+PROTOCOL_PATH = "/api/v2/configuration/protocols/1"
+
+
+class TestConfigCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "config.sqlite")
+        self.server = LocalClarityServer().start()
+        self.server.route("GET", "/api/", versions_xml("21"))
+        self.server.route("GET", PROTOCOL_PATH, PROTOCOL_XML)
+        self.server.route("PUT", PROTOCOL_PATH, PROTOCOL_XML)
+        self.server.route("GET", "/api/v2/artifacts/2-1", ARTIFACT_XML)
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def _lims(self, **kwargs):
+        lims = LIMS(self.server.root_uri, "user", "password")
+        lims.config_cache = ConfigCache(lims, self.path, **kwargs)
+        self.addCleanup(lims.config_cache.close)
+        return lims
+
+    def _requests_for(self, path):
+        return [r for r in self.server.requests if r[1] == path]
+
+    def test_configuration_is_read_from_disk(self):
+        first = self._lims()
+        self.assertEqual(first.protocols.get(first.root_uri + "/configuration/protocols/1").name, "DNA Extraction")
+
+        second = self._lims()
+        self.assertEqual(second.protocols.get(second.root_uri + "/configuration/protocols/1").name, "DNA Extraction")
+
+        self.assertEqual(len(self._requests_for(PROTOCOL_PATH)), 1)
+        # the version was checked once, when the snapshot was made
+        self.assertEqual(len(self._requests_for("/api/")), 1)
+        self.assertEqual(second.config_cache.stats()["hits"], 1)
+
+    def test_other_endpoints_are_not_kept(self):
+        lims = self._lims()
+        for _ in range(2):
+            lims.request("get", lims.root_uri + "/artifacts/2-1")
+
+        self.assertEqual(lims.config_cache.stats()["entries"], 0)
+        self.assertFalse(lims.config_cache.covers(lims.root_uri + "/configuration/protocolsets"))
+
+    def test_new_version_discards_snapshot(self):
+        self._lims().request("get", self.server.root_uri + "/configuration/protocols/1")
+
+        self.server.route("GET", "/api/", versions_xml("22"))
+        lims = self._lims(version_check_interval=0)
+        lims.request("get", lims.root_uri + "/configuration/protocols/1")
+
+        self.assertEqual(len(self._requests_for(PROTOCOL_PATH)), 2)
+
+    def test_expired_entries_are_fetched(self):
+        self._lims().request("get", self.server.root_uri + "/configuration/protocols/1")
+        lims = self._lims(ttl=-1)
+        lims.request("get", lims.root_uri + "/configuration/protocols/1")
+
+        self.assertEqual(len(self._requests_for(PROTOCOL_PATH)), 2)
+
+    def test_writes_invalidate(self):
+        lims = self._lims()
+        protocol = lims.protocols.get(lims.root_uri + "/configuration/protocols/1")
+        protocol.commit()
+        lims.request("get", lims.root_uri + "/configuration/protocols/1")
+
+        self.assertEqual(len(self._requests_for(PROTOCOL_PATH)), 3)
+
+
+    def test_path_argument(self):
+        lims = LIMS(self.server.root_uri, "user", "password", config_cache=self.path)
+        self.addCleanup(lims.config_cache.close)
+
+        self.assertEqual(lims.config_cache.path, self.path)
+
+
+def versions_xml(minor_version):
+    return """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<ver:versions xmlns:ver="http://genologics.com/ri/version">
+    <version uri="http://127.0.0.1/api/v2" major="v2" minor="%s"/>
+</ver:versions>
+""" % minor_version
+
+
+PROTOCOL_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<protcnf:protocol xmlns:protcnf="http://genologics.com/ri/protocolconfiguration"
+    uri="http://127.0.0.1/api/v2/configuration/protocols/1" index="1" name="DNA Extraction">
+    <steps/>
+</protcnf:protocol>
+"""
+
+ARTIFACT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<art:artifact xmlns:art="http://genologics.com/ri/artifact" uri="http://127.0.0.1/api/v2/artifacts/2-1" limsid="2-1">
+    <name>Artifact 2-1</name>
+</art:artifact>
+"""
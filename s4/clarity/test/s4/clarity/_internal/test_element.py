@@ -1,4 +1,13 @@
+import weakref
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from s4.clarity import ETree
 from s4.clarity._internal import WrappedXml
+from s4.clarity.artifact import Artifact
+from s4.clarity.container import ContainerType
 from s4.clarity.test.generic_testcases import LimsTestCase
 
 
@@ -19,8 +28,103 @@ class TestElement(LimsTestCase):
         samples.set_subnode_text(INNER_NODE_NAME, None)
         self.assertEqual(samples.xml.decode(), EMPTY_INNER_NODE)
 
+    def test_subnode_helpers_mark_dirty(self):
+        samples = self.element_from_xml(WrappedXml, ONE_INNER_NODE_XML)
+        self.assertFalse(samples.is_dirty)
+
+        samples.remove_subnode("missing_node")
+        self.assertFalse(samples.is_dirty)
+
+        samples.set_subnode_text(INNER_NODE_NAME, "second value")
+        self.assertTrue(samples.is_dirty)
+
+        samples.mark_clean()
+        self.assertFalse(samples.is_dirty)
+
+    def test_element_dirty_tracking(self):
+        artifact = self.element_from_xml(Artifact, ARTIFACT_XML)
+        self.assertFalse(artifact.is_dirty)
+
+        # reading does not make the element dirty
+        artifact.name
+        artifact.location_value
+        artifact.get("Concentration")
+        self.assertFalse(artifact.is_dirty)
+
+        artifact["Concentration"] = 12.5
+        self.assertTrue(artifact.is_dirty)
+
+        # new XML from Clarity is clean
+        artifact.xml_root = ETree.fromstring(ARTIFACT_XML)
+        self.assertFalse(artifact.is_dirty)
+
+        artifact.qc = True
+        self.assertTrue(artifact.is_dirty)
+
+    def test_sub_element_marks_owner_dirty(self):
+        container_type = self.element_from_xml(ContainerType, CONTAINER_TYPE_XML)
+        x_dimension = container_type.x_dimension
+        self.assertFalse(container_type.is_dirty)
+
+        x_dimension.size = 12
+        self.assertTrue(x_dimension.is_dirty)
+        self.assertTrue(container_type.is_dirty)
+
+    def test_commit_if_dirty(self):
+        artifact = self.element_from_xml(Artifact, ARTIFACT_XML)
+
+        with patch.object(Artifact, "commit") as commit:
+            self.assertFalse(artifact.commit_if_dirty())
+            artifact.name = "Renamed"
+            self.assertTrue(artifact.commit_if_dirty())
+
+        self.assertEqual(commit.call_count, 1)
+
+    def test_artifacts_are_compact(self):
+        artifact = self.element_from_xml(Artifact, ARTIFACT_XML)
+
+        self.assertFalse(hasattr(artifact, "__dict__"))
+        self.assertIs(weakref.ref(artifact)(), artifact)
+
+        # lazy properties are kept in slots, and reset when the XML is replaced
+        self.assertEqual(artifact.limsid, "2-1")
+        fields = artifact.fields
+        self.assertIs(artifact.fields, fields)
+        artifact.xml_root = ETree.fromstring(ARTIFACT_XML)
+        self.assertIsNot(artifact.fields, fields)
+
+    def test_subclasses_keep_a_dict(self):
+        class AnnotatedArtifact(Artifact):
+            pass
+
+        artifact = self.element_from_xml(AnnotatedArtifact, ARTIFACT_XML)
+        artifact.note = "kept"
+        self.assertEqual(artifact.note, "kept")
+        self.assertEqual(artifact.limsid, "2-1")
+
 INNER_NODE_NAME = "inner_node"
 EMPTY_ELEMENT_XML = """<empty_element></empty_element>"""
 ONE_INNER_NODE_XML = """<empty_element><inner_node>first value</inner_node></empty_element>"""
 SECOND_INNER_NODE_XML = """<empty_element><inner_node>second value</inner_node></empty_element>"""
-EMPTY_INNER_NODE = "<empty_element><inner_node /></empty_element>"
\ No newline at end of file
+EMPTY_INNER_NODE = "<empty_element><inner_node /></empty_element>"
+
+ARTIFACT_XML = """<art:artifact xmlns:udf="http://genologics.com/ri/userdefined" xmlns:art="http://genologics.com/ri/artifact"
+    uri="https://qalocal/api/v2/artifacts/2-1" limsid="2-1">
+    <name>Artifact 2-1</name>
+    <type>Analyte</type>
+    <qc-flag>UNKNOWN</qc-flag>
+    <location>
+        <container uri="https://qalocal/api/v2/containers/27-1" limsid="27-1"/>
+        <value>A:1</value>
+    </location>
+    <udf:field type="Numeric" name="Concentration">10</udf:field>
+</art:artifact>
+"""
+
+CONTAINER_TYPE_XML = """<ctp:container-type xmlns:ctp="http://genologics.com/ri/containertype"
+    uri="https://qalocal/api/v2/containertypes/1" name="96 well plate">
+    <is-tube>false</is-tube>
+    <x-dimension><is-alpha>false</is-alpha><offset>1</offset><size>8</size></x-dimension>
+    <y-dimension><is-alpha>true</is-alpha><offset>0</offset><size>12</size></y-dimension>
+</ctp:container-type>
+"""
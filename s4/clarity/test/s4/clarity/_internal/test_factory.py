@@ -0,0 +1,439 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import threading
+import time
+from unittest import TestCase, skipIf
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from s4.clarity import LIMS, ETree, ClarityException, types
+from s4.clarity._internal import columns, factory
+from s4.clarity._internal.factory import BatchChunkException
+from s4.clarity.artifact import Artifact
+from s4.clarity.test.generic_testcases import answer_requests_with
+
+ROOT_URI = "https://qalocal/api/v2"
+ARTIFACT_TAG = "{http://genologics.com/ri/artifact}artifact"
+PROJECT_TAG = "{http://genologics.com/ri/project}project"
+
+
+class FakeBatchServer(object):
+    """
+    Answers LIMS.request calls for artifact batch endpoints without a network.
+    """
+
+    query_pages = 3
+
+    def __init__(self, fail_on=()):
+        self.requests = []
+        self.fail_on = set(fail_on)
+        self._lock = threading.Lock()
+
+    def request(self, method, uri, xml_root=None):
+        with self._lock:
+            self.requests.append((method, uri, xml_root))
+
+        if uri.endswith("/batch/retrieve"):
+            uris = [link.get("uri") for link in xml_root]
+            if any(u.split("/")[-1] in self.fail_on for u in uris):
+                raise ClarityException("chunk failed")
+            details = ETree.Element("{http://genologics.com/ri/artifact}details")
+            for u in uris:
+                node = ETree.SubElement(details, ARTIFACT_TAG, {"uri": u + "?state=1", "limsid": u.split("/")[-1]})
+                ETree.SubElement(node, "name").text = "Artifact " + u.split("/")[-1]
+            return details
+
+        if uri.endswith("/batch/update"):
+            return None
+
+        if uri.endswith("/batch/create"):
+            names = [node.findtext("name") for node in xml_root]
+            if any(name in self.fail_on for name in names):
+                raise ClarityException("chunk failed")
+            links = ETree.Element("{http://genologics.com/ri}links")
+            for name in names:
+                ETree.SubElement(links, "link", {"uri": uri.rsplit("/batch", 1)[0] + "/" + name, "limsid": name})
+            return links
+
+        if "/artifacts?" in uri:
+            return self.query_page(uri)
+
+        if method == "post" and uri == ROOT_URI + "/projects":
+            # projects can't be batch created, so they are posted one at a time
+            name = xml_root.findtext("name")
+            project = ETree.Element(PROJECT_TAG, {"uri": uri + "/" + name, "limsid": name})
+            ETree.SubElement(project, "name").text = name
+            return project
+
+        raise AssertionError("Unexpected request %s %s" % (method, uri))
+
+    def query_page(self, uri):
+        page = int(uri.split("page=")[1]) if "page=" in uri else 0
+        links = ETree.Element("{http://genologics.com/ri/artifact}artifacts")
+        for i in range(page * 3, page * 3 + 3):
+            ETree.SubElement(links, "artifact", {"uri": ROOT_URI + "/artifacts/2-%d" % i, "limsid": "2-%d" % i})
+        if page < self.query_pages - 1:
+            ETree.SubElement(links, "next-page", {"uri": ROOT_URI + "/artifacts?name=x&page=%d" % (page + 1)})
+        return links
+
+
+class TestFactoryBatchGet(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS(ROOT_URI, "user", "password")
+
+    def _uris(self, count):
+        return [ROOT_URI + "/artifacts/2-%d" % i for i in range(count)]
+
+    def test_single_request_by_default(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+
+        artifacts = self.lims.artifacts.batch_get(self._uris(10))
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual([a.limsid for a in artifacts], ["2-%d" % i for i in range(10)])
+
+    def test_chunked_parallel_requests_keep_order(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+
+        uris = self._uris(25)
+        artifacts = self.lims.artifacts.batch_get(uris, chunk_size=10, max_workers=3)
+
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(sorted(len(r[2]) for r in server.requests), [5, 10, 10])
+        self.assertEqual([a.uri for a in artifacts], uris)
+        self.assertTrue(all(a.is_fully_retrieved() for a in artifacts))
+
+    def test_chunk_failures_are_aggregated(self):
+        server = FakeBatchServer(fail_on=("2-3", "2-25"))
+        answer_requests_with(self.lims, server.request)
+
+        uris = self._uris(30)
+
+        with self.assertRaises(BatchChunkException) as context:
+            self.lims.artifacts.batch_get(uris, chunk_size=10, max_workers=2)
+
+        self.assertEqual(context.exception.failed_chunks, [0, 2])
+        self.assertEqual(context.exception.chunk_count, 3)
+
+        # the chunk that succeeded is cached
+        self.assertTrue(self.lims.artifacts.get(uris[15]).is_fully_retrieved())
+        self.assertFalse(self.lims.artifacts.get(uris[5]).is_fully_retrieved())
+
+    def test_single_chunk_failure_is_not_wrapped(self):
+        server = FakeBatchServer(fail_on=("2-1",))
+        answer_requests_with(self.lims, server.request)
+
+        with self.assertRaises(ClarityException) as context:
+            self.lims.artifacts.batch_get(self._uris(5))
+
+        self.assertNotIsInstance(context.exception, BatchChunkException)
+
+
+class FakeGetServer(object):
+    """
+    Answers single GETs for researchers, counting how many are in flight at once.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, uri, xml_root=None):
+        with self._lock:
+            self.requests.append((method, uri, xml_root))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+
+        node = ETree.Element("{http://genologics.com/ri/researcher}researcher", {"uri": uri})
+        ETree.SubElement(node, "first-name").text = uri.split("/")[-1]
+        return node
+
+
+class TestFactoryGetFallback(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS(ROOT_URI, "user", "password")
+        self.server = FakeGetServer()
+        answer_requests_with(self.lims, self.server.request)
+        self.uris = [ROOT_URI + "/researchers/%d" % i for i in range(12)]
+
+    def test_gets_run_concurrently_in_order(self):
+        researchers = self.lims.researchers.batch_get(self.uris + self.uris[:2], max_workers=4)
+
+        self.assertEqual([r.uri for r in researchers], self.uris + self.uris[:2])
+        self.assertTrue(all(r.is_fully_retrieved() for r in researchers))
+        self.assertEqual(len(self.server.requests), 12)
+        self.assertLessEqual(self.server.max_in_flight, 4)
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_serial_with_one_worker(self):
+        self.lims.researchers.fallback_get_workers = 1
+        self.lims.researchers.batch_get(self.uris)
+        self.assertEqual(self.server.max_in_flight, 1)
+
+    def test_batch_refresh(self):
+        researchers = self.lims.researchers.batch_get(self.uris)
+        del self.server.requests[:]
+
+        self.lims.researchers.batch_refresh(researchers)
+
+        self.assertEqual(len(self.server.requests), 12)
+        self.assertTrue(all(r.is_fully_retrieved() for r in researchers))
+
+
+class TestFactoryBatchUpdate(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS(ROOT_URI, "user", "password")
+        self.server = FakeBatchServer()
+        answer_requests_with(self.lims, self.server.request)
+        self.artifacts = self.lims.artifacts.batch_get([ROOT_URI + "/artifacts/2-%d" % i for i in range(4)])
+        del self.server.requests[:]
+
+    def test_only_dirty(self):
+        self.artifacts[1].name = "Renamed"
+        self.artifacts[3]["Concentration"] = 4.5
+
+        self.lims.artifacts.batch_update(self.artifacts, only_dirty=True)
+
+        details = self.server.requests[0][2]
+        self.assertEqual([node.get("limsid") for node in details], ["2-1", "2-3"])
+        self.assertFalse(any(a.is_dirty for a in self.artifacts))
+
+    def test_nothing_dirty_sends_nothing(self):
+        self.lims.artifacts.batch_update(self.artifacts, only_dirty=True)
+        self.assertEqual(self.server.requests, [])
+
+    def test_all_elements_by_default(self):
+        self.lims.artifacts.batch_update(self.artifacts)
+        self.assertEqual(len(self.server.requests[0][2]), 4)
+
+    def test_generator_elements_are_marked_clean(self):
+        self.artifacts[0].name = "Renamed"
+
+        self.lims.artifacts.batch_update(artifact for artifact in self.artifacts)
+
+        self.assertEqual(len(self.server.requests[0][2]), 4)
+        self.assertFalse(self.artifacts[0].is_dirty)
+
+
+class TestFactoryBatchCreate(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS(ROOT_URI, "user", "password")
+
+    def _new_samples(self, count):
+        return [self.lims.samples.new(name="S%d" % i) for i in range(count)]
+
+    def test_chunked_create_keeps_input_order(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+
+        samples = self.lims.samples.batch_create(self._new_samples(25), chunk_size=10, max_workers=3)
+
+        self.assertEqual(sorted(len(r[2]) for r in server.requests), [5, 10, 10])
+        self.assertEqual([s.limsid for s in samples], ["S%d" % i for i in range(25)])
+
+    def test_failed_chunk_reports_created_chunks(self):
+        server = FakeBatchServer(fail_on=("S12",))
+        answer_requests_with(self.lims, server.request)
+
+        with self.assertRaises(BatchChunkException) as context:
+            self.lims.samples.batch_create(self._new_samples(25), chunk_size=10, max_workers=2)
+
+        self.assertEqual(context.exception.failed_chunks, [1])
+        self.assertEqual(context.exception.succeeded_chunks, [0, 2])
+        self.assertIsNone(context.exception.results[1])
+        self.assertEqual([s.limsid for s in context.exception.results[2]], ["S%d" % i for i in range(20, 25)])
+
+    def test_factory_without_batch_create_posts_each_element(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+
+        projects = [self.lims.projects.new(name="P%d" % i) for i in range(3)]
+        created = self.lims.projects.batch_create(projects)
+
+        self.assertEqual([(r[0], r[1]) for r in server.requests], [("post", ROOT_URI + "/projects")] * 3)
+        self.assertEqual([p.uri for p in created], [ROOT_URI + "/projects/P%d" % i for i in range(3)])
+
+
+class TestFactoryColumns(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS(ROOT_URI, "user", "password")
+        self.artifacts = [
+            self._artifact(1, '<udf:field type="Numeric" name="Concentration">1.5</udf:field>'
+                              '<udf:field type="String" name="Comment">ok</udf:field>'),
+            self._artifact(2, '<udf:field type="Numeric" name="Concentration"></udf:field>'),
+            self._artifact(3, '<udf:field type="Numeric" name="Concentration">3,25</udf:field>'
+                              '<udf:field type="Boolean" name="Pass">true</udf:field>'),
+        ]
+
+    def _artifact(self, number, fields_xml):
+        xml_root = ETree.fromstring(
+            '<art:artifact xmlns:art="http://genologics.com/ri/artifact" '
+            'xmlns:udf="http://genologics.com/ri/userdefined" uri="%s/artifacts/2-%d" limsid="2-%d">'
+            '<name>Artifact %d</name>%s</art:artifact>' % (ROOT_URI, number, number, number, fields_xml))
+        return Artifact(self.lims, xml_root=xml_root)
+
+    def test_udf_and_attribute_columns(self):
+        result = self.lims.artifacts.to_columns(self.artifacts, ["Concentration", "Comment", "Pass", "Missing"],
+                                                attrs=("limsid",), prefetch=False)
+
+        self.assertEqual(list(result["Concentration"].mask), [False, True, False])
+        self.assertEqual(result["Concentration"][0], 1.5)
+        self.assertEqual(result["Concentration"][2], 3.25)
+        self.assertEqual(list(result["Comment"].mask), [False, True, True])
+        self.assertEqual(result["Comment"][0], "ok")
+        self.assertEqual(list(result["Pass"].mask), [True, True, False])
+        self.assertTrue(all(result["Missing"].mask))
+        self.assertEqual(list(result["limsid"]), ["2-1", "2-2", "2-3"])
+
+    def test_unretrieved_elements_are_fetched(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+        artifacts = [self.lims.artifacts.get(ROOT_URI + "/artifacts/2-%d" % i) for i in range(3)]
+
+        result = self.lims.artifacts.to_columns(artifacts, ["Concentration"], attrs=("name",))
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(list(result["name"]), ["Artifact 2-0", "Artifact 2-1", "Artifact 2-2"])
+
+    def test_names_must_not_clash(self):
+        with self.assertRaises(ValueError):
+            self.lims.artifacts.to_columns(self.artifacts, ["name"], attrs=("name",), prefetch=False)
+
+    def test_set_columns(self):
+        comments = columns.MaskedList(["first", None, "third"], [False, False, True])
+
+        changed = self.lims.artifacts.set_columns(
+            self.artifacts, {"Concentration": [1.5, 2, 3.25], "Comment": comments, "Volume": [10, 20, 30]},
+            udf_types={"Concentration": types.NUMERIC}, prefetch=False)
+
+        # the first and third concentrations were already set
+        self.assertEqual(changed, self.artifacts)
+        self.assertEqual(self.artifacts[1]["Concentration"], 2.0)
+        self.assertEqual(self.artifacts[0]["Comment"], "first")
+        self.assertEqual(self.artifacts[1].get_raw("Comment"), "")
+        self.assertNotIn("Comment", self.artifacts[2].fields)
+        self.assertEqual(self.artifacts[2]["Volume"], 30.0)
+        self.assertEqual(self.artifacts[2].fields.get_type("Volume"), types.NUMERIC)
+        self.assertTrue(all(artifact.is_dirty for artifact in self.artifacts))
+
+    def test_set_columns_skips_unchanged_elements(self):
+        changed = self.lims.artifacts.set_columns(self.artifacts, {"Concentration": [1.5, None, 3.25]},
+                                                  udf_types={"Concentration": types.NUMERIC}, prefetch=False)
+
+        self.assertEqual(changed, [])
+        self.assertFalse(any(artifact.is_dirty for artifact in self.artifacts))
+
+    def test_set_columns_commits_in_chunks(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+
+        self.lims.artifacts.set_columns(self.artifacts, {"Dilution": [1, 2, 3]}, commit=True, chunk_size=2,
+                                        prefetch=False)
+
+        updates = [r for r in server.requests if r[1].endswith("/batch/update")]
+        self.assertEqual([len(xml_root) for method, uri, xml_root in updates], [2, 1])
+        self.assertFalse(any(artifact.is_dirty for artifact in self.artifacts))
+
+    def test_set_columns_checks_lengths(self):
+        with self.assertRaises(ValueError):
+            self.lims.artifacts.set_columns(self.artifacts, {"Dilution": [1, 2]}, prefetch=False)
+
+    def test_lists_without_numpy(self):
+        numpy = columns.numpy
+        columns.numpy = None
+        try:
+            column = columns.make_column([1.5, None], [False, True], "Numeric")
+        finally:
+            columns.numpy = numpy
+
+        self.assertEqual(column, [1.5, None])
+        self.assertEqual(column.mask, [False, True])
+
+    @skipIf(columns.numpy is None, "NumPy is not installed")
+    def test_numpy_columns(self):
+        column = columns.make_column([1.5, None], [False, True], "Numeric")
+
+        self.assertEqual(column.dtype, columns.numpy.float64)
+        self.assertEqual(column.sum(), 1.5)
+
+
+class TestFactoryQuery(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS(ROOT_URI, "user", "password")
+
+    def test_pages_are_retrieved_while_paging(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+
+        artifacts = self.lims.artifacts.query(name="x")
+
+        self.assertEqual([a.limsid for a in artifacts], ["2-%d" % i for i in range(9)])
+        self.assertTrue(all(a.is_fully_retrieved() for a in artifacts))
+        # one retrieve per page, each holding that page's elements
+        retrieves = [r for r in server.requests if r[1].endswith("/batch/retrieve")]
+        self.assertEqual(sorted(len(r[2]) for r in retrieves), [3, 3, 3])
+
+    def test_single_page_starts_no_thread(self):
+        server = FakeBatchServer()
+        server.query_pages = 1
+        answer_requests_with(self.lims, server.request)
+
+        with patch.object(factory, "ThreadPoolExecutor", wraps=factory.ThreadPoolExecutor) as executor_class:
+            artifacts = self.lims.artifacts.query(name="x")
+            self.assertFalse(executor_class.called)
+
+            server.query_pages = 3
+            self.lims.artifacts.query(name="x")
+            self.assertEqual(executor_class.call_count, 1)
+
+        self.assertTrue(all(a.is_fully_retrieved() for a in artifacts))
+
+    def test_no_pipelining(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+        self.lims.artifacts.query_prefetch_workers = 0
+
+        artifacts = self.lims.artifacts.query(name="x")
+
+        self.assertEqual([a.limsid for a in artifacts], ["2-%d" % i for i in range(9)])
+        self.assertEqual([r[0] for r in server.requests], ["get", "get", "get", "post"])
+
+    def test_query_iter_yields_pages(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+
+        iterator = self.lims.artifacts.query_iter(page_batch=2, name="x")
+        first = next(iterator)
+
+        # the first two pages have been requested and retrieved, the last has not
+        self.assertEqual([r[0] for r in server.requests], ["get", "get", "post"])
+        self.assertTrue(first.is_fully_retrieved())
+
+        rest = list(iterator)
+        self.assertEqual([a.limsid for a in [first] + rest], ["2-%d" % i for i in range(9)])
+
+    def test_query_iter_without_cache(self):
+        server = FakeBatchServer()
+        answer_requests_with(self.lims, server.request)
+
+        artifacts = list(self.lims.artifacts.query_iter(cache=False, name="x"))
+
+        self.assertEqual(len(artifacts), 9)
+        self.assertTrue(all(a.is_fully_retrieved() for a in artifacts))
+        self.assertEqual(artifacts[4].name, "Artifact 2-4")
+        self.assertEqual(self.lims.artifacts.cache_stats()["size"], 0)
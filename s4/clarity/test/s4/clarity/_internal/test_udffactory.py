@@ -0,0 +1,112 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from s4.clarity import LIMS, ETree
+from s4.clarity._internal.factory import NoMatchingElement
+from s4.clarity.test.generic_testcases import answer_requests_with
+
+ROOT_URI = "https://qalocal/api/v2"
+CONFIGURATION_NS = "http://genologics.com/ri/configuration"
+
+# name, attach-to-name, attach-to-category, precision
+UDFS = [
+    ("Concentration", "Analyte", "", "2"),
+    ("Volume", "Analyte", "", "1"),
+    ("Concentration", "Sample", "", "3"),
+    ("Operator", "Library Prep", "ProcessType", None),
+]
+
+
+class FakeUdfServer(object):
+    """
+    Answers LIMS.request calls for UDF configurations, two to a page.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, uri, xml_root=None):
+        self.requests.append((method, uri))
+
+        if "/configuration/udfs?" in uri:
+            page = int(uri.split("page=")[1]) if "page=" in uri else 0
+            links = ETree.Element("{%s}udfs" % CONFIGURATION_NS)
+            for number in range(page * 2, min(page * 2 + 2, len(UDFS))):
+                name, attach_to_name, attach_to_category, _ = UDFS[number]
+                ETree.SubElement(links, "udfconfig", {"uri": self._uri(number), "name": name,
+                                                      "attach-to-name": attach_to_name,
+                                                      "attach-to-category": attach_to_category})
+            if page * 2 + 2 < len(UDFS):
+                ETree.SubElement(links, "next-page", {"uri": ROOT_URI + "/configuration/udfs?page=%d" % (page + 1)})
+            return links
+
+        number = int(uri.split("/")[-1])
+        name, attach_to_name, attach_to_category, precision = UDFS[number]
+        udf = ETree.Element("{%s}udfconfig" % CONFIGURATION_NS, {"uri": uri, "name": name, "type": "Numeric"})
+        ETree.SubElement(udf, "attach-to-name").text = attach_to_name
+        ETree.SubElement(udf, "attach-to-category").text = attach_to_category
+        if precision is not None:
+            ETree.SubElement(udf, "precision").text = precision
+        return udf
+
+    @staticmethod
+    def _uri(number):
+        return ROOT_URI + "/configuration/udfs/%d" % number
+
+
+class TestUdfFactory(TestCase):
+
+    def setUp(self):
+        self.server = FakeUdfServer()
+        self.lims = LIMS(ROOT_URI, "user", "password")
+        answer_requests_with(self.lims, self.server.request)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_preload_indexes_every_udf(self):
+        self.assertEqual(self.lims.udfs.preload(), len(UDFS))
+        requests_after_preload = len(self.server.requests)
+
+        self.assertEqual(self.lims.udfs.get_by_name("Concentration", ("Analyte", "")).precision, 2)
+        self.assertEqual(self.lims.udfs.get_by_name("Concentration", ("Sample", "")).precision, 3)
+        self.assertEqual(self.lims.udfs.get_by_name("Operator", ("Library Prep", "ProcessType")).uri,
+                         ROOT_URI + "/configuration/udfs/3")
+        with self.assertRaises(NoMatchingElement):
+            self.lims.udfs.get_by_name("Concentration", ("Container", ""))
+
+        self.assertEqual(len(self.server.requests), requests_after_preload)
+
+    def test_index_is_per_lims(self):
+        self.lims.udfs.preload(prefetch=False)
+        other_lims = LIMS("https://other/api/v2", "user", "password")
+
+        self.assertEqual(other_lims.udfs._udfs_by_attach_to_key, {})
+
+    def test_saved_index_is_reused(self):
+        path = os.path.join(self.directory, "udfs.json")
+        self.lims.udfs.preload(path=path)
+
+        lims = LIMS(ROOT_URI, "user", "password")
+        server = FakeUdfServer()
+        answer_requests_with(lims, server.request)
+
+        self.assertEqual(lims.udfs.preload(path=path), len(UDFS))
+        self.assertEqual(lims.udfs.get_by_name("Volume", ("Analyte", "")).precision, 1)
+        self.assertEqual(server.requests, [])
+
+    def test_expired_index_is_refreshed(self):
+        path = os.path.join(self.directory, "udfs.json")
+        self.lims.udfs.preload(path=path)
+
+        lims = LIMS(ROOT_URI, "user", "password")
+        server = FakeUdfServer()
+        answer_requests_with(lims, server.request)
+        lims.udfs.preload(path=path, ttl=-1)
+
+        self.assertTrue(server.requests)
@@ -0,0 +1,112 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import threading
+from unittest import TestCase
+
+from s4.clarity import LIMS
+from s4.clarity.routing import Router
+from s4.clarity.test.s4.clarity._internal.test_factory import FakeBatchServer, ROOT_URI
+from s4.clarity.test.generic_testcases import answer_requests_with
+
+
+class FakeWriteServer(FakeBatchServer):
+
+    def request(self, method, uri, xml_root=None):
+        if uri.endswith("/route/artifacts"):
+            self.requests.append((method, uri, xml_root))
+            return None
+        return super(FakeWriteServer, self).request(method, uri, xml_root)
+
+
+class TestUnitOfWork(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS(ROOT_URI, "user", "password")
+        self.server = FakeWriteServer()
+        answer_requests_with(self.lims, self.server.request)
+        self.artifacts = self.lims.artifacts.batch_get([ROOT_URI + "/artifacts/2-%d" % i for i in range(3)])
+        del self.server.requests[:]
+
+    def test_writes_are_batched_in_dependency_order(self):
+        with self.lims.unit_of_work():
+            self.artifacts[0]["Concentration"] = 1.5
+            self.artifacts[2].name = "Renamed"
+            sample = self.lims.samples.new(name="S1")
+            container = self.lims.containers.new(name="C1")
+
+            first_router = Router(self.lims)
+            first_router.assign(ROOT_URI + "/configuration/workflows/1", self.artifacts[0])
+            first_router.commit()
+            second_router = Router(self.lims)
+            second_router.assign(ROOT_URI + "/configuration/workflows/1/stages/2", self.artifacts[1])
+            second_router.commit()
+
+            self.assertEqual(self.server.requests, [])
+
+        self.assertEqual([uri[len(ROOT_URI):] for method, uri, xml in self.server.requests], [
+            "/containers/batch/create",
+            "/samples/batch/create",
+            "/artifacts/batch/update",
+            "/route/artifacts",
+        ])
+        self.assertEqual([node.get("limsid") for node in self.server.requests[2][2]], ["2-0", "2-2"])
+        self.assertEqual(len(self.server.requests[3][2]), 2)
+
+        self.assertEqual(container.uri, ROOT_URI + "/containers/C1")
+        self.assertIs(self.lims.samples.get(ROOT_URI + "/samples/S1"), sample)
+        self.assertFalse(any(a.is_dirty for a in self.artifacts))
+
+    def test_new_elements_without_batch_create_are_posted(self):
+        with self.lims.unit_of_work():
+            project = self.lims.projects.new(name="P1")
+
+        self.assertEqual([(method, uri) for method, uri, xml in self.server.requests], [("post", ROOT_URI + "/projects")])
+        self.assertEqual(project.uri, ROOT_URI + "/projects/P1")
+        self.assertIs(self.lims.projects.get(ROOT_URI + "/projects/P1"), project)
+
+    def test_nothing_is_written_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.lims.unit_of_work():
+                self.artifacts[0]["Concentration"] = 1.5
+                raise ValueError()
+
+        self.assertEqual(self.server.requests, [])
+        self.assertTrue(self.artifacts[0].is_dirty)
+
+    def test_committed_elements_are_not_written_again(self):
+        with self.lims.unit_of_work() as unit_of_work:
+            self.artifacts[0]["Concentration"] = 1.5
+            self.artifacts[0].mark_clean()
+
+            self.assertEqual(unit_of_work.pending, [])
+
+        self.assertEqual(self.server.requests, [])
+
+    def test_other_threads_are_not_captured(self):
+        entered = threading.Event()
+        other_thread_done = threading.Event()
+
+        def other_thread():
+            entered.wait()
+            self.artifacts[1].name = "Other thread"
+            router = Router(self.lims)
+            router.assign(ROOT_URI + "/configuration/workflows/1", self.artifacts[1])
+            router.commit()
+            other_thread_done.set()
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+
+        with self.assertRaises(ValueError):
+            with self.lims.unit_of_work() as unit_of_work:
+                self.artifacts[0]["Concentration"] = 1.5
+                entered.set()
+                other_thread_done.wait()
+                thread.join()
+
+                self.assertEqual(unit_of_work.pending, [self.artifacts[0]])
+                raise ValueError()
+
+        # the other thread's routing was sent straight away, not discarded with this unit of work
+        self.assertEqual([uri[len(ROOT_URI):] for method, uri, xml in self.server.requests], ["/route/artifacts"])
+        self.assertIsNone(self.lims._unit_of_work)
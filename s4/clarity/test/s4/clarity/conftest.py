@@ -0,0 +1,9 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import sys
+
+collect_ignore = []
+
+if sys.version_info < (3, 7):
+    # AsyncLIMS needs asyncio.get_running_loop, and its tests asyncio.run
+    collect_ignore.append("test_async_lims.py")
@@ -0,0 +1,129 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import asyncio
+import threading
+import time
+from unittest import TestCase
+
+from s4.clarity import ETree
+from s4.clarity.async_lims import AsyncLIMS
+from s4.clarity.test.local_server import LocalClarityServer
+
+
+class ConcurrencyTracker(object):
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, response):
+        def handler(path, body):
+            with self._lock:
+                self.current += 1
+                self.peak = max(self.peak, self.current)
+            time.sleep(0.02)
+            with self._lock:
+                self.current -= 1
+            return 200, response(path, body)
+        return handler
+
+
+def step_xml(path, body):
+    limsid = path.split("/")[-1]
+    return STEP_XML % {"limsid": limsid}
+
+
+def batch_artifacts_xml(path, body):
+    links = ETree.fromstring(body)
+    artifacts = "".join(ARTIFACT_XML % {"uri": link.get("uri"), "limsid": link.get("uri").split("/")[-1]}
+                        for link in links)
+    return BATCH_XML % artifacts
+
+
+def created_project_xml(path, body):
+    name = ETree.fromstring(body).findtext("name")
+    return 201, PROJECT_XML % {"limsid": name}
+
+
+class TestAsyncLims(TestCase):
+
+    def test_gets_are_limited_by_semaphore(self):
+        tracker = ConcurrencyTracker()
+
+        with LocalClarityServer() as server:
+            for i in range(20):
+                server.route("GET", "/api/v2/steps/24-%d" % i, tracker(step_xml))
+
+            async def get_steps(lims):
+                async with lims:
+                    return await asyncio.gather(*(
+                        lims.steps.get(lims.root_uri + "/steps/24-%d" % i, force_full_get=True) for i in range(20)
+                    ))
+
+            lims = AsyncLIMS(server.root_uri, "user", "password", max_concurrency=4)
+            steps = asyncio.run(get_steps(lims))
+
+        self.assertEqual([s.limsid for s in steps], ["24-%d" % i for i in range(20)])
+        self.assertTrue(all(s.is_fully_retrieved() for s in steps))
+        self.assertLessEqual(tracker.peak, 4)
+        self.assertGreater(tracker.peak, 1)
+
+        # elements are shared with the blocking factory cache
+        self.assertIs(lims.lims.steps.get(lims.root_uri + "/steps/24-3"), steps[3])
+
+    def test_chunked_batch_get(self):
+        tracker = ConcurrencyTracker()
+
+        with LocalClarityServer() as server:
+            server.route("POST", "/api/v2/artifacts/batch/retrieve", tracker(batch_artifacts_xml))
+
+            lims = AsyncLIMS(server.root_uri, "user", "password", max_concurrency=3)
+            uris = [lims.root_uri + "/artifacts/2-%d" % i for i in range(10)]
+            artifacts = asyncio.run(lims.artifacts.batch_get(uris, chunk_size=3))
+            lims.close()
+
+            retrieve_requests = [r for r in server.requests if r[1].endswith("/batch/retrieve")]
+
+        self.assertEqual(len(retrieve_requests), 4)
+        self.assertEqual([a.uri for a in artifacts], uris)
+        self.assertEqual(artifacts[7].name, "Artifact 2-7")
+
+    def test_batch_create_without_batch_endpoint(self):
+        with LocalClarityServer() as server:
+            server.route("POST", "/api/v2/projects", created_project_xml)
+
+            lims = AsyncLIMS(server.root_uri, "user", "password")
+            projects = [lims.lims.projects.new(name="P%d" % i) for i in range(3)]
+            created = asyncio.run(lims.projects.batch_create(projects))
+            lims.close()
+
+            paths = [r[1] for r in server.requests]
+
+        self.assertEqual(paths, ["/api/v2/projects"] * 3)
+        self.assertEqual([p.limsid for p in created], ["P0", "P1", "P2"])
+
+    def test_unknown_factory(self):
+        lims = AsyncLIMS("https://qalocal/api/v2", "user", "password")
+        with self.assertRaises(AttributeError):
+            lims.not_a_factory
+        lims.close()
+
+
+STEP_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<stp:step xmlns:stp="http://genologics.com/ri/step" limsid="%(limsid)s" uri="http://qalocal/api/v2/steps/%(limsid)s">
+    <configuration uri="http://qalocal/api/v2/configuration/protocols/1/steps/1">Step</configuration>
+</stp:step>
+"""
+
+BATCH_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<art:details xmlns:art="http://genologics.com/ri/artifact">%s</art:details>
+"""
+
+ARTIFACT_XML = """<art:artifact limsid="%(limsid)s" uri="%(uri)s?state=1"><name>Artifact %(limsid)s</name></art:artifact>"""
+
+PROJECT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<prj:project xmlns:prj="http://genologics.com/ri/project" limsid="%(limsid)s" uri="http://qalocal/api/v2/projects/%(limsid)s">
+    <name>%(limsid)s</name>
+</prj:project>
+"""
@@ -0,0 +1,431 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import threading
+import time
+from unittest import TestCase
+
+import requests
+
+from s4.clarity import LIMS, ClarityException
+from s4.clarity._internal.metrics import RequestMetrics, timer
+from s4.clarity._internal.retry import RetryPolicy, CircuitBreaker
+from s4.clarity._internal import governor
+from s4.clarity._internal.governor import RateLimit
+from s4.clarity.exception import ClarityUnavailableException
+from s4.clarity.test.local_server import LocalClarityServer
+
+
+class TestLimsConnectionPool(TestCase):
+
+    def test_adapter_is_sized(self):
+        lims = LIMS("https://qalocal/api/v2", "user", "password", pool_connections=3, pool_maxsize=20)
+        adapter = lims._session.get_adapter("https://qalocal/api/v2")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 20)
+
+    def test_no_keep_alive(self):
+        lims = LIMS("https://qalocal/api/v2", "user", "password", keep_alive=False)
+        self.assertEqual(lims._session.headers["Connection"], "close")
+
+    def test_no_stats_before_first_request(self):
+        lims = LIMS("https://qalocal/api/v2", "user", "password")
+        self.assertEqual(lims.connection_pool_stats(), {})
+
+    def test_connections_are_reused(self):
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/configuration/properties", PROPERTIES_XML)
+            lims = LIMS(server.root_uri, "user", "password")
+
+            for _ in range(3):
+                lims.request("get", lims.root_uri + "/configuration/properties")
+
+            stats = list(lims.connection_pool_stats().values())
+
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["requests"], 3)
+        self.assertEqual(stats[0]["connections_created"], 1)
+        self.assertEqual(stats[0]["connections_reused"], 2)
+
+
+class TestLimsRequestCoalescing(TestCase):
+
+    def _concurrent_gets(self, coalesce_requests):
+        release = threading.Event()
+
+        def slow_properties(path, body):
+            release.wait(5)
+            return 200, PROPERTIES_XML
+
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/configuration/properties", slow_properties)
+            lims = LIMS(server.root_uri, "user", "password", coalesce_requests=coalesce_requests)
+
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(
+                lims.request("get", lims.root_uri + "/configuration/properties"))) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+
+            # let the requests pile up behind the first
+            deadline = time.time() + 5
+            while lims._single_flight.shared < 4 and len(server.requests) < 5 and time.time() < deadline:
+                time.sleep(0.01)
+            release.set()
+
+            for thread in threads:
+                thread.join()
+
+            return server.requests, results
+
+    def test_identical_gets_share_one_request(self):
+        requests, results = self._concurrent_gets(coalesce_requests=True)
+
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(len(results), 5)
+        # every caller gets its own tree
+        self.assertEqual(len(set(id(r) for r in results)), 5)
+
+    def test_coalescing_can_be_disabled(self):
+        requests, results = self._concurrent_gets(coalesce_requests=False)
+        self.assertEqual(len(requests), 5)
+
+
+def flaky(failures, status=503, headers=None):
+    """
+    A route that fails the first `failures` times it is called, then returns PROPERTIES_XML.
+    """
+    calls = []
+
+    def respond(path, body):
+        calls.append(path)
+        if len(calls) <= failures:
+            return status, "", headers or {}
+        return 200, PROPERTIES_XML
+
+    return respond
+
+
+class TestLimsRetry(TestCase):
+
+    def _lims(self, server, **kwargs):
+        return LIMS(server.root_uri, "user", "password",
+                    retry_policy=RetryPolicy(max_retries=2, backoff_factor=0.01), **kwargs)
+
+    def test_get_is_retried(self):
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/configuration/properties", flaky(2))
+            lims = self._lims(server)
+
+            lims.request("get", lims.root_uri + "/configuration/properties")
+
+        self.assertEqual(len(server.requests), 3)
+        properties = lims.metrics.snapshot()[("GET", "/configuration/properties")]
+        self.assertEqual(properties.retries, 2)
+        self.assertEqual(properties.errors, 2)
+
+    def test_retries_run_out(self):
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/configuration/properties", flaky(5))
+            lims = self._lims(server)
+
+            with self.assertRaises(requests.HTTPError):
+                lims.request("get", lims.root_uri + "/configuration/properties")
+
+        self.assertEqual(len(server.requests), 3)
+
+    def test_post_is_not_retried(self):
+        with LocalClarityServer() as server:
+            server.route("POST", "/api/v2/samples", flaky(1))
+            server.route("POST", "/api/v2/samples/batch/retrieve", flaky(1))
+            lims = self._lims(server)
+
+            with self.assertRaises(requests.HTTPError):
+                lims.raw_request("POST", lims.root_uri + "/samples", data=b"<sample/>")
+            lims.raw_request("POST", lims.root_uri + "/samples/batch/retrieve", data=b"<links/>")
+
+        self.assertEqual(len(server.requests), 3)
+
+    def test_retry_after_is_honoured(self):
+        policy = RetryPolicy(max_backoff=10)
+        response = requests.Response()
+
+        response.headers["Retry-After"] = "3"
+        self.assertEqual(policy.backoff(1, response), 3)
+
+        response.headers["Retry-After"] = "120"
+        self.assertEqual(policy.backoff(1, response), 10)
+
+        self.assertLessEqual(RetryPolicy(backoff_factor=1).backoff(3), 4)
+
+    def test_circuit_opens_and_recovers(self):
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/configuration/properties", flaky(2))
+            lims = LIMS(server.root_uri, "user", "password", retry_policy=RetryPolicy(max_retries=0),
+                        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.2))
+            uri = lims.root_uri + "/configuration/properties"
+
+            for _ in range(2):
+                with self.assertRaises(requests.HTTPError):
+                    lims.request("get", uri)
+
+            with self.assertRaises(ClarityUnavailableException):
+                lims.request("get", uri)
+            self.assertEqual(len(server.requests), 2)
+
+            time.sleep(0.25)
+            lims.request("get", uri)
+
+        self.assertEqual(lims.circuit_breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestLimsRateLimits(TestCase):
+
+    def tearDown(self):
+        # limits are process-wide, don't leave them for other tests
+        governor.reset()
+
+    def test_limits_are_shared_per_host(self):
+        first = LIMS("https://qalocal-shared/api/v2", "user", "password", read_limit=RateLimit(max_in_flight=3))
+        second = LIMS("https://qalocal-shared/api/v2", "user", "password")
+
+        reads = governor.governor_for(second.hostname, governor.READS)
+        self.assertIs(reads, governor.governor_for(first.hostname, governor.READS))
+        self.assertEqual(reads.limit.max_in_flight, 3)
+        self.assertIsNone(governor.governor_for(second.hostname, governor.WRITES).limit.max_in_flight)
+
+    def test_reset(self):
+        LIMS("https://qalocal-reset/api/v2", "user", "password", read_limit=RateLimit(max_in_flight=3))
+
+        governor.reset()
+
+        self.assertIsNone(governor.governor_for("qalocal-reset", governor.READS).limit.max_in_flight)
+
+    def test_rate_limit(self):
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/configuration/properties", PROPERTIES_XML)
+            lims = LIMS(server.root_uri, "user", "password", read_limit=RateLimit(requests_per_second=20, burst=1))
+
+            start = timer()
+            for _ in range(5):
+                lims.request("get", lims.root_uri + "/configuration/properties")
+            elapsed = timer() - start
+
+        self.assertGreaterEqual(elapsed, 0.18)
+        self.assertEqual(lims.rate_limit_stats()["reads"]["waits"], 4)
+        self.assertEqual(lims.rate_limit_stats()["writes"]["waits"], 0)
+
+    def test_max_in_flight(self):
+        in_flight = []
+        most_in_flight = []
+        lock = threading.Lock()
+
+        def slow_properties(path, body):
+            with lock:
+                in_flight.append(path)
+                most_in_flight.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+            return 200, PROPERTIES_XML
+
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/configuration/properties", slow_properties)
+            lims = LIMS(server.root_uri, "user", "password", coalesce_requests=False,
+                        read_limit=RateLimit(max_in_flight=2))
+
+            threads = [threading.Thread(target=lims.request, args=("get", lims.root_uri + "/configuration/properties"))
+                       for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(server.requests), 6)
+        self.assertEqual(max(most_in_flight), 2)
+
+
+class TestLimsMetrics(TestCase):
+
+    def test_normalize_endpoint(self):
+        metrics = RequestMetrics("https://qalocal/api/v2")
+        self.assertEqual(metrics.normalize_endpoint("https://qalocal/api/v2/artifacts/batch/retrieve"),
+                         "/artifacts/batch/retrieve")
+        self.assertEqual(metrics.normalize_endpoint("https://qalocal/api/v2/steps/24-1234/details?state=5"),
+                         "/steps/{id}/details")
+        self.assertEqual(metrics.normalize_endpoint("https://qalocal/api/v2/configuration/protocols/252/steps/554"),
+                         "/configuration/protocols/{id}/steps/{id}")
+
+    def test_requests_are_recorded(self):
+        with LocalClarityServer() as server:
+            server.route("GET", "/api/v2/configuration/properties", PROPERTIES_XML)
+            server.route("GET", "/api/v2/samples/S1", EXCEPTION_XML, status=400)
+            lims = LIMS(server.root_uri, "user", "password")
+
+            lims.request("get", lims.root_uri + "/configuration/properties")
+            lims.request("get", lims.root_uri + "/configuration/properties")
+            with self.assertRaises(ClarityException):
+                lims.request("get", lims.root_uri + "/samples/S1")
+
+        snapshot = lims.metrics.snapshot()
+
+        properties = snapshot[("GET", "/configuration/properties")]
+        self.assertEqual(properties.calls, 2)
+        self.assertEqual(properties.errors, 0)
+        self.assertEqual(properties.response_bytes, 2 * len(PROPERTIES_XML))
+        self.assertEqual(sum(properties.latency_histogram), 2)
+
+        sample = snapshot[("GET", "/samples/{id}")]
+        self.assertEqual(sample.errors, 1)
+        self.assertEqual(sample.errors_by_type, {"ClarityException": 1})
+
+        self.assertIn("/configuration/properties", lims.metrics.export_text())
+
+        lims.metrics.reset()
+        self.assertEqual(lims.metrics.snapshot(), {})
+
+
+class TestLimsStreaming(TestCase):
+
+    def test_batch_get_streams_artifacts(self):
+        with LocalClarityServer() as server:
+            server.route("POST", "/api/v2/artifacts/batch/retrieve", details_xml(server.root_uri, 3))
+            lims = LIMS(server.root_uri, "user", "password")
+
+            artifacts = lims.artifacts.batch_get([lims.root_uri + "/artifacts/2-%d" % i for i in range(3)])
+
+        self.assertEqual([a.name for a in artifacts], ["Artifact 0", "Artifact 1", "Artifact 2"])
+        self.assertTrue(all(a.is_fully_retrieved() for a in artifacts))
+
+        retrieve = lims.metrics.snapshot()[("POST", "/artifacts/batch/retrieve")]
+        self.assertEqual(retrieve.calls, 1)
+        self.assertEqual(retrieve.response_bytes, len(details_xml(server.root_uri, 3)))
+
+    def test_nodes_are_detached(self):
+        with LocalClarityServer() as server:
+            server.route("POST", "/api/v2/artifacts/batch/retrieve", details_xml(server.root_uri, 2))
+            lims = LIMS(server.root_uri, "user", "password")
+
+            nodes = list(lims.request_iter("post", lims.root_uri + "/artifacts/batch/retrieve", None, ARTIFACT_TAG))
+
+        self.assertEqual([node.get("limsid") for node in nodes], ["2-0", "2-1"])
+        self.assertEqual(nodes[0].findtext("name"), "Artifact 0")
+
+    def test_errors_are_raised(self):
+        with LocalClarityServer() as server:
+            server.route("POST", "/api/v2/artifacts/batch/retrieve", EXCEPTION_XML, status=400)
+            lims = LIMS(server.root_uri, "user", "password")
+
+            with self.assertRaises(ClarityException):
+                list(lims.request_iter("post", lims.root_uri + "/artifacts/batch/retrieve", None, ARTIFACT_TAG))
+
+    def test_in_flight_slot_held_until_body_read(self):
+        with LocalClarityServer() as server:
+            server.route("POST", "/api/v2/artifacts/batch/retrieve", details_xml(server.root_uri, 2))
+            lims = LIMS(server.root_uri, "user", "password", read_limit=RateLimit(max_in_flight=1))
+            self.addCleanup(governor.set_rate_limit, lims.hostname, governor.READS, RateLimit())
+
+            nodes = lims.request_iter("post", lims.root_uri + "/artifacts/batch/retrieve", None, ARTIFACT_TAG)
+            next(nodes)
+            self.assertEqual(lims.rate_limit_stats()["reads"]["in_flight"], 1)
+
+            list(nodes)
+            self.assertEqual(lims.rate_limit_stats()["reads"]["in_flight"], 0)
+
+    def test_cut_off_response_caches_nothing(self):
+        lims = LIMS("https://qalocal/api/v2", "user", "password")
+
+        def send_xml(method, uri, data, streamed=False):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = details_xml(lims.root_uri, 3)[:-60]
+            return response
+
+        lims._send_xml = send_xml
+
+        with self.assertRaises(Exception):
+            lims.artifacts.batch_get([lims.root_uri + "/artifacts/2-%d" % i for i in range(3)])
+
+        self.assertFalse(any(a.is_fully_retrieved() for a in lims.artifacts._cache.values()))
+
+
+ARTIFACT_TAG = "{http://genologics.com/ri/artifact}artifact"
+
+
+def details_xml(root_uri, count):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<art:details xmlns:art="http://genologics.com/ri/artifact">%s</art:details>' % "".join(
+            '<art:artifact uri="%s/artifacts/2-%d?state=1" limsid="2-%d"><name>Artifact %d</name></art:artifact>'
+            % (root_uri, i, i, i) for i in range(count))
+    ).encode("UTF-8")
+
+
+PROPERTIES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<cnf:properties xmlns:cnf="http://genologics.com/ri/configuration">
+    <property name="api.version" value="v2"/>
+</cnf:properties>
+"""
+
+EXCEPTION_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<exc:exception xmlns:exc="http://genologics.com/ri/exception">
+    <message>Sample S1 could not be found.</message>
+</exc:exception>
+"""
+
+
+class TestLimsFactories(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS("https://clarity.example.com/api/v2", "user", "password")
+
+    def test_factories_are_built_on_first_use(self):
+        self.assertNotIn("artifacts", vars(self.lims))
+        self.assertEqual(self.lims.factories, {})
+
+        artifacts = self.lims.artifacts
+
+        self.assertIs(self.lims.artifacts, artifacts)
+        self.assertEqual(artifacts.uri, "https://clarity.example.com/api/v2/artifacts")
+        self.assertEqual(self.lims.factories, {artifacts.element_class: artifacts})
+
+    def test_factory_subclasses_and_arguments(self):
+        from s4.clarity._internal.udffactory import UdfFactory
+
+        self.assertIsInstance(self.lims.udfs, UdfFactory)
+        self.assertEqual(self.lims.udfs.uri, "https://clarity.example.com/api/v2/configuration/udfs")
+        self.assertEqual(self.lims.process_types.name_attribute, "displayname")
+
+    def test_factory_for_builds_the_factory(self):
+        from s4.clarity.sample import Sample
+
+        factory = self.lims.factory_for(Sample)
+
+        self.assertIs(factory, self.lims.samples)
+
+    def test_factory_for_unknown_type(self):
+        class Unknown(object):
+            pass
+
+        with self.assertRaises(Exception):
+            self.lims.factory_for(Unknown)
+
+    def test_cache_policy_applies_when_built(self):
+        lims = LIMS("https://clarity.example.com/api/v2", "user", "password", cache_policy={"samples": "lru"},
+                    cache_maxsize=2)
+
+        for i in range(3):
+            lims.samples.get("https://clarity.example.com/api/v2/samples/S%d" % i)
+
+        self.assertEqual(len(lims.samples._cache), 2)
+
+    def test_unknown_cache_policy_factory(self):
+        with self.assertRaises(Exception):
+            LIMS("https://clarity.example.com/api/v2", "user", "password", cache_policy={"nonsense": "lru"})
+
+    def test_package_members_are_lazy(self):
+        import s4.clarity
+
+        self.assertIs(s4.clarity.LIMS, LIMS)
+        self.assertEqual(LIMS.__module__, "s4.clarity")
+        with self.assertRaises(AttributeError):
+            s4.clarity.NotAMember
@@ -0,0 +1,59 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+from unittest import TestCase
+
+from s4.clarity import LIMS, ETree
+from s4.clarity.test.s4.clarity._internal.test_factory import FakeBatchServer, ROOT_URI
+from s4.clarity.test.generic_testcases import answer_requests_with
+
+QUEUE_URI = ROOT_URI + "/queues/1"
+
+
+class FakeQueueServer(FakeBatchServer):
+
+    def request(self, method, uri, xml_root=None):
+        if uri.startswith(QUEUE_URI):
+            self.requests.append((method, uri, xml_root))
+            return ETree.fromstring(QUEUE_PAGE_1 if "page=2" not in uri else QUEUE_PAGE_2)
+        return super(FakeQueueServer, self).request(method, uri, xml_root)
+
+
+class TestQueue(TestCase):
+
+    def setUp(self):
+        self.lims = LIMS(ROOT_URI, "user", "password")
+        self.server = FakeQueueServer()
+        answer_requests_with(self.lims, self.server.request)
+        self.queue = self.lims.queues.get(QUEUE_URI)
+
+    def test_query(self):
+        queued = self.queue.query(project_name="P1")
+
+        self.assertEqual([q.limsid for q in queued], ["2-1", "2-2", "2-3"])
+        self.assertTrue(all(q.artifact.is_fully_retrieved() for q in queued))
+        self.assertIn("project-name=P1", self.server.requests[0][1])
+
+    def test_query_iter_without_cache(self):
+        queued = list(self.queue.query_iter(cache=False))
+
+        self.assertEqual([q.artifact.name for q in queued], ["Artifact 2-1", "Artifact 2-2", "Artifact 2-3"])
+        self.assertEqual(self.lims.artifacts.cache_stats()["size"], 0)
+
+
+QUEUE_PAGE_1 = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<que:queue xmlns:que="http://genologics.com/ri/queue" uri="https://qalocal/api/v2/queues/1">
+    <artifacts>
+        <artifact limsid="2-1" uri="https://qalocal/api/v2/artifacts/2-1"><queue-time>2026-01-01T10:00:00.000-07:00</queue-time></artifact>
+        <artifact limsid="2-2" uri="https://qalocal/api/v2/artifacts/2-2"><queue-time>2026-01-01T10:00:00.000-07:00</queue-time></artifact>
+    </artifacts>
+    <next-page uri="https://qalocal/api/v2/queues/1?page=2"/>
+</que:queue>
+"""
+
+QUEUE_PAGE_2 = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<que:queue xmlns:que="http://genologics.com/ri/queue" uri="https://qalocal/api/v2/queues/1">
+    <artifacts>
+        <artifact limsid="2-3" uri="https://qalocal/api/v2/artifacts/2-3"><queue-time>2026-01-01T10:00:00.000-07:00</queue-time></artifact>
+    </artifacts>
+</que:queue>
+"""
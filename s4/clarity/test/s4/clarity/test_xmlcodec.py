@@ -0,0 +1,66 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+from unittest import TestCase
+
+from six import BytesIO
+
+from s4.clarity import ETree, xmlcodec
+
+FIELD_TAG = "{http://genologics.com/ri/userdefined}field"
+
+
+class TestXmlCodec(TestCase):
+
+    def test_round_trip(self):
+        root = xmlcodec.parse(ARTIFACT_XML)
+
+        self.assertIsInstance(root, type(ETree.Element("x")))
+        self.assertEqual(root.findtext("name"), u"Café")
+
+        content = xmlcodec.tostring(root)
+        self.assertTrue(content.startswith(b'<?xml version="1.0" encoding="UTF-8"?>\n'))
+        # non-ASCII characters are sent as character references
+        self.assertIn(b"Caf&#233;", content)
+        self.assertEqual(xmlcodec.parse(content).findtext("name"), u"Café")
+
+    def test_findall(self):
+        root = xmlcodec.parse(ARTIFACT_XML)
+
+        fields = xmlcodec.findall(root, "./" + FIELD_TAG)
+        self.assertEqual([f.get("name") for f in fields], ["Concentration", "Comment"])
+        # twice, to use the cached path
+        self.assertEqual(len(xmlcodec.findall(root, "./" + FIELD_TAG)), 2)
+        self.assertEqual(xmlcodec.findall(root, "./location/value")[0].text, "A:1")
+        self.assertEqual(xmlcodec.findall(root, "./missing"), [])
+
+    def test_iterchildren(self):
+        details = (b'<art:details xmlns:art="http://genologics.com/ri/artifact">'
+                   b'<art:artifact limsid="2-1"><name>A</name></art:artifact>'
+                   b'<other/>'
+                   b'<art:artifact limsid="2-2"><name>B</name></art:artifact>'
+                   b'</art:details>')
+
+        nodes = list(xmlcodec.iterchildren(BytesIO(details), "{http://genologics.com/ri/artifact}artifact"))
+
+        self.assertEqual([node.get("limsid") for node in nodes], ["2-1", "2-2"])
+        self.assertEqual(nodes[1].findtext("name"), "B")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            xmlcodec._load_backend("expat")
+
+    def test_stdlib_backend(self):
+        etree, backend = xmlcodec._load_backend(None)
+        self.assertEqual(backend, xmlcodec.STDLIB)
+        self.assertTrue(etree.__name__.startswith("xml.etree"))
+
+
+ARTIFACT_XML = u"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<art:artifact xmlns:udf="http://genologics.com/ri/userdefined" xmlns:art="http://genologics.com/ri/artifact"
+    uri="https://qalocal/api/v2/artifacts/2-1" limsid="2-1">
+    <name>Café</name>
+    <location><value>A:1</value></location>
+    <udf:field type="Numeric" name="Concentration">10</udf:field>
+    <udf:field type="String" name="Comment">ok</udf:field>
+</art:artifact>
+""".encode("UTF-8")
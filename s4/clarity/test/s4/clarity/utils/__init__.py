@@ -0,0 +1,2 @@
+# Copyright 2016 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
@@ -0,0 +1,37 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+import datetime
+from unittest import TestCase
+
+import dateutil.parser
+import dateutil.tz
+
+from s4.clarity.utils import date_util, str_to_date, str_to_datetime
+
+
+class TestDateUtil(TestCase):
+
+    def test_matches_dateutil(self):
+        for string in ("2019-03-01", "2019-03-01T14:05:09", "2019-03-01T14:05", "2019-03-01T14:05:09.123-07:00",
+                       "2019-03-01 14:05:09.1234567", "2019-03-01T14:05:09Z", "2019-03-01T14:05:09+0530",
+                       "2019-3-1", "March 1 2019"):
+            expected = dateutil.parser.parse(string, yearfirst=True)
+            self.assertEqual(str_to_datetime(string), expected, string)
+            self.assertEqual(str_to_datetime(string).utcoffset(), expected.utcoffset(), string)
+            self.assertEqual(str_to_date(string), expected.date(), string)
+
+    def test_time_zones(self):
+        self.assertEqual(str_to_datetime("2019-03-01T14:05:09-00:00").tzinfo, dateutil.tz.tzutc())
+        self.assertEqual(str_to_datetime("2019-03-01T14:05:09.5+01:00"),
+                         datetime.datetime(2019, 3, 1, 14, 5, 9, 500000, dateutil.tz.tzoffset(None, 3600)))
+
+    def test_invalid_dates_raise(self):
+        with self.assertRaises(ValueError):
+            str_to_date("2019-02-30")
+
+    def test_memo_is_bounded(self):
+        for day in range(date_util.MEMO_SIZE + 10):
+            str_to_date((datetime.date(2000, 1, 1) + datetime.timedelta(days=day)).isoformat())
+
+        self.assertLessEqual(len(date_util._date_memo), date_util.MEMO_SIZE)
+        self.assertIs(str_to_datetime("2019-03-01T14:05:09"), str_to_datetime("2019-03-01T14:05:09"))
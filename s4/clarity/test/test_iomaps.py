@@ -1,6 +1,7 @@
 # Copyright 2016 Semaphore Solutions, Inc.
 # ---------------------------------------------------------------------------
 
+from s4.clarity import ETree, LIMS
 from s4.clarity.step import StepDetails
 from s4.clarity.test.generic_testcases import LimsTestCase
 
@@ -120,6 +121,52 @@ class TestIomaps(LimsTestCase):
 
         self._validate_expected_output_to_parsed_xml(POOLING_XML, expected_input_map, expected_output_map, expected_shared_outputs)
 
+    def test_index_built_on_first_use(self):
+        details = self.element_from_xml(StepDetails, ONE_TO_ONE_MAPPING_XML, step=None)
+        self.assertIsNone(details._iomap_index)
+
+        details.inputs
+
+        self.assertIsNotNone(details._iomap_index)
+
+    def test_limsid_indexes_and_membership(self):
+        details = self.element_from_xml(StepDetails, POOLING_XML, step=None)
+        index = details.iomap_index
+
+        self.assertEqual(sorted(index.inputs_by_limsid), ["i1", "i2", "i3", "i4"])
+        self.assertEqual(sorted(index.outputs_by_limsid), ["a1", "a2"])
+
+        input_artifact = index.inputs_by_limsid["i1"]
+        output_artifact = index.outputs_by_limsid["a1"]
+        self.assertIn(input_artifact, details.inputs)
+        self.assertTrue(details.is_input(input_artifact))
+        self.assertFalse(details.is_output(input_artifact))
+        self.assertTrue(details.is_output(output_artifact))
+        self.assertFalse(details.is_output(details.shared_outputs[0]))
+
+    def test_index_reused_when_iomaps_unchanged(self):
+        details = self.element_from_xml(StepDetails, ONE_TO_ONE_MAPPING_XML, step=None)
+        index = details.iomap_index
+
+        # only the artifact states differ
+        details.xml_root = ETree.fromstring(ONE_TO_ONE_MAPPING_XML.replace('/2-9370"', '/2-9370?state=12"'))
+        self.assertIs(details.iomap_index, index)
+
+        details.xml_root = ETree.fromstring(NO_OUTPUTS_XML)
+        self.assertIsNot(details.iomap_index, index)
+        self.assertEqual(details.outputs, [])
+
+    def test_replicates_with_small_artifact_cache(self):
+        # the cache drops each input before its second replicate is indexed
+        lims = LIMS("https://qalocal/api/v2", "user", "password", cache_policy={"artifacts": "lru"}, cache_maxsize=2)
+        details = StepDetails(None, lims, xml_root=ETree.fromstring(INTERLEAVED_REPLICATES_XML))
+
+        self.assertEqual(self.artifact_dict_to_limsids_dict(details.iomaps_input_keyed()), {
+            "i1": set(["o1", "o2"]),
+            "i2": set(["o3", "o4"]),
+            "i3": set(["o5", "o6"])
+        })
+
     def _validate_expected_output_to_parsed_xml(self, xml_string, expected_input_map, expected_output_map, expected_shared_outputs=list()):
 
         # Parse the xml into a StepDetails object
@@ -261,6 +308,40 @@ UNPOOLING_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
 </stp:details>
 """
 
+INTERLEAVED_REPLICATES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<stp:details xmlns:udf="http://genologics.com/ri/userdefined" xmlns:stp="http://genologics.com/ri/step" uri="https://qalocal/api/v2/steps/24-20712/details">
+    <step uri="https://qalocal/api/v2/steps/24-20712" rel="steps"/>
+    <configuration uri="https://qalocal/api/v2/configuration/protocols/211/steps/542">Unpooling QC</configuration>
+    <input-output-maps>
+        <input-output-map>
+            <input uri="https://qalocal/api/v2/artifacts/2-65725" limsid="i1"/>
+            <output uri="https://qalocal/api/v2/artifacts/92-65739" output-generation-type="PerReagentLabel" type="ResultFile" limsid="o1"/>
+        </input-output-map>
+        <input-output-map>
+            <input uri="https://qalocal/api/v2/artifacts/2-65724" limsid="i2"/>
+            <output uri="https://qalocal/api/v2/artifacts/92-65738" output-generation-type="PerReagentLabel" type="ResultFile" limsid="o3"/>
+        </input-output-map>
+        <input-output-map>
+            <input uri="https://qalocal/api/v2/artifacts/2-65719" limsid="i3"/>
+            <output uri="https://qalocal/api/v2/artifacts/92-65736" output-generation-type="PerReagentLabel" type="ResultFile" limsid="o5"/>
+        </input-output-map>
+        <input-output-map>
+            <input uri="https://qalocal/api/v2/artifacts/2-65725" limsid="i1"/>
+            <output uri="https://qalocal/api/v2/artifacts/92-65740" output-generation-type="PerReagentLabel" type="ResultFile" limsid="o2"/>
+        </input-output-map>
+        <input-output-map>
+            <input uri="https://qalocal/api/v2/artifacts/2-65724" limsid="i2"/>
+            <output uri="https://qalocal/api/v2/artifacts/92-65737" output-generation-type="PerReagentLabel" type="ResultFile" limsid="o4"/>
+        </input-output-map>
+        <input-output-map>
+            <input uri="https://qalocal/api/v2/artifacts/2-65719" limsid="i3"/>
+            <output uri="https://qalocal/api/v2/artifacts/92-65735" output-generation-type="PerReagentLabel" type="ResultFile" limsid="o6"/>
+        </input-output-map>
+    </input-output-maps>
+    <fields/>
+</stp:details>
+"""
+
 POOLING_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
 <stp:details xmlns:udf="http://genologics.com/ri/userdefined" xmlns:stp="http://genologics.com/ri/step" uri="https://qalocal/api/v2/steps/122-20527/details">
     <step uri="https://qalocal/api/v2/steps/122-20527" rel="steps"/>
@@ -1,7 +1,68 @@
 # Copyright 2019 Semaphore Solutions, Inc.
 # ---------------------------------------------------------------------------
 
-import dateutil.parser
+import datetime
+import re
+
+import dateutil.tz
+
+# The ISO 8601 forms Clarity writes: 2019-03-01, 2019-03-01T14:05:09.123-07:00 and similar.
+_ISO_RE = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6})\d*)?)?"
+    r"(Z|[+-]\d{2}:?\d{2})?)?$"
+)
+
+# Parsed values are memoized, as exports repeat the same dates many times.
+# Each memo is cleared once it reaches MEMO_SIZE entries.
+MEMO_SIZE = 4096
+_date_memo = {}
+_datetime_memo = {}
+
+
+def _parse_iso(string):
+    """
+    Parse one of Clarity's ISO 8601 forms, or return None for anything else.
+    """
+    match = _ISO_RE.match(string)
+    if match is None:
+        return None
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+
+    if offset is None:
+        tzinfo = None
+    elif offset == "Z":
+        tzinfo = dateutil.tz.tzutc()
+    else:
+        offset_seconds = int(offset[1:3]) * 3600 + int(offset[-2:]) * 60
+        if offset[0] == "-":
+            offset_seconds = -offset_seconds
+        # matches dateutil, which gives UTC for any zero offset
+        tzinfo = dateutil.tz.tzoffset(None, offset_seconds) if offset_seconds else dateutil.tz.tzutc()
+
+    try:
+        return datetime.datetime(
+            int(year), int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0),
+            int(fraction.ljust(6, "0")) if fraction else 0,
+            tzinfo)
+    except ValueError:
+        # out of range, let dateutil report it
+        return None
+
+
+def _memoize(memo, string, value):
+    if len(memo) >= MEMO_SIZE:
+        memo.clear()
+    memo[string] = value
+    return value
+
+
+def _parse_any(string):
+    # dateutil's parser is slow to import, and only needed for strings Clarity didn't write
+    import dateutil.parser
+    return dateutil.parser.parse(string, yearfirst=True)
 
 
 def str_to_date(string):
@@ -9,7 +70,11 @@ def str_to_date(string):
     :type string: str
     :rtype: datetime.date
     """
-    return dateutil.parser.parse(string,yearfirst=True).date()
+    value = _date_memo.get(string)
+    if value is None:
+        parsed = _parse_iso(string) or _parse_any(string)
+        value = _memoize(_date_memo, string, parsed.date())
+    return value
 
 
 def str_to_datetime(string):
@@ -17,7 +82,11 @@ def str_to_datetime(string):
     :type string: str
     :rtype: datetime
     """
-    return dateutil.parser.parse(string,yearfirst=True)
+    value = _datetime_memo.get(string)
+    if value is None:
+        value = _memoize(_datetime_memo, string,
+                         _parse_iso(string) or _parse_any(string))
+    return value
 
 
 def date_to_str(dt):
@@ -0,0 +1,143 @@
+# Copyright 2026 Semaphore Solutions, Inc.
+# ---------------------------------------------------------------------------
+"""
+The XML implementation used by the library, re-exported as ``s4.clarity.ETree``.
+
+By default this is the standard library ElementTree. Set the environment variable
+``S4_CLARITY_XML_BACKEND`` before importing s4.clarity to choose another:
+
+- ``stdlib``: xml.etree (the default)
+- ``lxml``: lxml.etree, which must be installed
+- ``auto``: lxml.etree if it is installed, otherwise xml.etree
+
+lxml parses and serializes Clarity documents faster, and `findall` compiles and caches
+each path as an XPath expression. The two backends can't be mixed in one tree, so code
+building XML for the library should always use ``s4.clarity.ETree``.
+"""
+
+import os
+import threading
+
+BACKEND_ENV = "S4_CLARITY_XML_BACKEND"
+
+STDLIB = "stdlib"
+LXML = "lxml"
+AUTO = "auto"
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+def _import_stdlib():
+    try:
+        from xml.etree import cElementTree as etree
+    except ImportError:
+        from xml.etree import ElementTree as etree
+    return etree
+
+
+def _import_lxml():
+    from lxml import etree
+    return etree
+
+
+def _load_backend(requested):
+    requested = (requested or STDLIB).lower()
+
+    if requested == STDLIB:
+        return _import_stdlib(), STDLIB
+    if requested == LXML:
+        return _import_lxml(), LXML
+    if requested == AUTO:
+        try:
+            return _import_lxml(), LXML
+        except ImportError:
+            return _import_stdlib(), STDLIB
+
+    raise ValueError("Unknown XML backend '%s' in %s, use '%s', '%s' or '%s'" % (requested, BACKEND_ENV,
+                                                                              STDLIB, LXML, AUTO))
+
+
+ETree, BACKEND = _load_backend(os.environ.get(BACKEND_ENV))
+
+_local = threading.local()
+_xpaths = {}
+
+
+def _lxml_parser():
+    # lxml parsers shouldn't be shared between threads
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = ETree.XMLParser(resolve_entities=False, huge_tree=True)
+    return parser
+
+
+def parse(content):
+    """
+    Parse a complete XML document.
+
+    :type content: bytes
+    :rtype: ETree.Element
+    """
+    if BACKEND == LXML:
+        return ETree.fromstring(content, _lxml_parser())
+    return ETree.XML(content)
+
+
+def tostring(element):
+    """
+    Serialize an element as a document to send to Clarity, with an XML declaration.
+    Non-ASCII characters are written as character references.
+
+    :type element: ETree.Element
+    :rtype: bytes
+    """
+    return XML_DECLARATION + ETree.tostring(element)
+
+
+def findall(node, path):
+    """
+    node.findall(path), using a cached compiled XPath under lxml.
+    Paths use ElementPath syntax, with namespaces in {uri}tag form.
+
+    :type node: ETree.Element
+    :type path: str
+    :rtype: list[ETree.Element]
+    """
+    if BACKEND != LXML:
+        return node.findall(path)
+
+    xpath = _xpaths.get(path)
+    if xpath is None:
+        xpath = _xpaths[path] = ETree.ETXPath(path)
+    return xpath(node)
+
+
+def iterchildren(source, tag):
+    """
+    Incrementally parse a document from a file-like object, yielding each child of the root
+    element with the given tag as soon as its end tag has been read. Each child is removed
+    from the root before it is yielded, so only the children the caller keeps stay in memory.
+
+    :param source: file-like object with a read method
+    :type tag: str
+    :rtype: collections.Iterable[ETree.Element]
+    """
+    if BACKEND == LXML:
+        events = ETree.iterparse(source, events=("start", "end"), resolve_entities=False, huge_tree=True)
+    else:
+        events = ETree.iterparse(source, events=("start", "end"))
+
+    root = None
+    depth = 0
+    for event, element in events:
+        if event == "start":
+            if root is None:
+                root = element
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 1:
+            root.remove(element)
+            if element.tag == tag:
+                yield element
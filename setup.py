@@ -51,6 +51,7 @@ setup(
         'six',
         'future',
         "typing; python_version < '3.5'",
+        "futures; python_version < '3'",
         'urllib3>=1.25.2'
     ),
     tests_require=(